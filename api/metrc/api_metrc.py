@@ -52,6 +52,8 @@ from cannlytics.firebase import (
     delete_document,
 )
 from cannlytics.metrc import Metrc, MetrcAPIError
+from cannlytics.metrc.cache import REFERENCE_CACHE
+from cannlytics.metrc.urls import METRC_FACILITIES_URL
 from cannlytics.utils import (
     camelcase,
     camel_to_snake,
@@ -203,6 +205,7 @@ def initialize_traceability(request: Request) -> Metrc:
         primary_license=license_number,
         state=state,
         test=test,
+        cache=True,
     )
 
 
@@ -518,7 +521,8 @@ def add_metrc_user_api_key(request: HttpRequest):
         pass # Secret may already be created.
     add_secret_version(project_id, secret_id, metrc_user_api_key)
 
-    # Get all facilities and their license numbers for the key.
+    # Get all facilities and their license numbers for the key,
+    # replacing any cached facilities, as the licenses may have changed.
     try:
         metrc_vendor_api_key = get_vendor_api_key(state, test, project_id)
         track = Metrc(
@@ -527,7 +531,9 @@ def add_metrc_user_api_key(request: HttpRequest):
             logs=True,
             state=state,
             test=test,
+            cache=True,
         )
+        track.invalidate_cache(endpoint=METRC_FACILITIES_URL)
         facilities = track.get_facilities()
         licenses = [x.license['number'] for x in facilities]
     except MetrcAPIError as error:
@@ -619,8 +625,11 @@ def delete_metrc_user_api_key(request: HttpRequest):
     delete_document(doc_id)
     delete_document(f'organizations/{org_id}/metrc_user_api_keys/{user_hash}')
 
-    # Create a log.
+    # Remove cached facilities of the state, as the licenses have changed.
     state = doc['state']
+    REFERENCE_CACHE.invalidate(state=state, endpoint=METRC_FACILITIES_URL)
+
+    # Create a log.
     message = f'Metrc user API key ({prefix}...{suffix}) deleted in {state}.'
     create_log(
         ref=f'organizations/{org_id}/logs',
@@ -4,16 +4,24 @@ Copyright (c) 2021-2023 Cannlytics
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/6/2021
-Updated: 1/3/2023
+Updated: 10/17/2026
 """
 from .ccrs import (
     CCRS,
+    DatafileResults,
+    DatasetIndex,
     anonymize,
+    build_cache,
+    build_cache_file,
     find_detections,
     format_lab_results,
     format_test_value,
     get_datafiles,
+    is_cache_fresh,
+    iter_datafile,
+    map_datafiles,
     merge_datasets,
+    read_datafile,
     save_dataset,
     standardize_dataset,
     unzip_datafiles,
@@ -21,11 +29,13 @@ from .ccrs import (
 from .constants import (
     CCRS_ANALYSES,
     CCRS_ANALYTES,
+    CCRS_CHUNK_SIZE,
     CCRS_DATASETS,
     CCRS_PLANT_GROWTH_STAGES,
     CCRS_PLANT_HARVEST_CYCLES,
     CCRS_PLANTS_SOURCES,
     CCRS_PLANT_STATES,
+    CCRS_STRING_FIELDS,
     CURATED_CCRS_DATASETS,
 )
 
@@ -33,18 +43,28 @@ __all__ = [
     CCRS,
     CCRS_ANALYSES,
     CCRS_ANALYTES,
+    CCRS_CHUNK_SIZE,
     CCRS_DATASETS,
     CCRS_PLANT_GROWTH_STAGES,
     CCRS_PLANT_HARVEST_CYCLES,
     CCRS_PLANTS_SOURCES,
     CCRS_PLANT_STATES,
+    CCRS_STRING_FIELDS,
     CURATED_CCRS_DATASETS,
+    DatafileResults,
+    DatasetIndex,
     anonymize,
+    build_cache,
+    build_cache_file,
     find_detections,
     format_lab_results,
     format_test_value,
     get_datafiles,
+    is_cache_fresh,
+    iter_datafile,
+    map_datafiles,
     merge_datasets,
+    read_datafile,
     save_dataset,
     standardize_dataset,
     unzip_datafiles,
@@ -6,34 +6,48 @@ Authors:
     Keegan Skeate <https://github.com/keeganskeate>
     Candace O'Sullivan-Sutherland <https://github.com/candy-o>
 Created: 4/10/2022
-Updated: 7/30/2023
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 """
 # Standard imports:
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import functools
+import gc
 from glob import glob
+import json
 import logging
 from pathlib import Path
 import os
 import tempfile
 from typing import Callable, List, Optional, Union
+import warnings
 from zipfile import ZipFile
 import numpy as np
+try:
+    import resource
+except ImportError:
+    # Note: Memory limits are not available on Windows.
+    resource = None
 
 # External imports:
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Internal imports:
 from cannlytics.data import create_hash
 from cannlytics.data.ccrs.constants import (
     CCRS_ANALYSES,
     CCRS_ANALYTES,
+    CCRS_CHUNK_SIZE,
     CCRS_DATASETS,
     CCRS_PLANT_GROWTH_STAGES,
     CCRS_PLANT_HARVEST_CYCLES,
     CCRS_PLANTS_SOURCES,
     CCRS_PLANT_STATES,
+    CCRS_STRING_FIELDS,
     CURATED_CCRS_DATASETS,
 )
 from cannlytics.utils.utils import (
@@ -102,43 +116,822 @@ def find_detections(
     if isinstance(tests, list):
         return [test[analyte_key] for test in tests if test[analysis_key] == analysis and to_numeric(test[value_key], errors='coerce') > 0]
     tests = tests[tests[analysis_key] == analysis]
-    tests[value_key] = to_numeric(tests[value_key], errors='coerce')
-    return tests[tests[value_key] > 0][analyte_key].to_list()
+    values = pd.to_numeric(tests[value_key], errors='coerce')
+    return tests.loc[values > 0, analyte_key].to_list()
 
 
-def format_lab_results(df: pd.DataFrame, results: pd.DataFrame, item_key: Optional[str] = 'InventoryId',
-                       analysis_name: Optional[str] = 'TestName', analysis_key: Optional[str] = 'TestValue') -> pd.DataFrame:
-    """Format CCRS lab results to merge into another dataset."""
-    # Curate lab results.
-    analyte_data = results[analysis_name].map(CCRS_ANALYTES)
-    results = pd.concat([results, pd.DataFrame(analyte_data)], axis=1)
-    results['type'] = results['type'].map(CCRS_ANALYSES)
+def get_group_lists(
+        groups: np.ndarray,
+        values: np.ndarray,
+        index: pd.Index,
+    ) -> List[list]:
+    """Get the list of values of each group in an index, in the order
+    of the values, by sorting the values by group once."""
+    codes = index.get_indexer(groups)
+    order = np.argsort(codes, kind='stable')
+    values = np.asarray(values, dtype=object)[order]
+    bounds = np.searchsorted(codes[order], np.arange(len(index) + 1))
+    return [values[a:b].tolist() for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def format_lab_results(
+        df: pd.DataFrame,
+        results: pd.DataFrame,
+        item_key: Optional[str] = 'InventoryId',
+        analysis_name: Optional[str] = 'TestName',
+        analysis_key: Optional[str] = 'TestValue',
+        analytes: Optional[List[str]] = None,
+        detections: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+    """Format CCRS lab results to merge into another dataset, with one
+    row for each item with lab results. Analyte values, analyses,
+    detections, and status are computed for all items at once.
+    Args:
+        df (DataFrame): The dataset with the items to format.
+        results (DataFrame): CCRS lab results, one row per test.
+        item_key (str): The column of the item of each test, `InventoryId`
+            by default.
+        analysis_name (str): The column of the name of each test, a key
+            of `CCRS_ANALYTES`, `TestName` by default.
+        analysis_key (str): The column of the value of each test,
+            `TestValue` by default.
+        analytes (list): The analytes to record the value of, the first
+            value of each item, major cannabinoids, moisture content, and
+            water activity by default.
+        detections (list): The analyses to record detected analytes of,
+            pesticides, residual solvents, and heavy metals by default.
+    Returns:
+        (DataFrame): Returns the first row of each item's lab results,
+            without test fields, with the `analyses`, analyte values,
+            `status`, and detected analytes of the item.
+    """
+    if analytes is None:
+        analytes = [
+            'delta_9_thc',
+            'thca',
+            'total_thc',
+            'cbd',
+            'cbda',
+            'total_cbd',
+            'moisture_content',
+            'water_activity',
+        ]
+    if detections is None:
+        detections = ['pesticides', 'residual_solvents', 'heavy_metals']
 
     # Find lab results for each item.
-    item_results = results[results[item_key].astype(str).isin(df[item_key].unique())]
-    if item_results.empty:
-        return []
-
-    # Map certain test values.
-    entries = item_results.apply(lambda row: {
-        **row.drop([analysis_name, analysis_key]),
-        'analyses': list(item_results['type'].unique()),
-        'delta_9_thc': format_test_value(item_results, 'delta_9_thc'),
-        'thca': format_test_value(item_results, 'thca'),
-        'total_thc': format_test_value(item_results, 'total_thc'),
-        'cbd': format_test_value(item_results, 'cbd'),
-        'cbda': format_test_value(item_results, 'cbda'),
-        'total_cbd': format_test_value(item_results, 'total_cbd'),
-        'moisture_content': format_test_value(item_results, 'moisture_content'),
-        'water_activity': format_test_value(item_results, 'water_activity'),
-        'status': 'Fail' if 'Fail' in item_results['LabTestStatus'].unique() else 'Pass',
-        'pesticides': find_detections(item_results, 'pesticides'),
-        'residual_solvents': find_detections(item_results, 'residual_solvent'),
-        'heavy_metals': find_detections(item_results, 'heavy_metals')
-    }, axis=1).tolist()
+    item_ids = df[item_key].dropna().astype(str).unique()
+    results = results.loc[results[item_key].astype(str).isin(item_ids)]
+    if results.empty:
+        return pd.DataFrame(columns=[item_key])
+
+    # Curate lab results.
+    codes, names = pd.factorize(results[analysis_name])
+    analyte_data = [CCRS_ANALYTES.get(x, {}) for x in names]
+    keys = np.array([x.get('key') for x in analyte_data] + [None], dtype=object)
+    types = [CCRS_ANALYSES.get(x.get('type')) for x in analyte_data]
+    types = np.array(types + [None], dtype=object)
+    tests = pd.DataFrame({
+        'item': results[item_key].astype(str).to_numpy(dtype=object),
+        'key': keys[codes],
+        'type': types[codes],
+        'value': pd.to_numeric(results[analysis_key], errors='coerce').to_numpy(),
+    })
+    if 'LabTestStatus' in results.columns:
+        tests['fail'] = (results['LabTestStatus'] == 'Fail').to_numpy()
+    else:
+        tests['fail'] = False
+
+    # Record item metadata from the first lab result of each item.
+    drop = [analysis_name, analysis_key, 'LabTestStatus']
+    first = ~tests['item'].duplicated().to_numpy()
+    items = results.loc[first].drop(columns=drop, errors='ignore')
+    items = items.reset_index(drop=True)
+    item_index = pd.Index(tests['item'][first])
+
+    # Record the analyses of each item.
+    analyses = tests.dropna(subset=['type']).drop_duplicates(['item', 'type'])
+    items['analyses'] = get_group_lists(analyses['item'], analyses['type'], item_index)
+
+    # Record the first value of certain analytes of each item.
+    values = tests.loc[tests['key'].isin(analytes)]
+    values = values.drop_duplicates(['item', 'key'], keep='first')
+    values = values.pivot(index='item', columns='key', values='value')
+    values = values.reindex(index=item_index, columns=analytes)
+    for analyte in analytes:
+        items[analyte] = values[analyte].to_numpy()
+
+    # Determine "Pass" or "Fail" status of each item.
+    failed = tests.groupby('item', sort=False)['fail'].any()
+    failed = failed.reindex(item_index).to_numpy()
+    items['status'] = np.where(failed, 'Fail', 'Pass')
+
+    # Record detected analytes of each item.
+    detected = tests.loc[tests['value'] > 0]
+    for analysis in detections:
+        keys = detected.loc[detected['type'] == analysis]
+        items[analysis] = get_group_lists(keys['item'], keys['key'], item_index)
 
     # Return the lab results.
-    return pd.DataFrame(entries)
+    return items
+
+
+def get_dataset_key(datafile: str) -> Union[str, None]:
+    """Get the key of the dataset of a CCRS datafile in `CCRS_DATASETS`
+    from the name of the datafile, e.g. `Areas_0.csv` is `areas`."""
+    name = Path(datafile).stem.rsplit('_', 1)[0]
+    for key, values in CCRS_DATASETS.items():
+        if values['dataset'] == name:
+            return key
+    return None
+
+
+def get_cache_file(datafile: str) -> Path:
+    """Get the Parquet cache of a CCRS datafile, saved alongside the
+    datafile with the `.parquet` extension."""
+    return Path(datafile).with_suffix('.parquet')
+
+
+def get_datafile_signature(datafile: str) -> dict:
+    """Get the size and modified time of a datafile, used to determine
+    if the cache of the datafile is stale."""
+    stat = os.stat(datafile)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def is_cache_fresh(datafile: str) -> bool:
+    """Determine if the Parquet cache of a CCRS datafile exists and was
+    built from the current version of the datafile."""
+    cache_file = get_cache_file(datafile)
+    if not cache_file.exists():
+        return False
+    try:
+        metadata = pq.read_schema(cache_file).metadata or {}
+        source = json.loads(metadata.get(b'ccrs_source', b'{}'))
+    except (OSError, ValueError, pa.ArrowException):
+        return False
+    return source == get_datafile_signature(datafile)
+
+
+def cast_column(
+        series: pd.Series,
+        dtype: str,
+        errors: Optional[str] = 'raise',
+    ) -> pd.Series:
+    """Cast a column to a given type, parsing text values where the
+    type can not be cast directly, e.g. text to boolean. Dates that can
+    not be parsed raise an error, or are kept as text, as when reading a
+    datafile, if `errors` is `ignore`."""
+    if str(series.dtype) == str(dtype):
+        return series
+    if dtype == 'datetime64':
+        try:
+            return pd.to_datetime(series)
+        except (TypeError, ValueError):
+            if errors == 'ignore':
+                return series
+            raise
+    if dtype in ['string', 'str', str]:
+        return series.astype('string')
+    if dtype == 'boolean' and series.dtype == 'string':
+        values = series.str.lower().map({
+            'true': True, 'false': False, '1': True, '0': False,
+        })
+        return values.astype('boolean')
+    try:
+        return series.astype(dtype)
+    except (TypeError, ValueError):
+        return pd.to_numeric(series.astype(str), errors='coerce').astype(dtype)
+
+
+def cast_columns(
+        data: pd.DataFrame,
+        dtype: Optional[dict] = None,
+        parse_dates: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+    """Cast the columns of data read from a Parquet cache to the types
+    requested of the datafile."""
+    dtype = dtype or {}
+    parse_dates = parse_dates or []
+    for column in data.columns:
+        if column in parse_dates:
+            data[column] = cast_column(data[column], 'datetime64', errors='ignore')
+        elif column in dtype:
+            data[column] = cast_column(data[column], dtype[column])
+    return data
+
+
+def get_cache_columns(
+        schema: pa.Schema,
+        usecols: Optional[List[str]] = None,
+    ) -> Union[List[str], None]:
+    """Get the columns to read from a Parquet cache, the given columns,
+    or all columns if none are given. Columns that are not in the cache
+    raise a `ValueError`, as when reading the datafile."""
+    if usecols is None:
+        return None
+    columns = list(dict.fromkeys(usecols))
+    missing = [x for x in columns if x not in schema.names]
+    if missing:
+        raise ValueError(
+            f'Usecols do not match columns, columns expected but not found: {missing}'
+        )
+    return columns
+
+
+def write_cache_file(
+        datafile: str,
+        cache_file: Path,
+        fields: dict,
+        text_fields: set,
+        metadata: dict,
+        chunksize: int,
+        **kwargs,
+    ) -> Union[str, None]:
+    """Write the typed Parquet cache of a CCRS datafile, a chunk at a
+    time. Fields that can not be typed in the first chunk are added to
+    `text_fields` and cached as text.
+    Returns:
+        (str): Returns a field that could not be typed in a later chunk,
+            in which case the cache must be rewritten with the field as
+            text, otherwise `None`.
+    """
+    writer = None
+    try:
+        for data in pd.read_csv(datafile, chunksize=chunksize, **kwargs):
+            for column in data.columns:
+                dtype = fields.get(column)
+                if dtype is None or dtype == 'string' or column in text_fields:
+                    continue
+                try:
+                    data[column] = cast_column(data[column], dtype)
+                except (TypeError, ValueError, OverflowError):
+                    if writer is not None:
+                        return column
+                    text_fields.add(column)
+            if writer is None:
+                table = pa.Table.from_pandas(data, preserve_index=False)
+                schema = table.schema.with_metadata({
+                    **(table.schema.metadata or {}),
+                    **metadata,
+                })
+                writer = pq.ParquetWriter(cache_file, schema)
+            table = pa.Table.from_pandas(data, schema=schema, preserve_index=False)
+            writer.write_table(table, row_group_size=chunksize)
+        if writer is None:
+            data = pd.read_csv(datafile, nrows=0, **kwargs)
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                **metadata,
+            })
+            pq.write_table(table, cache_file)
+    finally:
+        if writer is not None:
+            writer.close()
+    return None
+
+
+def build_cache_file(
+        datafile: str,
+        dataset: Optional[str] = None,
+        sep: Optional[str] = '\t',
+        encoding: Optional[str] = 'utf-16',
+        on_bad_lines: Optional[str] = 'skip',
+        chunksize: Optional[int] = CCRS_CHUNK_SIZE,
+    ) -> Path:
+    """Transcode a CCRS datafile, a UTF-16, tab-separated export, to a
+    typed Parquet cache, a chunk of rows at a time. Fields are typed as
+    in `CCRS_DATASETS`, except for `CCRS_STRING_FIELDS` and any field
+    that can not be typed, which are cached as text. The size and
+    modified time of the datafile are saved in the metadata of the cache
+    to detect staleness.
+    Args:
+        datafile (str): The path of the datafile.
+        dataset (str): The key of the dataset in `CCRS_DATASETS`,
+            determined from the datafile name by default.
+        sep (str): The separator of the datafile, a tab by default.
+        encoding (str): The encoding of the datafile, UTF-16 by default.
+        on_bad_lines (str): What to do with bad lines, `skip` by default.
+        chunksize (int): The number of rows transcoded at a time and of
+            each row group of the cache.
+    Returns:
+        (Path): Returns the path of the Parquet cache.
+    """
+    signature = get_datafile_signature(datafile)
+    if dataset is None:
+        dataset = get_dataset_key(datafile)
+    fields = CCRS_DATASETS.get(dataset, {}).get('fields', {})
+    metadata = {b'ccrs_source': json.dumps(signature).encode()}
+    cache_file = get_cache_file(datafile)
+    temp_file = cache_file.with_suffix('.parquet.tmp')
+    text_fields = set(CCRS_STRING_FIELDS)
+    read_options = {
+        'sep': sep,
+        'encoding': encoding,
+        'dtype': 'string',
+        'on_bad_lines': on_bad_lines,
+    }
+    for engine in ['c', 'python']:
+        try:
+            while True:
+                column = write_cache_file(
+                    datafile,
+                    temp_file,
+                    fields,
+                    text_fields,
+                    metadata,
+                    chunksize,
+                    engine=engine,
+                    **read_options,
+                )
+                if column is None:
+                    break
+                text_fields.add(column)
+            break
+        except (pd.errors.ParserError, UnicodeError):
+            if engine == 'python':
+                raise
+    os.replace(temp_file, cache_file)
+    return cache_file
+
+
+def build_cache(
+        data_dir: str,
+        datasets: Optional[List[str]] = None,
+        force: Optional[bool] = False,
+        verbose: Optional[bool] = True,
+    ) -> dict:
+    """Transcode each CCRS datafile in a directory to a typed Parquet
+    cache, once, skipping datafiles with a fresh cache, so that loaders
+    read the cache instead of the datafile.
+    Args:
+        data_dir (str): The directory of unzipped CCRS datafiles.
+        datasets (list): The keys of the datasets in `CCRS_DATASETS`
+            to cache, all datasets by default.
+        force (bool): Whether or not to rebuild fresh caches, False by default.
+        verbose (bool): Whether or not to print progress, True by default.
+    Returns:
+        (dict): Returns the lists of `built` and `fresh` datafiles.
+    """
+    built, fresh = [], []
+    for dataset in datasets or CCRS_DATASETS.keys():
+        name = CCRS_DATASETS[dataset]['dataset']
+        for datafile in get_datafiles(data_dir, f'{name}_', desc=False):
+            if not os.path.exists(datafile):
+                continue
+            if not force and is_cache_fresh(datafile):
+                fresh.append(datafile)
+                continue
+            build_cache_file(datafile, dataset=dataset)
+            built.append(datafile)
+            if verbose:
+                print('Cached:', datafile)
+    return {'built': built, 'fresh': fresh}
+
+
+class DatafileResults(dict):
+    """The results of a function mapped over CCRS datafiles, keyed by
+    datafile in the order of the datafiles. Errors are recorded in `errors`."""
+
+    def __init__(self, datafiles: List[str]):
+        """Initialize the results of mapping datafiles.
+        Args:
+            datafiles (list): The datafiles that were mapped.
+        """
+        super().__init__()
+        self.datafiles = datafiles
+        self.errors = {}
+
+    def __repr__(self):
+        return f'<DatafileResults {len(self)} of {len(self.datafiles)} datafiles succeeded>'
+
+    @property
+    def ok(self) -> bool:
+        """Whether or not the function succeeded for all datafiles."""
+        return not self.errors
+
+    @property
+    def succeeded(self) -> List[str]:
+        """The datafiles for which the function succeeded."""
+        return [x for x in self.datafiles if x in self]
+
+    @property
+    def failed(self) -> List[str]:
+        """The datafiles for which the function failed."""
+        return [x for x in self.datafiles if x in self.errors]
+
+    def raise_for_errors(self):
+        """Raise the error of the first failed datafile, if any."""
+        for datafile in self.failed:
+            raise self.errors[datafile]
+
+
+def set_memory_limit(max_memory: Optional[int] = None):
+    """Limit the memory, in bytes, of the current process, so that a
+    process that exceeds the limit raises a `MemoryError`."""
+    if max_memory and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+
+def map_datafile(fn: Callable, datafile: str, args: tuple, kwargs: dict):
+    """Call a function for a datafile, collecting garbage afterwards."""
+    try:
+        return fn(datafile, *args, **kwargs)
+    finally:
+        gc.collect()
+
+
+def map_datafile_alone(
+        fn: Callable,
+        datafile: str,
+        args: tuple,
+        kwargs: dict,
+        max_memory: Optional[int] = None,
+    ):
+    """Call a function for a datafile in a process of its own, so that
+    a crash of the process fails only this datafile."""
+    with ProcessPoolExecutor(
+            max_workers=1,
+            initializer=set_memory_limit,
+            initargs=(max_memory,),
+        ) as executor:
+        return executor.submit(map_datafile, fn, datafile, args, kwargs).result()
+
+
+def map_datafiles(
+        datafiles: List[str],
+        fn: Callable,
+        args: Optional[tuple] = (),
+        kwargs: Optional[dict] = None,
+        workers: Optional[int] = 1,
+        max_memory: Optional[int] = None,
+        verbose: Optional[bool] = True,
+    ) -> DatafileResults:
+    """Call a function for each CCRS datafile in a pool of processes,
+    as datafiles can be curated independently. Each worker's memory can
+    be limited, so that a datafile too large to curate fails with a
+    `MemoryError`. A worker that is killed, e.g. by the operating system
+    when out of memory, breaks the pool, so the datafiles that were
+    pending are retried in a process each, failing only the datafiles
+    whose process is killed again.
+    Args:
+        datafiles (list): The datafiles to map.
+        fn (Callable): A function of a datafile, defined at the top level
+            of a module, so that it can be called in another process.
+        args (tuple): Any other positional arguments of the function.
+        kwargs (dict): Any keyword arguments of the function.
+        workers (int): The number of processes, 1 by default, as each
+            process may read a datafile of many gigabytes. If 0, the
+            datafiles are mapped in this process.
+        max_memory (int): The most bytes of address space of each
+            worker, not limited by default. Only allocations that Python
+            can fail are limited. Not available on Windows.
+        verbose (bool): Whether or not to print progress, True by default.
+    Returns:
+        (DatafileResults): Returns the result of each datafile that
+            succeeded, in the order of the datafiles, and the error of
+            each datafile that failed in `errors`.
+    """
+    datafiles = [str(x) for x in datafiles]
+    kwargs = kwargs or {}
+    results = DatafileResults(datafiles)
+    if not datafiles:
+        return results
+
+    # Map the datafiles in this process.
+    outcomes = {}
+    if workers == 0:
+        for datafile in datafiles:
+            try:
+                outcomes[datafile] = (map_datafile(fn, datafile, args, kwargs), None)
+            except Exception as error:
+                outcomes[datafile] = (None, error)
+
+    # Map the datafiles in a pool of processes, retrying the datafiles
+    # pending when a worker is killed in a process each.
+    else:
+        workers = min(workers or 1, len(datafiles))
+        broken = []
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=set_memory_limit,
+                initargs=(max_memory,),
+            ) as executor:
+            futures = {
+                x: executor.submit(map_datafile, fn, x, args, kwargs)
+                for x in datafiles
+            }
+            for datafile, future in futures.items():
+                try:
+                    outcomes[datafile] = (future.result(), None)
+                except BrokenProcessPool:
+                    broken.append(datafile)
+                except Exception as error:
+                    outcomes[datafile] = (None, error)
+
+        def retry(datafile):
+            try:
+                return map_datafile_alone(fn, datafile, args, kwargs, max_memory), None
+            except Exception as error:
+                return None, error
+
+        if broken:
+            if verbose:
+                print('Worker killed, retrying %i datafiles.' % len(broken))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes.update(zip(broken, executor.map(retry, broken)))
+
+    # Record the results in the order of the datafiles.
+    for datafile in datafiles:
+        data, error = outcomes[datafile]
+        if error is None:
+            results[datafile] = data
+            if verbose:
+                print('Mapped:', datafile)
+        else:
+            results.errors[datafile] = error
+            if verbose:
+                print('Failed:', datafile, error)
+    return results
+
+
+def read_datafile(
+        datafile: str,
+        dtype: Optional[dict] = None,
+        usecols: Optional[List[str]] = None,
+        parse_dates: Optional[List[str]] = None,
+        on_bad_lines: Optional[str] = 'skip',
+        sep: Optional[str] = '\t',
+        encoding: Optional[str] = 'utf-16',
+        engine: Optional[str] = 'python',
+        cache: Optional[bool] = True,
+    ) -> pd.DataFrame:
+    """Read a CCRS datafile, from its Parquet cache if the cache is
+    fresh, otherwise from the datafile itself.
+    Args:
+        datafile (str): The path of the datafile.
+        dtype (dict): The types of columns.
+        usecols (list): The columns to read, all columns by default.
+        parse_dates (list): The columns to parse as dates.
+        on_bad_lines (str): What to do with bad lines, `skip` by default.
+        sep (str): The separator of the datafile, a tab by default.
+        encoding (str): The encoding of the datafile, UTF-16 by default.
+        engine (str): The parser engine of the datafile, `python` by default.
+        cache (bool): Whether or not to read from the cache, True by default.
+    Returns:
+        (DataFrame): Returns the data.
+    """
+    dtype = dtype or {}
+    parse_dates = parse_dates or []
+    if cache and is_cache_fresh(datafile):
+        cache_file = get_cache_file(datafile)
+        columns = get_cache_columns(pq.read_schema(cache_file), usecols)
+        data = pd.read_parquet(cache_file, columns=columns)
+        return cast_columns(data, dtype, parse_dates)
+    return pd.read_csv(datafile,
+                       sep=sep,
+                       encoding=encoding,
+                       engine=engine,
+                       parse_dates=parse_dates,
+                       dtype=dtype,
+                       usecols=usecols,
+                       on_bad_lines=on_bad_lines)
+
+
+def iter_datafile(
+        datafile: str,
+        chunksize: Optional[int] = CCRS_CHUNK_SIZE,
+        dtype: Optional[dict] = None,
+        usecols: Optional[List[str]] = None,
+        parse_dates: Optional[List[str]] = None,
+        on_bad_lines: Optional[str] = 'skip',
+        sep: Optional[str] = '\t',
+        encoding: Optional[str] = 'utf-16',
+        engine: Optional[str] = 'python',
+        cache: Optional[bool] = True,
+    ):
+    """Iterate over typed chunks of a CCRS datafile, reading only the
+    given columns, from its Parquet cache if the cache is fresh,
+    otherwise from the datafile itself, so that memory is proportional
+    to the number of rows of a chunk rather than the datafile.
+    Args:
+        datafile (str): The path of the datafile.
+        chunksize (int): The number of rows of each chunk.
+        dtype (dict): The types of columns.
+        usecols (list): The columns to read, all columns by default.
+        parse_dates (list): The columns to parse as dates.
+        on_bad_lines (str): What to do with bad lines, `skip` by default.
+        sep (str): The separator of the datafile, a tab by default.
+        encoding (str): The encoding of the datafile, UTF-16 by default.
+        engine (str): The parser engine of the datafile, `python` by default.
+        cache (bool): Whether or not to read from the cache, True by default.
+    Yields:
+        (DataFrame): Yields each chunk of the data.
+    """
+    dtype = dtype or {}
+    parse_dates = parse_dates or []
+    if cache and is_cache_fresh(datafile):
+        parquet_file = pq.ParquetFile(get_cache_file(datafile))
+        columns = get_cache_columns(parquet_file.schema_arrow, usecols)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield cast_columns(batch.to_pandas(), dtype, parse_dates)
+        return
+    yield from pd.read_csv(datafile,
+                           sep=sep,
+                           encoding=encoding,
+                           engine=engine,
+                           parse_dates=parse_dates,
+                           dtype=dtype,
+                           usecols=usecols,
+                           on_bad_lines=on_bad_lines,
+                           chunksize=chunksize)
+
+
+class DatasetIndex(object):
+    """An index of the datafile and row of each key in a set of CCRS
+    datafiles, built once and saved to disk, so that the rows of many
+    keys can be found with one lookup and read without reading the
+    other rows of the datafiles."""
+
+    def __init__(
+            self,
+            datafiles: List[str],
+            on: str,
+            path: Optional[str] = None,
+            chunksize: Optional[int] = CCRS_CHUNK_SIZE,
+            on_bad_lines: Optional[str] = 'skip',
+            sep: Optional[str] = '\t',
+            encoding: Optional[str] = 'utf-16',
+            engine: Optional[str] = 'python',
+        ):
+        """Initialize an index of datafiles, loading the index from
+        disk if it exists and indexing any new or changed datafiles.
+        Args:
+            datafiles (list): The datafiles to index.
+            on (str): The column of the keys.
+            path (str): A Parquet file to save the index (optional).
+            chunksize (int): The number of rows read at a time.
+            on_bad_lines (str): What to do with bad lines, `skip` by default.
+            sep (str): The separator of the datafiles, a tab by default.
+            encoding (str): The encoding of the datafiles, UTF-16 by default.
+            engine (str): The parser engine of the datafiles, `python` by default.
+        """
+        self.datafiles = [str(x) for x in datafiles]
+        self.on = on
+        self.path = path
+        self.chunksize = chunksize
+        self.read_options = {
+            'on_bad_lines': on_bad_lines,
+            'sep': sep,
+            'encoding': encoding,
+            'engine': engine,
+        }
+        self.sources = {}
+        self.index = pd.DataFrame({
+            'key': pd.Series(dtype='string'),
+            'datafile': pd.Series(dtype='string'),
+            'row': pd.Series(dtype='int64'),
+        })
+        if path is not None and os.path.exists(path):
+            self.load(path)
+        self.update()
+
+    def __len__(self):
+        return len(self.index)
+
+    def get_source(self, datafile: str) -> dict:
+        """Get the signature of a datafile and whether its rows are read
+        from its cache, as rows are numbered by the file they are read from."""
+        return {
+            **get_datafile_signature(datafile),
+            'cache': is_cache_fresh(datafile),
+        }
+
+    def update(self) -> List[str]:
+        """Index any new or changed datafiles, saving the index if it
+        has a path.
+        Returns:
+            (list): Returns the datafiles that were indexed.
+        """
+        stale = []
+        for datafile in self.datafiles:
+            source = self.get_source(datafile)
+            if self.sources.get(datafile) != source:
+                stale.append(datafile)
+                self.sources[datafile] = source
+        if not stale:
+            return stale
+        entries = [self.index.loc[~self.index['datafile'].isin(stale)]]
+        for datafile in stale:
+            offset = 0
+            for chunk in iter_datafile(
+                    datafile,
+                    chunksize=self.chunksize,
+                    dtype={self.on: 'string'},
+                    usecols=[self.on],
+                    **self.read_options,
+                ):
+                entries.append(pd.DataFrame({
+                    'key': chunk[self.on].astype('string').to_numpy(),
+                    'datafile': datafile,
+                    'row': np.arange(offset, offset + len(chunk), dtype='int64'),
+                }).astype({'key': 'string', 'datafile': 'string'}))
+                offset += len(chunk)
+        self.index = pd.concat(entries, ignore_index=True)
+        if self.path is not None:
+            self.save()
+        return stale
+
+    def save(self, path: Optional[str] = None):
+        """Save the index to a Parquet file."""
+        path = path or self.path
+        table = pa.Table.from_pandas(self.index, preserve_index=False)
+        metadata = {'on': self.on, 'sources': self.sources}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'ccrs_index': json.dumps(metadata).encode(),
+        })
+        temp_file = f'{path}.tmp'
+        pq.write_table(table, temp_file)
+        os.replace(temp_file, path)
+
+    def load(self, path: Optional[str] = None):
+        """Load the index from a Parquet file, if the index has the
+        same key column."""
+        table = pq.read_table(path or self.path)
+        metadata = json.loads((table.schema.metadata or {}).get(b'ccrs_index', b'{}'))
+        if metadata.get('on') != self.on:
+            return
+        self.index = table.to_pandas().astype({'key': 'string', 'datafile': 'string'})
+        self.sources = metadata.get('sources', {})
+
+    def lookup(self, keys) -> pd.DataFrame:
+        """Find the datafile and row of each of the given keys.
+        Args:
+            keys (list): The keys to find.
+        Returns:
+            (DataFrame): Returns the `key`, `datafile`, and `row` of
+                each row with one of the keys.
+        """
+        keys = pd.Series(keys).dropna().astype('string').unique()
+        return self.index.loc[self.index['key'].isin(keys)]
+
+    def read_rows(
+            self,
+            datafile: str,
+            rows: np.ndarray,
+            dtype: Optional[dict] = None,
+            usecols: Optional[List[str]] = None,
+            parse_dates: Optional[List[str]] = None,
+        ) -> pd.DataFrame:
+        """Read only the given rows of a datafile. From a Parquet cache,
+        only the row groups with the rows are read, otherwise the
+        datafile is read a chunk at a time, keeping only the rows.
+        Args:
+            datafile (str): The path of the datafile.
+            rows (ndarray): The numbers of the rows to read.
+            dtype (dict): The types of columns.
+            usecols (list): The columns to read, all columns by default.
+            parse_dates (list): The columns to parse as dates.
+        Returns:
+            (DataFrame): Returns the rows in the order of the datafile.
+        """
+        rows = np.unique(np.asarray(rows, dtype='int64'))
+        if self.get_source(datafile)['cache']:
+            parquet_file = pq.ParquetFile(get_cache_file(datafile))
+            metadata = parquet_file.metadata
+            sizes = np.array([
+                metadata.row_group(i).num_rows
+                for i in range(metadata.num_row_groups)
+            ], dtype='int64')
+            ends = np.cumsum(sizes)
+            row_groups = np.searchsorted(ends, rows, side='right')
+            groups = np.unique(row_groups)
+            offsets = np.cumsum(sizes[groups]) - sizes[groups]
+            positions = rows - (ends - sizes)[row_groups] + \
+                offsets[np.searchsorted(groups, row_groups)]
+            columns = get_cache_columns(parquet_file.schema_arrow, usecols)
+            table = parquet_file.read_row_groups(groups.tolist(), columns=columns)
+            data = table.take(pa.array(positions)).to_pandas()
+            return cast_columns(data, dtype, parse_dates)
+        matches, offset = [], 0
+        for chunk in iter_datafile(
+                datafile,
+                chunksize=self.chunksize,
+                dtype=dtype,
+                usecols=usecols,
+                parse_dates=parse_dates,
+                cache=False,
+                **self.read_options,
+            ):
+            lower, upper = np.searchsorted(rows, [offset, offset + len(chunk)])
+            if upper > lower:
+                matches.append(chunk.iloc[rows[lower:upper] - offset])
+            offset += len(chunk)
+        if not matches:
+            return chunk.iloc[:0] if offset else pd.DataFrame()
+        return pd.concat(matches, ignore_index=True)
 
 
 def load_supplement_data(
@@ -150,16 +943,35 @@ def load_supplement_data(
         sep: str = '\t',
         encoding: str = 'utf-16',
         engine: str = 'python',
+        chunksize: Optional[int] = None,
+        on: Optional[str] = None,
+        keys: Optional[pd.Series] = None,
     ) -> pd.DataFrame:
-    """Load supplement data from a specified data file."""
-    return pd.read_csv(datafile,
-                       sep=sep,
-                       encoding=encoding,
-                       engine=engine,
-                       parse_dates=parse_dates,
-                       dtype=dtype,
-                       usecols=usecols,
-                       on_bad_lines=on_bad_lines)
+    """Load supplement data from a specified data file, or its cache.
+    If a `chunksize` is given, the data is read a chunk at a time,
+    keeping only rows with a value of `on`, a column of the datafile,
+    in the given `keys`."""
+    kwargs = {
+        'dtype': dtype,
+        'usecols': usecols,
+        'parse_dates': parse_dates,
+        'on_bad_lines': on_bad_lines,
+        'sep': sep,
+        'encoding': encoding,
+        'engine': engine,
+    }
+    if not chunksize:
+        return read_datafile(datafile, **kwargs)
+    matches = []
+    for chunk in iter_datafile(datafile, chunksize=chunksize, **kwargs):
+        if keys is not None:
+            if on not in chunk.columns:
+                raise ValueError(f'Can not filter {datafile} on {on}, not a column of the datafile.')
+            chunk = chunk.loc[chunk[on].isin(keys)]
+        matches.append(chunk)
+    if not matches:
+        return pd.DataFrame(columns=list(dict.fromkeys(usecols or [])))
+    return pd.concat(matches, ignore_index=True)
 
 
 def preprocess_supplement(
@@ -193,9 +1005,9 @@ def merge_datasets(
         rename: Optional[dict] = None,
         break_once_matched: Optional[bool] = True,
         on_bad_lines: Optional[str] = 'skip',
-        string_columns: Optional[list] = [
-            'IsDeleted', 'UnitWeightGrams',
-            'TestValue', 'IsQuarantine'],
+        string_columns: Optional[list] = CCRS_STRING_FIELDS,
+        chunksize: Optional[int] = None,
+        index: Optional[Union[bool, str, DatasetIndex]] = None,
     ) -> pd.DataFrame:
     """
     Merge multiple datasets into a single DataFrame.
@@ -204,7 +1016,8 @@ def merge_datasets(
         df: The initial DataFrame to merge onto.
         datafiles: A list of file paths containing the datasets to merge.
         dataset: The name of the dataset being merged.
-        on: The column to merge on. Defaults to 'id'.
+        on: The column to merge on, after any `rename` of the supplemental
+            dataset. Defaults to 'id'.
         target: The target column. Defaults to empty string.
         how: How to merge the dataframes. Defaults to 'left'.
         sep: The separator used in the data files. Defaults to '\t'.
@@ -215,13 +1028,24 @@ def merge_datasets(
         break_once_matched: Whether to break after a match is found. Defaults to True.
         on_bad_lines: What to do when bad lines are encountered. Defaults to 'skip'.
         string_columns: Columns to force read as strings. Defaults to ['IsDeleted', 'UnitWeightGrams', 'TestValue', 'IsQuarantine'].
+        chunksize: The number of rows of each datafile to read at a time,
+            keeping only rows that match the initial DataFrame, so that
+            memory is proportional to the chunk size rather than the
+            datafile. Defaults to None, reading each datafile at once.
+        index: A `DatasetIndex` of the datafiles on the `on` column, True
+            to build an index, or the path of an index to load, update,
+            and save, to read only the rows of the datafiles with keys in
+            the initial DataFrame. Only used for left and inner merges.
+            An index is only built with True if every datafile has a
+            fresh cache, as an index that is not saved costs a full read
+            of the datafiles to build. Defaults to None, reading each
+            datafile in full.
 
     Returns:
         A DataFrame that is the result of merging all datasets.
     """
 
     n = len(df)
-    augmented = pd.DataFrame()
     fields = CCRS_DATASETS[dataset]['fields']
     parse_dates = CCRS_DATASETS[dataset]['date_fields']
     usecols = list(fields.keys()) + parse_dates
@@ -229,19 +1053,68 @@ def merge_datasets(
     for column in string_columns:
         if dtype.get(column):
             dtype[column] = 'string'
+    keys, rows = None, None
+    source_on = {v: k for k, v in (rename or {}).items()}.get(on, on)
+    if how in ['left', 'inner'] and on in df.columns:
+        if chunksize:
+            keys = df[on].dropna().unique()
+        if index is True and not all(is_cache_fresh(x) for x in datafiles):
+            warnings.warn('Not indexing datafiles without a fresh cache or an index path, '
+                          'as the index would be built and discarded. Merging the datafiles.')
+            index = None
+        if index is True or isinstance(index, (str, Path)):
+            index = DatasetIndex(
+                datafiles,
+                source_on,
+                path=None if index is True else str(index),
+                on_bad_lines=on_bad_lines,
+                sep=sep,
+            )
+        if index is not None:
+            hits = index.lookup(df[on])
+            rows = {k: v['row'].to_numpy() for k, v in hits.groupby('datafile')}
+    augmented, count = [], 0
     for datafile in datafiles:
-        datafile = Path(datafile)
-        print(datafile) # TODO: replace with logging
-        supplement = load_supplement_data(datafile, dtype, usecols, parse_dates, on_bad_lines, sep)
+        if rows is not None:
+            if str(datafile) in rows:
+                supplement = index.read_rows(
+                    str(datafile),
+                    rows[str(datafile)],
+                    dtype=dtype,
+                    usecols=usecols,
+                    parse_dates=parse_dates,
+                )
+            elif augmented or str(datafile) != str(datafiles[-1]):
+                continue
+            else:
+                # Merge no rows for the columns of the merged data.
+                supplement = pd.DataFrame(columns=list(dict.fromkeys(usecols)))
+        else:
+            datafile = Path(datafile)
+            print(datafile) # TODO: replace with logging
+            supplement = load_supplement_data(
+                datafile,
+                dtype,
+                usecols,
+                parse_dates,
+                on_bad_lines,
+                sep,
+                chunksize=chunksize,
+                on=source_on,
+                keys=keys,
+            )
         supplement = preprocess_supplement(supplement, on, rename, drop, dedupe)
         if dataset == 'lab_results':
             supplement = format_lab_results(df, supplement)
         match = rmerge(df, supplement, on=on, how=how, validate=validate)
         matched = match.loc[~match[target].isna()]
-        augmented = pd.concat([augmented, matched], ignore_index=True)
-        if len(augmented) == n and break_once_matched:
+        augmented.append(matched)
+        count += len(matched)
+        if count == n and break_once_matched:
             break
-    return augmented
+    if not augmented:
+        return pd.DataFrame()
+    return pd.concat(augmented, ignore_index=True)
 
 
 def save_dataset(
@@ -322,11 +1195,16 @@ class CCRS(object):
         self.plant_states = CCRS_PLANT_STATES
         self.curated_datasets = CURATED_CCRS_DATASETS
         self.anonymize = anonymize
+        self.build_cache_file = build_cache_file
         self.find_detections = find_detections
         self.format_lab_results = format_lab_results
         self.format_test_value = format_test_value
         self.get_datafiles = get_datafiles
+        self.iter_datafile = iter_datafile
+        self.DatafileResults = DatafileResults
         self.merge_datasets = merge_datasets
+        self.DatasetIndex = DatasetIndex
+        self.read_datafile = read_datafile
         self.save_dataset = save_dataset
         self.standardize_dataset = standardize_dataset
         self.unzip_datafiles = unzip_datafiles
@@ -334,6 +1212,74 @@ class CCRS(object):
             self.initialize_logs()
 
 
+    def build_cache(self, datasets=None, force=False):
+        """Transcode each CCRS datafile in the data directory to a typed
+        Parquet cache, once, so that datafiles are read from the cache.
+        Args:
+            datasets (list): The datasets to cache, all datasets by default.
+            force (bool): Whether or not to rebuild fresh caches, False by default.
+        Returns:
+            (dict): Returns the lists of `built` and `fresh` datafiles.
+        """
+        return build_cache(
+            self.data_dir,
+            datasets=datasets,
+            force=force,
+            verbose=self.logs,
+        )
+
+
+    def map_datafiles(
+            self,
+            dataset,
+            fn,
+            args=(),
+            kwargs=None,
+            workers=1,
+            max_memory=None,
+            desc=False,
+        ):
+        """Call a function for each datafile of a dataset in a pool of
+        processes, e.g. to curate each sales datafile.
+        Args:
+            dataset (str or list): The key of a dataset in `CCRS_DATASETS`,
+                e.g. `sale_details`, or a list of datafiles.
+            fn (Callable): A top-level function of a datafile.
+            args (tuple): Any other positional arguments of the function.
+            kwargs (dict): Any keyword arguments of the function.
+            workers (int): The number of processes, 1 by default. If 0,
+                the datafiles are mapped in this process.
+            max_memory (int): The most bytes of address space of each
+                worker, not limited by default.
+            desc (bool): Whether or not to map the datafiles of a dataset
+                in descending order, False by default.
+        Returns:
+            (DatafileResults): Returns the result of each datafile that
+                succeeded, in the order of the datafiles, and the error
+                of each datafile that failed in `errors`.
+        """
+        if isinstance(dataset, str):
+            name = CCRS_DATASETS[dataset]['dataset']
+            datafiles = get_datafiles(self.data_dir, f'{name}_', desc=desc)
+            datafiles = [x for x in datafiles if os.path.exists(x)]
+        else:
+            datafiles = list(dataset)
+        results = map_datafiles(
+            datafiles,
+            fn,
+            args=args,
+            kwargs=kwargs,
+            workers=workers,
+            max_memory=max_memory,
+            verbose=False,
+        )
+        if self.logs:
+            for datafile in results.failed:
+                self.create_log(f'Failed: {datafile} {results.errors[datafile]}')
+            self.create_log(f'Mapped {len(results)} of {len(datafiles)} datafiles.')
+        return results
+
+
     def create_log(self, action):
         """Create a log given an HTTP response.
         Args:
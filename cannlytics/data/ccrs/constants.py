@@ -6,7 +6,7 @@ Authors:
     Keegan Skeate <https://github.com/keeganskeate>
     Candace O'Sullivan-Sutherland <https://github.com/candy-o>
 Created: 4/12/2022
-Updated: 1/3/2023
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 Description: Helpful CCRS constants.
@@ -410,6 +410,18 @@ CCRS_DATASETS = {
     },
 }
 
+# The default number of rows of CCRS datafiles read at a time.
+CCRS_CHUNK_SIZE = 250_000
+
+# CCRS fields read as text, as their values are not always valid for
+# their types.
+CCRS_STRING_FIELDS = [
+    'IsDeleted',
+    'UnitWeightGrams',
+    'TestValue',
+    'IsQuarantine',
+]
+
 # CCRS analyses.
 CCRS_ANALYSES = {
     'Foreign Matter': 'foreign_matter',
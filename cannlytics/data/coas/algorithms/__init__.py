@@ -0,0 +1,314 @@
+"""
+CoA Parsing Algorithms | Cannlytics
+Copyright (c) 2022-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    A registry of the labs and LIMS that CoADoc can parse. The details
+    of each lab and LIMS live here, apart from the parsing algorithms,
+    so that the algorithms, and their dependencies, are only imported
+    when they are first used.
+
+"""
+
+# It is assumed that the labs have the following details.
+ACS_LABS = {
+    'coa_algorithm': 'acs.py',
+    'coa_algorithm_entry_point': 'parse_acs_coa',
+    'lims': 'ACS Labs',
+    'url': 'https://portal.acslabcannabis.com',
+    'lab': 'ACS Labs',
+    'lab_license_number': 'CMTL-0003',
+    'lab_image_url': 'https://global-uploads.webflow.com/630470e960f8722190672cb4/6305a2e849811b34bf18777d_Desktop%20Logo.svg',
+    'lab_address': '721 Cortaro Dr, Sun City Center, FL 33573',
+    'lab_street': '721 Cortaro Dr',
+    'lab_city': 'Sun City Center',
+    'lab_county': 'Hillsborough County',
+    'lab_state': 'FL',
+    'lab_zipcode': '33573',
+    'lab_phone': '813-634-4529',
+    'lab_email': 'info@acslabcannabis.com',
+    'lab_website': 'https://www.acslabcannabis.com/',
+    'lab_latitude': 27.713506,
+    'lab_longitude': -82.371029,
+}
+
+ANRESCO = {
+    'coa_algorithm': 'anresco.py',
+    'coa_algorithm_entry_point': 'parse_anresco_coa',
+    'lims': 'Anresco Laboratories',
+    'lab': 'Anresco Laboratories',
+    'lab_image_url': 'https://anresco.com/wp-content/uploads/thegem-logos/logo_2258c6b0a6f4e626a22edd2f64dc588b_2x.png',
+    'lab_website': 'www.anresco.com',
+    'lab_address': '1375 Van Dyke Ave, San Francisco, CA 94124',
+    'lab_street': '1375 Van Dyke Ave',
+    'lab_city': 'San Francisco',
+    'lab_state': 'CA',
+    'lab_zipcode': '94124',
+    'lab_latitude': 37.726610,
+    'lab_longitude': -122.388450,
+    'public': True,
+}
+
+CANNALYSIS = {
+    'coa_algorithm': 'cannalysis.py',
+    'coa_algorithm_entry_point': 'parse_cannalysis_coa',
+    'url': 'www.cannalysis.com',
+    'lims': 'Cannalysis',
+    'lab': 'Cannalysis',
+    'lab_license_number': 'C8-0000012-LIC',
+    'lab_image_url': 'https://www.cannalysis.com/img/img.c5effdd3.png',
+    'lab_address': '1801 Carnegie Ave, Santa Ana CA 92705',
+    'lab_street': '1801 Carnegie Ave',
+    'lab_city': 'Santa Ana',
+    'lab_county': 'Orange',
+    'lab_state': 'CA',
+    'lab_zipcode': '92705',
+    'lab_latitude': 33.712190,
+    'lab_longitude': -117.844650,
+    'lab_phone': '949-329-8378',
+    'lab_email': 'support@cannalysislabs.com',
+    'lab_website': 'www.cannalysis.com',
+}
+
+CONFIDENCE = {
+    'coa_algorithm': 'confidence.py',
+    'coa_algorithm_entry_point': 'parse_confidence_coa',
+    'lims': 'Confidence Analytics',
+    'url': 'https://certs.conflabs.com',
+    'lab': 'Confidence Analytics',
+    'lab_website': 'https://conflabs.com',
+    'lab_license_number': '7939083039',
+    'lab_image_url': 'https://www.conflabs.com/wp-content/uploads/2022/06/CA_3_transparent_registered-2.png',
+    'lab_address': '14797 NE 95th St, Redmond, WA 98502',
+    'lab_street': '14797 NE 95th St',
+    'lab_city': 'Redmond',
+    'lab_county': 'King',
+    'lab_state': 'WA',
+    'lab_zipcode': '98052',
+    'lab_latitude': 47.685890,
+    'lab_longitude': -122.143640,
+    'lab_phone': '(206) 743-8843',
+    'lab_email': 'info@conflabs.com',
+}
+
+CONFIDENT_CANNABIS = {
+    'coa_algorithm': 'confidentcannabis.py',
+    'coa_algorithm_entry_point': 'parse_cc_coa',
+    'lims': 'Con\x00dent Cannabis',
+    'url': 'https://orders.confidentcannabis.com',
+    'public': True,
+}
+
+# Future work: Make this dynamic to handle multiple lab locations.
+# E.g. Green Leaf Lab has a California and an Oregon location.
+GREEN_LEAF_LAB = {
+    'coa_algorithm': 'greenleaflab.py',
+    'coa_algorithm_entry_point': 'parse_green_leaf_lab_pdf',
+    'lims': 'Green Leaf Lab',
+    'lab': 'Green Leaf Lab',
+    'lab_image_url': 'https://cdn-djjmk.nitrocdn.com/MuWSCTBsUZpIUufaWqGQkErSrYFMxIqD/assets/static/optimized/rev-a199899/wp-content/uploads/2018/12/greenleaf-logo.png',
+    'lab_license_number': ' C8-0000078-LIC', # <- Make dynamic.
+    'lab_address': '251 Lathrop Way Suites D&E Sacramento, CA 95815', # <- Make dynamic.
+    'lab_street': '251 Lathrop Way Suites D&E', # <- Make dynamic.
+    'lab_city': 'Sacramento', # <- Make dynamic.
+    'lab_county': 'Sacramento', # <- Make dynamic.
+    'lab_state': 'CA', # <- Make dynamic.
+    'lab_zipcode': '95815', # <- Make dynamic.
+    'lab_phone': '916-924-5227', # <- Make dynamic.
+    'lab_email': '', # <- Make dynamic.
+    'lab_website': 'https://greenleaflab.org/',
+    'lab_latitude': 38.596060, # <- Make dynamic.
+    'lab_longitude': -121.459870, # <- Make dynamic.
+}
+
+GREEN_SCIENTIFIC_LABS = {
+    'coa_algorithm': 'green_scientific.py',
+    'coa_algorithm_entry_point': 'parse_green_scientific_coa',
+    # 'url': 'https://www.verifycbd.com',
+    'url': 'https://www.greenscienti', # The f parses incorrectly
+    'lims': 'Green Scientific Labs',
+    'lab': 'Green Scientific Labs',
+    'lab_license_number': 'CMTL-0004',
+    'lab_image_url': 'https://www.greenscientificlabs.com/assets/images/logo-blue.png',
+    'lab_address': '4001 SW 47th Avenue, Suite 208, Davie, FL 33314',
+    'lab_street': '4001 SW 47th Avenue, Suite 208',
+    'lab_city': 'Davie',
+    'lab_county': 'Broward',
+    'lab_state': 'FL',
+    'lab_zipcode': '33314',
+    'lab_phone': '(954) 514-9343',
+    'lab_email': 'info@greenscientificlabs.com',
+    'lab_website': 'https://www.greenscientificlabs.com/',
+    'lab_latitude': 26.071350,
+    'lab_longitude': -80.210750,
+}
+
+KAYCHA_LABS = {
+    'coa_algorithm': 'kaycha.py',
+    'coa_algorithm_entry_point': 'parse_kaycha_coa',
+    'lims': 'Kaycha Labs',
+    'lab': 'Kaycha Labs',
+    'lab_image_url': 'https://www.kaychalabs.com/wp-content/uploads/2020/06/newlogo-2.png',
+    'lab_address': '4101 SW 47th Ave, Suite 105, Davie, FL 33314',
+    'lab_street': '4101 SW 47th Ave, Suite 105',
+    'lab_city': 'Davie',
+    'lab_county': 'Broward',
+    'lab_state': 'FL',
+    'lab_zipcode': '33314',
+    'lab_phone': '833-465-8378',
+    'lab_email': 'info@kaychalabs.com',
+    'lab_website': 'https://www.kaychalabs.com/',
+    'lab_latitude': 26.071350,
+    'lab_longitude': -80.210750,
+    # FIXME: Make license number dynamic as Kaycha Labs operate in multiple states.
+    'lab_license_number': 'CMTL-0002',
+}
+
+MCR_LABS = {
+    'coa_algorithm': 'mcrlabs.py',
+    'coa_algorithm_entry_point': 'parse_mcrlabs_coa',
+    'lims': 'MCR Labs',
+    'url': 'https://reports.mcrlabs.com',
+    'lab': 'MCR Labs',
+    'lab_website': 'https://mcrlabs.com',
+    'lab_license_number': 'IL281277',
+    'lab_image_url': '',
+    'lab_address': '85 Speen St. Lower Level, Framingham, MA 01701',
+    'lab_street': '85 Speen St. Lower Level',
+    'lab_city': 'Framingham',
+    'lab_county': 'Middlesex',
+    'lab_state': 'MA',
+    'lab_zipcode': '01701',
+    'lab_latitude': 42.310820,
+    'lab_longitude': -71.386920,
+    'lab_phone': '508-872-6666',
+    'lab_email': 'hello@mcrlabs.com',
+}
+
+SC_LABS = {
+    'coa_algorithm': 'sclabs.py',
+    'coa_algorithm_entry_point': 'parse_sc_labs_coa',
+    'lims': 'SC Labs',
+    'url': 'https://client.sclabs.com',
+    'lab': 'SC Labs',
+    'lab_image_url': 'https://www.sclabs.com/wp-content/uploads/2020/11/sc-labs-logo-white.png',
+    'lab_email': 'info@sclabs.com',
+    'lab_website': 'https://sclabs.com',
+}
+
+SONOMA = {
+    'coa_algorithm': 'sonoma.py',
+    'coa_algorithm_entry_point': 'parse_sonoma_coa',
+    'lims': 'Sonoma Lab Works',
+    'lab': 'Sonoma Lab Works',
+    'lab_license_number': 'C8-0000015-LIC',
+    'lab_image_url': 'https://images.squarespace-cdn.com/content/v1/6072f29fa4b8d3121b2f9fbc/1623325374642-KXUXXMCSCVBYPYMFPTUS/slw-logo.png?format=1500w',
+    'lab_address': '1201 Corporate Center Parkway, Santa Rosa, CA 95407',
+    'lab_street': '1201 Corporate Center Parkway',
+    'lab_city': 'Santa Rosa',
+    'lab_county': 'Sonoma',
+    'lab_state': 'CA',
+    'lab_zipcode': '95407',
+    'lab_latitude': 38.421600,
+    'lab_longitude': -122.752990,
+    'lab_phone': '707-757-7757',
+    'lab_email': 'testing@sonomalabworks.com',
+    'lab_website': 'https://www.sonomalabworks.com/',
+}
+
+TAGLEAF = {
+    'coa_algorithm': 'tagleaf.py',
+    'coa_algorithm_entry_point': 'parse_tagleaf_coa',
+    'lims': 'lims.tagleaf',
+    'url': 'https://lims.tagleaf.com',
+    'public': True,
+}
+
+TERPLIFE_LABS = {
+    'coa_algorithm': 'terplife.py',
+    'coa_algorithm_entry_point': 'parse_terplife_coa',
+    'url': 'www.terplifelabs.com',
+    'lims': 'TerpLife Labs',
+    'lab': 'TerpLife Labs',
+    'lab_license_number': 'CMTL-00010',
+    'lab_image_url': 'https://www.terplifelabs.com/wp-content/uploads/2022/03/website-logo.png',
+    'lab_address': '10350 Fisher Ave, Tampa',
+    'lab_street': '10350 Fisher Ave',
+    'lab_city': 'Tampa',
+    'lab_county': 'Hillsborough',
+    'lab_state': 'FL',
+    'lab_zipcode': '33619',
+    'lab_phone': '813-726-3103',
+    'lab_email': 'info@terplifelabs.com',
+    'lab_website': 'https://www.terplifelabs.com/',
+    'lab_latitude': 27.959174,
+    'lab_longitude': -82.3278,
+}
+
+STEEPHILL = {
+    'coa_algorithm': 'steephill.py',
+    'coa_algorithm_entry_point': 'parse_steephill_coa',
+    'url': 'https://www.steephill.com',
+    'lims': 'Steep Hill',
+    'lab': 'Steep Hill',
+    'lab_license_number': 'IL281277',
+    'lab_image_url': '',
+    'lab_address': '40 Speen Street Suite 301, Framingham, MA, 01701',
+    'lab_street': '40 Speen Street Suite 301',
+    'lab_city': 'Framingham',
+    'lab_county': 'Middlesex',
+    'lab_state': 'MA',
+    'lab_zipcode': '01701',
+    'lab_latitude': 42.312180,
+    'lab_longitude': -71.389410,
+    'lab_phone': '508-465-3470',
+    'lab_email': 'support@steephill.com',
+    'lab_website': 'www.steephill.com',
+}
+
+VEDA_SCIENTIFIC = {
+    'coa_algorithm': 'veda.py',
+    'coa_algorithm_entry_point': 'parse_veda_coa',
+    'url': 'vedascientific.co',
+    'lims': 'Veda Scientific',
+    'lab': 'Veda Scientific',
+    'lab_image_url': 'https://images.squarespace-cdn.com/content/v1/5fab1470f012f739139935ac/58792970-f502-4e1a-ac29-ddca27b43266/Veda_Logo_Horizontal_RGB_Large.png?format=1500w', # <- Get this data.
+    'lab_license_number': '', # <-- Get this static data point.
+    'lab_address': '1601 W Central Ave Building A Unit A, Lompoc, CA',
+    'lab_street': '1601 W Central Ave Building A Unit A',
+    'lab_city': 'Lompoc',
+    'lab_county': 'Santa Barbara',
+    'lab_state': 'CA',
+    'lab_zipcode': '93436',
+    'lab_phone': '(805) 324-7728',
+    'lab_email': 'info@vedascientific.co',
+    'lab_website': 'vedascientific.co',
+    'lab_latitude': 34.661520,
+    'lab_longitude': -120.476520,
+}
+
+
+# Labs and LIMS that CoADoc can parse.
+LIMS = {
+    'ACS Labs': ACS_LABS,
+    'Anresco Laboratories': ANRESCO,
+    'Cannalysis': CANNALYSIS,
+    'Confidence Analytics': CONFIDENCE,
+    'Confident Cannabis': CONFIDENT_CANNABIS,
+    'Green Leaf Lab': GREEN_LEAF_LAB,
+    'Green Scientific Labs': GREEN_SCIENTIFIC_LABS,
+    'Kaycha Labs': KAYCHA_LABS,
+    'MCR Labs': MCR_LABS,
+    'SC Labs': SC_LABS,
+    'Sonoma Lab Works': SONOMA,
+    'TagLeaf LIMS': TAGLEAF,
+    'TerpLife Labs': TERPLIFE_LABS,
+    'Steep Hill': STEEPHILL,
+    'Veda Scientific': VEDA_SCIENTIFIC,
+}
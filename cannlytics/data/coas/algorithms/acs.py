@@ -101,6 +101,7 @@ import requests
 # Internal imports.
 from cannlytics import firebase
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import ACS_LABS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -113,28 +114,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-ACS_LABS = {
-    'coa_algorithm': 'acs.py',
-    'coa_algorithm_entry_point': 'parse_acs_coa',
-    'lims': 'ACS Labs',
-    'url': 'https://portal.acslabcannabis.com',
-    'lab': 'ACS Labs',
-    'lab_license_number': 'CMTL-0003',
-    'lab_image_url': 'https://global-uploads.webflow.com/630470e960f8722190672cb4/6305a2e849811b34bf18777d_Desktop%20Logo.svg',
-    'lab_address': '721 Cortaro Dr, Sun City Center, FL 33573',
-    'lab_street': '721 Cortaro Dr',
-    'lab_city': 'Sun City Center',
-    'lab_county': 'Hillsborough County',
-    'lab_state': 'FL',
-    'lab_zipcode': '33573',
-    'lab_phone': '813-634-4529',
-    'lab_email': 'info@acslabcannabis.com',
-    'lab_website': 'https://www.acslabcannabis.com/',
-    'lab_latitude': 27.713506,
-    'lab_longitude': -82.371029,
-}
-
 # It is assumed that the COA has the following details.
 ACS_LABS_COA = {
     'analyses': {
@@ -63,6 +63,7 @@ import pandas as pd
 import pdfplumber
 
 # Internal imports.
+from cannlytics.data.coas.algorithms import ANRESCO
 from cannlytics.data.data import create_sample_id, find_first_value
 from cannlytics.utils.constants import ANALYTES, STANDARD_FIELDS
 from cannlytics.utils.utils import (
@@ -99,24 +100,6 @@ import pandas as pd
 #- sum_of_cannabinoids
 
 
-# It is assumed that the lab has the following details.
-ANRESCO =  {
-    'coa_algorithm': 'anresco.py',
-    'coa_algorithm_entry_point': 'parse_anresco_coa',
-    'lims': 'Anresco Laboratories',
-    'lab': 'Anresco Laboratories',
-    'lab_image_url': 'https://anresco.com/wp-content/uploads/thegem-logos/logo_2258c6b0a6f4e626a22edd2f64dc588b_2x.png',
-    'lab_website': 'www.anresco.com',
-    'lab_address': '1375 Van Dyke Ave, San Francisco, CA 94124',
-    'lab_street': '1375 Van Dyke Ave',
-    'lab_city': 'San Francisco',
-    'lab_state': 'CA',
-    'lab_zipcode': '94124',
-    'lab_latitude': 37.726610,
-    'lab_longitude': -122.388450,
-    'public': True,
-}
-
 # It is assumed that the CoA has the following parameters.
 ANRESCO_COA = {
     'coa_distributor_area': '(200, 60, 380, 130)',
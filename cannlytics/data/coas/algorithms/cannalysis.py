@@ -58,6 +58,7 @@ from PIL import Image
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import CANNALYSIS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -83,28 +84,6 @@ from cannlytics.utils.utils import (
 # Convert `DecompressionBombWarning` into an error.
 warnings.simplefilter('error', Image.DecompressionBombWarning)
 
-# It is assumed that the lab has the following details.
-CANNALYSIS =  {
-    'coa_algorithm': 'cannalysis.py',
-    'coa_algorithm_entry_point': 'parse_cannalysis_coa',
-    'url': 'www.cannalysis.com',
-    'lims': 'Cannalysis',
-    'lab': 'Cannalysis',
-    'lab_license_number': 'C8-0000012-LIC',
-    'lab_image_url': 'https://www.cannalysis.com/img/img.c5effdd3.png',
-    'lab_address': '1801 Carnegie Ave, Santa Ana CA 92705',
-    'lab_street': '1801 Carnegie Ave',
-    'lab_city': 'Santa Ana',
-    'lab_county': 'Orange',
-    'lab_state': 'CA',
-    'lab_zipcode': '92705',
-    'lab_latitude': 33.712190,
-    'lab_longitude': -117.844650,
-    'lab_phone': '949-329-8378',
-    'lab_email': 'support@cannalysislabs.com',
-    'lab_website': 'www.cannalysis.com',
-}
-
 # It is assumed that the CoA has the following parameters.
 # Dimensions are percentages (x0, y0) to (x1, y1).
 CANNALYSIS_COA = {
@@ -58,6 +58,7 @@ import pdfplumber
 
 # Internal imports:
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import CONFIDENCE
 from cannlytics.data.data import create_hash, create_sample_id
 from cannlytics.data.gis import search_for_address
 from cannlytics.utils import (
@@ -68,28 +69,6 @@ from cannlytics.utils import (
 from cannlytics.utils.constants import DECARB
 
 
-# It is assumed that the lab has the following details.
-CONFIDENCE = {
-    'coa_algorithm': 'confidence.py',
-    'coa_algorithm_entry_point': 'parse_confidence_coa',
-    'lims': 'Confidence Analytics',
-    'url': 'https://certs.conflabs.com',
-    'lab': 'Confidence Analytics',
-    'lab_website': 'https://conflabs.com',
-    'lab_license_number': '7939083039',
-    'lab_image_url': 'https://www.conflabs.com/wp-content/uploads/2022/06/CA_3_transparent_registered-2.png',
-    'lab_address': '14797 NE 95th St, Redmond, WA 98502',
-    'lab_street': '14797 NE 95th St',
-    'lab_city': 'Redmond',
-    'lab_county': 'King',
-    'lab_state': 'WA',
-    'lab_zipcode': '98052',
-    'lab_latitude': 47.685890,
-    'lab_longitude': -122.143640,
-    'lab_phone': '(206) 743-8843',
-    'lab_email': 'info@conflabs.com',
-}
-
 CONFIDENCE_COA = {
     'analyses': {
         'Cannabinoids': 'cannabinoids',
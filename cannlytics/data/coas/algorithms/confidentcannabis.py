@@ -77,6 +77,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import CONFIDENT_CANNABIS
 from cannlytics.data.data import create_hash, create_sample_id
 from cannlytics.data.web import initialize_selenium
 from cannlytics.utils.utils import (
@@ -86,16 +87,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-CONFIDENT_CANNABIS = {
-    'coa_algorithm': 'confidentcannabis.py',
-    'coa_algorithm_entry_point': 'parse_cc_coa',
-    'lims': 'Con\x00dent Cannabis',
-    'url': 'https://orders.confidentcannabis.com',
-    'public': True,
-}
-
-
 def parse_cc_url(
         parser,
         url: str,
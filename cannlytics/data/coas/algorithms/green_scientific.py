@@ -81,6 +81,7 @@ except ImportError:
 # Internal imports.
 from cannlytics import firebase
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import GREEN_SCIENTIFIC_LABS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -95,28 +96,6 @@ from cannlytics.utils.utils import (
     strip_whitespace,
 )
 
-# It is assumed that the lab has the following details.
-GREEN_SCIENTIFIC_LABS = {
-    'coa_algorithm': 'green_scientific.py',
-    'coa_algorithm_entry_point': 'parse_green_scientific_coa',
-    # 'url': 'https://www.verifycbd.com',
-    'url': 'https://www.greenscienti', # The f parses incorrectly
-    'lims': 'Green Scientific Labs',
-    'lab': 'Green Scientific Labs',
-    'lab_license_number': 'CMTL-0004',
-    'lab_image_url': 'https://www.greenscientificlabs.com/assets/images/logo-blue.png',
-    'lab_address': '4001 SW 47th Avenue, Suite 208, Davie, FL 33314',
-    'lab_street': '4001 SW 47th Avenue, Suite 208',
-    'lab_city': 'Davie',
-    'lab_county': 'Broward',
-    'lab_state': 'FL',
-    'lab_zipcode': '33314',
-    'lab_phone': '(954) 514-9343',
-    'lab_email': 'info@greenscientificlabs.com',
-    'lab_website': 'https://www.greenscientificlabs.com/',
-    'lab_latitude': 26.071350,
-    'lab_longitude': -80.210750,
-}
 GREEN_SCIENTIFIC_LABS_COLUMNS = {
     'Harvest/Lot ID': 'external_id',
     'Seed-to-Sale #': 'traceability_id',
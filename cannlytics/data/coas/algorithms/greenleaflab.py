@@ -85,6 +85,7 @@ import pandas as pd
 import pdfplumber
 
 # Internal imports.
+from cannlytics.data.coas.algorithms import GREEN_LEAF_LAB
 from cannlytics.data.data import create_sample_id
 from cannlytics.utils.constants import STANDARD_UNITS
 from cannlytics.utils.utils import (
@@ -95,29 +96,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-# Future work: Make this dynamic to handle multiple lab locations.
-# E.g. Green Leaf Lab has a California and an Oregon location.
-GREEN_LEAF_LAB = {
-    'coa_algorithm': 'greenleaflab.py',
-    'coa_algorithm_entry_point': 'parse_green_leaf_lab_pdf',
-    'lims': 'Green Leaf Lab',
-    'lab': 'Green Leaf Lab',
-    'lab_image_url': 'https://cdn-djjmk.nitrocdn.com/MuWSCTBsUZpIUufaWqGQkErSrYFMxIqD/assets/static/optimized/rev-a199899/wp-content/uploads/2018/12/greenleaf-logo.png',
-    'lab_license_number': ' C8-0000078-LIC', # <- Make dynamic.
-    'lab_address': '251 Lathrop Way Suites D&E Sacramento, CA 95815', # <- Make dynamic.
-    'lab_street': '251 Lathrop Way Suites D&E', # <- Make dynamic.
-    'lab_city': 'Sacramento', # <- Make dynamic.
-    'lab_county': 'Sacramento', # <- Make dynamic.
-    'lab_state': 'CA', # <- Make dynamic.
-    'lab_zipcode': '95815', # <- Make dynamic.
-    'lab_phone': '916-924-5227', # <- Make dynamic.
-    'lab_email': '', # <- Make dynamic.
-    'lab_website': 'https://greenleaflab.org/',
-    'lab_latitude': 38.596060, # <- Make dynamic.
-    'lab_longitude': -121.459870, # <- Make dynamic.
-}
-
 # It is assumed that there are the following analyses on each CoA.
 GREEN_LEAF_LAB_ANALYSES = {
     'cannabinoids': {
@@ -97,6 +97,7 @@ from PIL import Image
 # Internal imports.
 from cannlytics import firebase
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import KAYCHA_LABS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -110,27 +111,6 @@ from cannlytics.utils.utils import (
     strip_whitespace,
 )
 
-# It is assumed that the lab has the following details.
-KAYCHA_LABS = {
-    'coa_algorithm': 'kaycha.py',
-    'coa_algorithm_entry_point': 'parse_kaycha_coa',
-    'lims': 'Kaycha Labs',
-    'lab': 'Kaycha Labs',
-    'lab_image_url': 'https://www.kaychalabs.com/wp-content/uploads/2020/06/newlogo-2.png',
-    'lab_address': '4101 SW 47th Ave, Suite 105, Davie, FL 33314',
-    'lab_street': '4101 SW 47th Ave, Suite 105',
-    'lab_city': 'Davie',
-    'lab_county': 'Broward',
-    'lab_state': 'FL',
-    'lab_zipcode': '33314',
-    'lab_phone': '833-465-8378',
-    'lab_email': 'info@kaychalabs.com',
-    'lab_website': 'https://www.kaychalabs.com/',
-    'lab_latitude': 26.071350,
-    'lab_longitude': -80.210750,
-    # FIXME: Make license number dynamic as Kaycha Labs operate in multiple states.
-    'lab_license_number': 'CMTL-0002',
-}
 KAYCHA_LABS_COA = {
     'fields': {
         'Matrix': 'product_type',
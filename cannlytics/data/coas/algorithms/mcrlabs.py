@@ -74,6 +74,7 @@ import requests
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import MCR_LABS
 from cannlytics.data.data import create_hash, create_sample_id
 from cannlytics.utils.constants import (
     ANALYSES,
@@ -97,28 +98,6 @@ import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
-# It is assumed that the lab has the following details.
-MCR_LABS = {
-    'coa_algorithm': 'mcrlabs.py',
-    'coa_algorithm_entry_point': 'parse_mcrlabs_coa',
-    'lims': 'MCR Labs',
-    'url': 'https://reports.mcrlabs.com',
-    'lab': 'MCR Labs',
-    'lab_website': 'https://mcrlabs.com',
-    'lab_license_number': 'IL281277',
-    'lab_image_url': '',
-    'lab_address': '85 Speen St. Lower Level, Framingham, MA 01701',
-    'lab_street': '85 Speen St. Lower Level',
-    'lab_city': 'Framingham',
-    'lab_county': 'Middlesex',
-    'lab_state': 'MA',
-    'lab_zipcode': '01701',
-    'lab_latitude': 42.310820,
-    'lab_longitude': -71.386920,
-    'lab_phone': '508-872-6666',
-    'lab_email': 'hello@mcrlabs.com',
-}
-
 # It is assumed that there are the following analyses on each COA.
 MCR_LABS_COA = {
     'fields': {
@@ -94,6 +94,7 @@ import requests
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import SC_LABS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -114,18 +115,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-SC_LABS = {
-    'coa_algorithm': 'sclabs.py',
-    'coa_algorithm_entry_point': 'parse_sc_labs_coa',
-    'lims': 'SC Labs',
-    'url': 'https://client.sclabs.com',
-    'lab': 'SC Labs',
-    'lab_image_url': 'https://www.sclabs.com/wp-content/uploads/2020/11/sc-labs-logo-white.png',
-    'lab_email': 'info@sclabs.com',
-    'lab_website': 'https://sclabs.com',
-}
-
 # It is assumed that the CoA has the following parameters.
 SC_LABS_COA = {
     'coa_distributor_area': '(205, 150, 400, 230)',
@@ -81,6 +81,7 @@ import pandas as pd
 import pdfplumber
 
 # Internal imports.
+from cannlytics.data.coas.algorithms import SONOMA
 from cannlytics.data.data import create_sample_id
 from cannlytics.data.gis import search_for_address
 from cannlytics.utils.constants import (
@@ -93,27 +94,6 @@ from cannlytics.utils.utils import (
     snake_case,
 )
 
-# It is assumed that the lab has the following details.
-SONOMA =  {
-    'coa_algorithm': 'sonoma.py',
-    'coa_algorithm_entry_point': 'parse_sonoma_coa',
-    'lims': 'Sonoma Lab Works',
-    'lab': 'Sonoma Lab Works',
-    'lab_license_number': 'C8-0000015-LIC',
-    'lab_image_url': 'https://images.squarespace-cdn.com/content/v1/6072f29fa4b8d3121b2f9fbc/1623325374642-KXUXXMCSCVBYPYMFPTUS/slw-logo.png?format=1500w',
-    'lab_address': '1201 Corporate Center Parkway, Santa Rosa, CA 95407',
-    'lab_street': '1201 Corporate Center Parkway',
-    'lab_city': 'Santa Rosa',
-    'lab_county': 'Sonoma',
-    'lab_state': 'CA',
-    'lab_zipcode': '95407',
-    'lab_latitude': 38.421600,
-    'lab_longitude': -122.752990,
-    'lab_phone': '707-757-7757',
-    'lab_email': 'testing@sonomalabworks.com',
-    'lab_website': 'https://www.sonomalabworks.com/',
-}
-
 
 def parse_sonoma_coa(
         parser,
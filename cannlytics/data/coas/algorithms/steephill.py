@@ -56,6 +56,7 @@ import requests
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import STEEPHILL
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -66,28 +67,6 @@ from cannlytics.utils import convert_to_numeric, snake_case
 from cannlytics.utils.constants import DECARB
     
 
-# It is assumed that the lab has the following details.
-STEEPHILL = {
-    'coa_algorithm': 'steephill.py',
-    'coa_algorithm_entry_point': 'parse_steephill_coa',
-    'url': 'https://www.steephill.com',
-    'lims': 'Steep Hill',
-    'lab': 'Steep Hill',
-    'lab_license_number': 'IL281277',
-    'lab_image_url': '',
-    'lab_address': '40 Speen Street Suite 301, Framingham, MA, 01701',
-    'lab_street': '40 Speen Street Suite 301',
-    'lab_city': 'Framingham',
-    'lab_county': 'Middlesex',
-    'lab_state': 'MA',
-    'lab_zipcode': '01701',
-    'lab_latitude': 42.312180,
-    'lab_longitude': -71.389410,
-    'lab_phone': '508-465-3470',
-    'lab_email': 'support@steephill.com',
-    'lab_website': 'www.steephill.com',
-}
-
 # It is assumed that there are the following analyses on each CoA.
 STEEPHILL_ANALYSES = {
     'Cannabinoid': {
@@ -74,6 +74,7 @@ from requests import Session
 
 # Internal imports.
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import TAGLEAF
 from cannlytics.data.data import create_hash, create_sample_id
 from cannlytics.data.gis import search_for_address
 from cannlytics.utils.constants import ANALYSES, STANDARD_UNITS
@@ -83,15 +84,6 @@ from cannlytics.utils.utils import (
     strip_whitespace,
 )
 
-# It is assumed that the lab has the following details.
-TAGLEAF = {
-    'coa_algorithm': 'tagleaf.py',
-    'coa_algorithm_entry_point': 'parse_tagleaf_coa',
-    'lims': 'lims.tagleaf',
-    'url': 'https://lims.tagleaf.com',
-    'public': True,
-}
-
 
 def parse_tagleaf_url(
         parser,
@@ -75,6 +75,7 @@ import pdfplumber
 # Internal imports.
 from cannlytics import firebase
 from cannlytics import __version__
+from cannlytics.data.coas.algorithms import TERPLIFE_LABS
 from cannlytics.data.data import (
     create_hash,
     create_sample_id,
@@ -88,27 +89,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-TERPLIFE_LABS = {
-    'coa_algorithm': 'terplife.py',
-    'coa_algorithm_entry_point': 'parse_terplife_coa',
-    'url': 'www.terplifelabs.com',
-    'lims': 'TerpLife Labs',
-    'lab': 'TerpLife Labs',
-    'lab_license_number': 'CMTL-00010',
-    'lab_image_url': 'https://www.terplifelabs.com/wp-content/uploads/2022/03/website-logo.png',
-    'lab_address': '10350 Fisher Ave, Tampa',
-    'lab_street': '10350 Fisher Ave',
-    'lab_city': 'Tampa',
-    'lab_county': 'Hillsborough',
-    'lab_state': 'FL',
-    'lab_zipcode': '33619',
-    'lab_phone': '813-726-3103',
-    'lab_email': 'info@terplifelabs.com',
-    'lab_website': 'https://www.terplifelabs.com/',
-    'lab_latitude': 27.959174,
-    'lab_longitude': -82.3278,
-}
 TERPLIFE_LABS_COLUMNS = {
     'Seed to Sale': 'traceability_id',
     'Retail Batch#': 'batch_number',
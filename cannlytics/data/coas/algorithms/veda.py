@@ -93,6 +93,7 @@ import pandas as pd
 import pdfplumber
 
 # Internal imports.
+from cannlytics.data.coas.algorithms import VEDA_SCIENTIFIC
 from cannlytics.data.data import create_sample_id, find_first_value
 # from cannlytics.utils.constants import ANALYSES, ANALYTES
 from cannlytics.utils.utils import (
@@ -103,28 +104,6 @@ from cannlytics.utils.utils import (
 )
 
 
-# It is assumed that the lab has the following details.
-VEDA_SCIENTIFIC = {
-    'coa_algorithm': 'veda.py',
-    'coa_algorithm_entry_point': 'parse_veda_coa',
-    'url': 'vedascientific.co',
-    'lims': 'Veda Scientific',
-    'lab': 'Veda Scientific',
-    'lab_image_url': 'https://images.squarespace-cdn.com/content/v1/5fab1470f012f739139935ac/58792970-f502-4e1a-ac29-ddca27b43266/Veda_Logo_Horizontal_RGB_Large.png?format=1500w', # <- Get this data.
-    'lab_license_number': '', # <-- Get this static data point.
-    'lab_address': '1601 W Central Ave Building A Unit A, Lompoc, CA',
-    'lab_street': '1601 W Central Ave Building A Unit A',
-    'lab_city': 'Lompoc',
-    'lab_county': 'Santa Barbara',
-    'lab_state': 'CA',
-    'lab_zipcode': '93436',
-    'lab_phone': '(805) 324-7728',
-    'lab_email': 'info@vedascientific.co',
-    'lab_website': 'vedascientific.co',
-    'lab_latitude': 34.661520,
-    'lab_longitude': -120.476520,
-}
-
 # It is assumed that there are the following analyses on each CoA.
 VEDA_SCIENTIFIC_ANALYSES = {
     'cannabinoids': {
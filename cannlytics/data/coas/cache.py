@@ -0,0 +1,268 @@
+"""
+CoA Result Cache | Cannlytics
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    An on-disk cache of parsed CoA data, keyed by the SHA-256 hash of
+    the PDF bytes or of a normalized URL. Each entry records the LIMS
+    and the version of the algorithm that parsed it, so that entries
+    parsed by an outdated algorithm are ignored. The cache is bounded
+    in size, evicting the least recently used entries first.
+
+"""
+# Standard imports.
+from hashlib import sha256
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Directory for cached CoA data if the user's cache directory is not writable.
+TEMP_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'cannlytics', 'coas')
+
+# Default maximum size of the cache in bytes.
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024 # (256 MB)
+
+# The fraction of the maximum size that the cache is reduced to when
+# evicting, so that entries are not evicted on every write when full.
+CACHE_LOW_WATER = 0.9
+
+
+def get_default_cache_dir() -> str:
+    """Get the default directory for cached CoA data, in the user's
+    cache directory: `LOCALAPPDATA` on Windows, otherwise
+    `XDG_CACHE_HOME` or `~/.cache`.
+    Returns:
+        (str): The `cannlytics/coas` directory of the user's cache.
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or \
+            os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cannlytics', 'coas')
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so that equivalent URLs share a cache key.
+    The scheme and host are lowercased, query parameters are sorted,
+    and any fragment and trailing slash are removed.
+    Args:
+        url (str): A URL.
+    Returns:
+        (str): The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip('/')
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        path,
+        query,
+        '',
+    ))
+
+
+def get_document_key(doc: Any) -> str:
+    """Get a key that identifies a CoA PDF by its content or a CoA URL.
+    Args:
+        doc (str, bytes, or file): A URL, a PDF file path,
+            PDF bytes, or an open PDF file.
+    Returns:
+        (str): The SHA-256 hash of the PDF bytes or normalized URL,
+            or `None` if the document cannot be hashed.
+    """
+    if isinstance(doc, bytes):
+        return sha256(doc).hexdigest()
+    if isinstance(doc, str):
+        if doc.startswith('http'):
+            return sha256(normalize_url(doc).encode('utf-8')).hexdigest()
+        try:
+            with open(doc, 'rb') as f:
+                return sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+    try:
+        position = doc.tell()
+        doc.seek(0)
+        key = sha256(doc.read()).hexdigest()
+        doc.seek(position)
+        return key
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class CoACache:
+    """A size-bounded, least recently used, on-disk cache of CoA data."""
+
+    def __init__(
+            self,
+            cache_dir: Optional[str] = None,
+            max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+        ) -> None:
+        """Initialize a CoA cache.
+        Args:
+            cache_dir (str): A directory to store cached CoA data, a
+                `cannlytics/coas` directory in the user's cache directory
+                by default, or in the temporary directory if the user's
+                cache directory is not writable (optional).
+            max_size (int): The maximum size of the cache in bytes,
+                256 MB by default (optional).
+        """
+        self.cache_dir = cache_dir or get_default_cache_dir()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.size = None
+        self.lock = threading.Lock()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            if cache_dir:
+                raise
+            self.cache_dir = TEMP_CACHE_DIR
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, doc: Any) -> str:
+        """Get the cache key for a CoA PDF or URL.
+        Args:
+            doc (str, bytes, or file): A URL, a PDF file path,
+                PDF bytes, or an open PDF file.
+        Returns:
+            (str): The SHA-256 hash of the PDF bytes or normalized URL,
+                or `None` if the document cannot be hashed.
+        """
+        return get_document_key(doc)
+
+    def get_path(self, key: str) -> str:
+        """Get the path of a cache entry.
+        Args:
+            key (str): A cache key.
+        Returns:
+            (str): The path to the cache entry.
+        """
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key: str) -> dict:
+        """Get a cache entry, marking the entry as recently used.
+        Args:
+            key (str): A cache key.
+        Returns:
+            (dict): The cache entry with `lims`, `version`, and `data`,
+                or `None` if the entry is not cached.
+        """
+        if key is None:
+            return None
+        path = self.get_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, data: Any, lims: str, version: str) -> None:
+        """Save CoA data to the cache, evicting old entries if needed.
+        Args:
+            key (str): A cache key.
+            data (dict): The parsed CoA data.
+            lims (str): The LIMS used to parse the CoA.
+            version (str): The version of the parsing algorithm.
+        """
+        if key is None:
+            return
+        entry = {'lims': lims, 'version': version, 'data': data}
+        path = self.get_path(key)
+        temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=str)
+            size = os.path.getsize(temp)
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(temp, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+        with self.lock:
+            if self.size is not None:
+                self.size += size
+        if self.max_size and (self.size is None or self.size > self.max_size):
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry from the cache.
+        Args:
+            key (str): A cache key.
+        """
+        try:
+            path = self.get_path(key)
+            size = os.path.getsize(path)
+            os.remove(path)
+        except (OSError, TypeError):
+            return
+        with self.lock:
+            if self.size is not None:
+                self.size -= size
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self.lock:
+            self.size = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def evict(self) -> None:
+        """Remove the least recently used entries, if the cache is
+        larger than its maximum size, until the cache is no larger than
+        `CACHE_LOW_WATER` of its maximum size. The directory is only
+        scanned when the size of the cache, counted from the last scan
+        and the writes since, is over the maximum size, so writes made
+        by other processes are counted at the next scan."""
+        if not self.max_size:
+            return
+        entries, total = [], 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+        if total > self.max_size:
+            entries.sort()
+            for _, size, name in entries:
+                if total <= self.max_size * CACHE_LOW_WATER:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    total -= size
+                except OSError:
+                    pass
+        with self.lock:
+            self.size = total
@@ -27,14 +27,26 @@ Future work:
 # Standard imports.
 import ast
 import base64
+from collections import Counter
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from datetime import datetime
+from functools import lru_cache
+from hashlib import sha256
 import importlib
+import importlib.util
 from io import BytesIO
 import json
 import operator
 import os
+import re
 import tempfile
-from typing import Any, List, Optional
+import threading
+from typing import Any, Iterator, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 
 # External imports.
 import cv2
@@ -43,7 +55,6 @@ import numpy as np
 #     import openai
 # except ImportError:
 #     print('Unable to find `openai` package. This tool is used for parsing with AI.')
-import openpyxl
 import pandas as pd
 import requests
 import pdfplumber
@@ -65,13 +76,23 @@ except ImportError:
     print('Unable to import `ImageMagick` library. This tool is used for OCR.')
 
 # Internal imports.
-from cannlytics.data.data import create_hash, write_to_worksheet
+from cannlytics import __version__
+from cannlytics.data.coas.cache import CoACache, DEFAULT_CACHE_SIZE, get_document_key
+from cannlytics.data.coas.document import ParsedDocument, ParsedPage, render_crop
+from cannlytics.data.coas.qr_codes import QRCodeIndex, rank_qr_code_images
+from cannlytics.data.coas.sinks import (
+    load_checkpoint,
+    open_sink,
+    save_checkpoint,
+    save_datasets,
+)
+from cannlytics.data.coas.standardize import standardize_records, strip_to_numeric
+from cannlytics.data.data import create_hash
 from cannlytics.data.web import download_google_drive_file
 from cannlytics.utils import (
     convert_to_numeric,
     dump_column,
     get_directory_files,
-    sandwich_list,
     reorder_columns,
     snake_case,
     unzip_files,
@@ -84,42 +105,9 @@ from cannlytics.utils.constants import (
     STANDARD_FIELDS,
 )
 
-# Lab and LIMS CoA parsing algorithms.
-from cannlytics.data.coas.coa_ai import parse_coa_with_ai
-from cannlytics.data.coas.algorithms.acs import ACS_LABS
-from cannlytics.data.coas.algorithms.anresco import ANRESCO
-from cannlytics.data.coas.algorithms.cannalysis import CANNALYSIS
-from cannlytics.data.coas.algorithms.confidence import CONFIDENCE
-from cannlytics.data.coas.algorithms.confidentcannabis import CONFIDENT_CANNABIS
-from cannlytics.data.coas.algorithms.greenleaflab import GREEN_LEAF_LAB
-from cannlytics.data.coas.algorithms.green_scientific import GREEN_SCIENTIFIC_LABS
-from cannlytics.data.coas.algorithms.kaycha import KAYCHA_LABS
-from cannlytics.data.coas.algorithms.mcrlabs import MCR_LABS
-from cannlytics.data.coas.algorithms.sclabs import SC_LABS
-from cannlytics.data.coas.algorithms.sonoma import SONOMA
-from cannlytics.data.coas.algorithms.tagleaf import TAGLEAF
-from cannlytics.data.coas.algorithms.terplife import TERPLIFE_LABS
-from cannlytics.data.coas.algorithms.steephill import STEEPHILL
-from cannlytics.data.coas.algorithms.veda import VEDA_SCIENTIFIC
-
-# Labs and LIMS that CoADoc can parse.
-LIMS = {
-    'ACS Labs': ACS_LABS,
-    'Anresco Laboratories': ANRESCO,
-    'Cannalysis': CANNALYSIS,
-    'Confidence Analytics': CONFIDENCE,
-    'Confident Cannabis': CONFIDENT_CANNABIS,
-    'Green Leaf Lab': GREEN_LEAF_LAB,
-    'Green Scientific Labs': GREEN_SCIENTIFIC_LABS,
-    'Kaycha Labs': KAYCHA_LABS,
-    'MCR Labs': MCR_LABS,
-    'SC Labs': SC_LABS,
-    'Sonoma Lab Works': SONOMA,
-    'TagLeaf LIMS': TAGLEAF,
-    'TerpLife Labs': TERPLIFE_LABS,
-    'Steep Hill': STEEPHILL,
-    'Veda Scientific': VEDA_SCIENTIFIC,
-}
+# Labs and LIMS that CoADoc can parse. The parsing algorithms
+# are imported when they are first used.
+from cannlytics.data.coas.algorithms import LIMS
 
 # Default preferred order for DataFrame columns.
 # TODO: Add `sample_hash` and `results_hash` to the beginning.
@@ -141,6 +129,15 @@ METRC_PREFIXES = ['1A40']
 UNIDENTIFIED_LIMS = 'COA not recognized as a COA from a known lab: '
 UNIDENTIFIED_LIMS += ', '.join([f'"{x}"' for x in LIMS.keys()])
 
+# Resolutions to try, in order, when applying OCR to identify a CoA.
+OCR_RESOLUTIONS = [150, 300]
+
+# Keyword arguments accepted by `parse_url` when parsing in batches.
+URL_PARSE_ARGS = ['headers', 'lims', 'max_delay', 'persist', 'verbose']
+
+# A parser for each batch worker, created once per process or thread.
+_batch_worker = threading.local()
+
 
 def convert_pdf_to_images(
         filename: str,
@@ -181,6 +178,190 @@ def convert_pdf_to_images(
     return image_files
 
 
+def render_pdf_pages(
+        filename: str,
+        resolution: Optional[int] = 300,
+    ) -> List[bytes]:
+    """Render each page of a PDF to PNG image data in memory.
+    The function replaces the images' alpha channels with a white background.
+    Args:
+        filename (str): The name of a PDF to render.
+        resolution (int): The resolution of the rendered images, 300 by
+            default (optional.)
+    Returns:
+        (list): Returns a list of the PNG image data of each page.
+    """
+    images = []
+    with magick_wand(filename=filename, resolution=resolution) as all_pages:
+        for page in all_pages.sequence:
+            with magick_wand(page) as img:
+                img.format = 'png'
+                img.background_color = Color('white')
+                img.alpha_channel = 'remove'
+                images.append(img.make_blob('png'))
+    return images
+
+
+def ocr_image_data(image_data: bytes) -> bytes:
+    """Recognize the text of an image, returning a PDF with text.
+    Args:
+        image_data (bytes): The image data of a rendered page.
+    Returns:
+        (bytes): The PDF data of the page with text.
+    """
+    with Image.open(BytesIO(image_data)) as image:
+        return image_to_pdf_or_hocr(image, extension='pdf')
+
+
+@lru_cache(maxsize=None)
+def get_algorithm_version(script: str) -> str:
+    """Get the version of a CoA parsing algorithm, a hash of the
+    Cannlytics version and the source code of the algorithm's module.
+    Args:
+        script (str): The algorithm's script, e.g. `sclabs.py`.
+    Returns:
+        (str): The algorithm version.
+    """
+    module = f'cannlytics.data.coas.algorithms.{script.replace(".py", "")}'
+    version = sha256(__version__.encode('utf-8'))
+    try:
+        with open(importlib.util.find_spec(module).origin, 'rb') as f:
+            version.update(f.read())
+    except (AttributeError, ImportError, OSError):
+        pass
+    return version.hexdigest()[:16]
+
+
+def load_algorithm_module(script: str) -> Any:
+    """Import the module of a CoA parsing algorithm. Modules are only
+    imported once, after which the imported module is returned.
+    Args:
+        script (str): The algorithm's script, e.g. `sclabs.py`.
+    Returns:
+        (module): The algorithm's module.
+    """
+    module = f'cannlytics.data.coas.algorithms.{script.replace(".py", "")}'
+    return importlib.import_module(module)
+
+
+def get_coa_documents(data: Any) -> List[str]:
+    """Get a flat list of CoA PDFs and URLs given a directory, a .zip
+    file, or a list of PDF file paths, URLs, and / or .zip files.
+    Args:
+        data (str or list): A directory, a .zip file, or a list of
+            PDF file paths, CoA URLs, and / or .zip files.
+    Returns:
+        (list): Returns a list of PDF file paths and CoA URLs.
+    """
+    if isinstance(data, str):
+        if data.startswith('http') or data.lower().endswith('.pdf'):
+            data = [data]
+        elif '.zip' in data:
+            data = get_directory_files(unzip_files(data))
+        else:
+            data = get_directory_files(data)
+    docs = []
+    for doc in data:
+        if '.zip' in doc and not doc.startswith('http'):
+            docs.extend(get_directory_files(unzip_files(doc)))
+        else:
+            docs.append(doc)
+    return docs
+
+
+def init_batch_worker(parser_config: dict) -> None:
+    """Initialize a CoA parser for a batch worker process or thread.
+    Args:
+        parser_config (dict): Keyword arguments used to initialize `CoADoc`.
+    """
+    _batch_worker.parser = CoADoc(**parser_config)
+
+
+def parse_batch_document(doc: str, kwargs: dict) -> Tuple[Any, Any]:
+    """Parse a single CoA PDF or URL with the batch worker's parser,
+    returning any error message instead of raising. OCR is applied
+    with 1 process unless `ocr_workers` is given, as the batch is
+    already parsed by a pool of workers.
+    Args:
+        doc (str): A PDF file path or a CoA URL.
+        kwargs (dict): Keyword arguments for `parse_pdf` or `parse_url`.
+    Returns:
+        (tuple): The CoA data (or `None`) and an error message (or `None`).
+    """
+    kwargs = {'ocr_workers': 1, **kwargs}
+    return parse_document(_batch_worker.parser, doc, kwargs)
+
+
+def parse_document(parser: Any, doc: str, kwargs: dict) -> Tuple[Any, Any]:
+    """Parse a single CoA PDF or URL with a given parser,
+    returning any error message instead of raising.
+    Args:
+        parser (CoADoc): A CoA parser.
+        doc (str): A PDF file path or a CoA URL.
+        kwargs (dict): Keyword arguments for `parse_pdf` or `parse_url`.
+    Returns:
+        (tuple): The CoA data (or `None`) and an error message (or `None`).
+    """
+    try:
+        if doc.startswith('http'):
+            url_kwargs = {k: v for k, v in kwargs.items() if k in URL_PARSE_ARGS}
+            return parser.parse_url(doc, **url_kwargs), None
+        return parser.parse_pdf(doc, **kwargs), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+class LIMSIndex:
+    """A precompiled matcher of the URLs and names of known LIMS that
+    identifies the LIMS of a text in a single pass over the text."""
+
+    def __init__(self, lims: dict) -> None:
+        """Initialize a LIMS index.
+        Args:
+            lims (dict): A dictionary of known LIMS.
+        """
+        self.lims = lims
+        self.needles = {}
+        for key, values in lims.items():
+            for field in ['url', 'lims']:
+                needle = values.get(field)
+                if needle:
+                    self.needles.setdefault(needle, []).append(key)
+
+        # Find every needle contained in each needle, so that a match of
+        # a longer needle also counts as a match of any shorter needles.
+        self.contained = {
+            needle: [x for x in self.needles if x in needle]
+            for needle in self.needles
+        }
+
+        # Match the longest needle starting at every position.
+        alternatives = sorted(self.needles, key=len, reverse=True)
+        alternatives = '|'.join(re.escape(x) for x in alternatives)
+        self.pattern = None
+        if alternatives:
+            self.pattern = re.compile(f'(?=({alternatives}))')
+
+    def identify(self, text: str) -> str:
+        """Identify the LIMS of a given text, preferring the LIMS in
+        order, as if each LIMS URL and name were searched in turn.
+        Args:
+            text (str): The text to search.
+        Returns:
+            (str): The LIMS name if found, otherwise `None`.
+        """
+        if not text or self.pattern is None:
+            return None
+        found = set()
+        for match in set(self.pattern.findall(text)):
+            for needle in self.contained[match]:
+                found.update(self.needles[needle])
+        for key in self.lims:
+            if key in found:
+                return key
+        return None
+
+
 class CoADoc:
     """Parse data from certificate of analysis (CoA) PDFs or URLs."""
 
@@ -196,7 +377,10 @@ class CoADoc:
             standard_fields: Optional[dict] = None,
             google_maps_api_key: Optional[str] = None,
             headers: Optional[dict] = None,
-            init_all: Optional[bool] = True,
+            init_all: Optional[bool] = False,
+            cache: Optional[bool] = True,
+            cache_dir: Optional[str] = None,
+            cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
         ) -> None:
         """Initialize CoA parser.
         Args:
@@ -214,9 +398,18 @@ class CoADoc:
                 all verified LIMS are checked by default,
                 until a matching LIMS is found.
             init_all (bool): Initialize all of the parsing routines
-                for all verified LIMS.
+                for all verified LIMS, `False` by default, with each
+                parsing routine initialized when it is first used.
             google_maps_api_key (str): A Google Maps API key
                 if you also want GIS data included.
+            cache (bool): Whether or not to cache parsed CoA data on disk,
+                keyed by the hash of the PDF or URL, `True` by default.
+            cache_dir (str): A directory for cached CoA data, a
+                `cannlytics/coas` directory in the user's cache directory
+                by default (optional).
+            cache_size (int): The maximum size of the cache in bytes,
+                256 MB by default, least recently used data is removed
+                first (optional).
         """
         # Setup.
         self.driver = None
@@ -264,21 +457,63 @@ class CoADoc:
         if headers is None:
             self.headers = DEFAULT_HEADERS
 
-        # Define LIMS.
+        # Define LIMS, indexing the LIMS URLs and names for identification.
         self.lims = lims
         if lims is None:
             self.lims = LIMS
+        self.lims_index = None
+        if isinstance(self.lims, dict):
+            self.lims_index = LIMSIndex(self.lims)
+
+        # Memos of page text and QR codes shared when parsing a document.
+        self.page_texts = WeakKeyDictionary()
+        self.page_qr_codes = WeakKeyDictionary()
+
+        # Counts of memoized page text, words, images, and crops that are
+        # reused or extracted when parsing PDFs, for profiling.
+        self.memo_hits = Counter()
+        self.memo_misses = Counter()
 
         # Optional Google Maps integration to retrieve GIS data.
         self.google_maps_api_key = google_maps_api_key
+
+        # Optional cache of parsed CoA data.
+        self.cache = None
+        if cache:
+            self.cache = CoACache(cache_dir, max_size=cache_size)
+
+        # Image indexes of QR codes found for each LIMS, persisted
+        # with any cache, and a count of QR code decode attempts.
+        qr_code_index_file = None
+        if self.cache is not None:
+            qr_code_index_file = os.path.join(
+                self.cache.cache_dir,
+                'indexes',
+                'qr_code_index.json',
+            )
+        self.qr_code_index = QRCodeIndex(qr_code_index_file)
+        self.qr_code_decodes = 0
     
-        # Assign all of the parsing routines.
+        # Optional: Assign all of the parsing routines at once.
         if init_all:
             for values in self.lims.values():
-                script = values['coa_algorithm'].replace('.py', '')
-                module = f'cannlytics.data.coas.algorithms.{script}'
                 entry_point = values['coa_algorithm_entry_point']
-                setattr(self, entry_point, importlib.import_module(module))
+                module = load_algorithm_module(values['coa_algorithm'])
+                setattr(self, entry_point, module)
+
+    def __getattr__(self, name: str) -> Any:
+        """Assign a LIMS parsing routine when it is first used."""
+        lims = self.__dict__.get('lims')
+        if not isinstance(lims, dict):
+            lims = LIMS
+        for values in list(lims.values()) + list(LIMS.values()):
+            if values.get('coa_algorithm_entry_point') == name:
+                module = load_algorithm_module(values['coa_algorithm'])
+                setattr(self, name, module)
+                return module
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
 
     def aggregate(
             self,
@@ -352,10 +587,10 @@ class CoADoc:
         Returns:
             (list): The QR code data.
         """
+        self.qr_code_decodes += 1
         y = page.height
         bbox = (img['x0'], y - img['y1'], img['x1'], y - img['y0'])
-        crop = page.crop(bbox)
-        obj = crop.to_image(resolution=resolution)
+        obj = render_crop(page, bbox, resolution=resolution)
         return pyzbar.decode(obj.original)
 
     def find_pdf_qr_code_url(
@@ -364,17 +599,22 @@ class CoADoc:
             image_index: Optional[int] = None,
             page_index: Optional[int] = 0,
             resolution: Optional[int] = 300,
+            lims: Optional[str] = None,
         ) -> str:
         """Find the QR code given a CoA PDF or page.
         If no `image_index` is provided, then all images are tried to be
-        decoded until a QR code is found. If no QR code is found, then a
-        `IndexError` is raised.
+        decoded until a QR code is found, trying the images most likely
+        to be QR codes first: images where QR codes were found on past
+        CoAs from the LIMS, then square images of the size of a QR code.
+        If no QR code is found, then a `IndexError` is raised.
         Args:
             pdf (PDF or Page): A pdfplumber PDF or Page.
             image_index (int): A known image index for the QR code.
             page_index (int): The page to search, 0 by default (optional).
             resolution (int): The resolution to render the QR code,
                 `300` by default (optional).
+            lims (str): The LIMS of the CoA, used to try the image indexes
+                of QR codes on past CoAs from the LIMS first (optional).
         Returns:
             (str): The QR code URL.
         """
@@ -386,20 +626,41 @@ class CoADoc:
             page = pdf.pages[page_index]
         else:
             page = pdf
+
+        # Return any QR code already decoded from the page.
+        decoded = self.page_qr_codes.setdefault(page, {})
+        if (image_index, resolution) in decoded:
+            return decoded[(image_index, resolution)]
+        if decoded.get((None, resolution)):
+            return decoded[(None, resolution)]
+
+        # Decode the QR code.
         if image_index:
             img = page.images[image_index]
             decoded_image = self.decode_pdf_qr_code(page, img, resolution)
             image_data = decoded_image[0].data.decode('utf-8')
         else:
-            image_range = sandwich_list(page.images)
-            for img in image_range:
+            images = page.images
+            known_indexes = []
+            if lims is not None:
+                known_indexes = self.qr_code_index.get(lims)
+                try:
+                    lims_index = self.lims[lims].get('qr_code_index')
+                    if lims_index is not None:
+                        known_indexes.append(lims_index)
+                except (KeyError, AttributeError, TypeError):
+                    pass
+            for index in rank_qr_code_images(images, known_indexes):
                 try:
-                    decoded_image = self.decode_pdf_qr_code(page, img, resolution)
+                    decoded_image = self.decode_pdf_qr_code(page, images[index], resolution)
                     image_data = decoded_image[0].data.decode('utf-8')
                     if image_data:
+                        if lims is not None and page_index == 0:
+                            self.qr_code_index.record(lims, index)
                         break
                 except:
                     continue
+        decoded[(image_index, resolution)] = image_data
         return image_data
 
     def find_metrc_ids(
@@ -429,13 +690,55 @@ class CoADoc:
         metrc_ids = []
         for prefix in prefixes:
             for page in pages:
-                text = page.extract_text().replace('\n', '')
+                text = self.get_page_text(page).replace('\n', '')
                 words = text.split(' ')
                 ids = [x for x in words if x.startswith(prefix) and \
                     len(x) == id_length]
                 metrc_ids.extend(ids)
         return list(set(metrc_ids))
 
+    def get_algorithm(self, known_lims: str) -> Any:
+        """Get the parsing routine for a given LIMS, importing the
+        routine's module if it is not yet imported.
+        Args:
+            known_lims (str): The name of a known LIMS.
+        Returns:
+            (function): The LIMS parsing routine.
+        """
+        algorithm_name = LIMS[known_lims]['coa_algorithm_entry_point']
+        return getattr(getattr(self, algorithm_name), algorithm_name)
+
+    def get_algorithm_version(self, known_lims: str) -> str:
+        """Get the version of the parsing algorithm for a given LIMS.
+        Args:
+            known_lims (str): The name of a known LIMS.
+        Returns:
+            (str): The algorithm version.
+        """
+        return get_algorithm_version(LIMS[known_lims]['coa_algorithm'])
+
+    def get_cached_data(self, cache_key: str) -> dict:
+        """Get cached CoA data, if the data was parsed by the current
+        version of the LIMS parsing algorithm.
+        Args:
+            cache_key (str): The cache key of a PDF or URL.
+        Returns:
+            (dict): The cached data, or `None` if there is no valid data.
+        """
+        if self.cache is None or cache_key is None:
+            return None
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return None
+        try:
+            version = self.get_algorithm_version(entry['lims'])
+        except KeyError:
+            version = None
+        if entry.get('version') != version:
+            self.cache.delete(cache_key)
+            return None
+        return entry['data']
+
     def get_metrc_results(self, metrc_id: str) -> dict:
         """Get Metrc lab results that have been archived
         in the Cannlytics library via the Cannlytics API.
@@ -451,6 +754,23 @@ class CoADoc:
         except (json.decoder.JSONDecodeError, KeyError):
             return None
 
+    def get_page_text(self, page: Any) -> str:
+        """Get the text of a given page, extracting the text only once
+        for each page of a document.
+        Args:
+            page (Page): A pdfplumber page.
+        Returns:
+            (str): The text of the page.
+        """
+        if isinstance(page, ParsedPage):
+            return page.extract_text()
+        try:
+            return self.page_texts[page]
+        except KeyError:
+            text = page.extract_text()
+            self.page_texts[page] = text
+            return text
+
     def get_page_rows(self, page: Any, **kwargs) -> list:
         """Get the rows a given page.
         Args:
@@ -500,8 +820,7 @@ class CoADoc:
             y = page.height
             img = page.images[image_index]
             bbox = (img['x0'], y - img['y1'], img['x1'], y - img['y0'])
-        crop = page.crop(bbox)
-        obj = crop.to_image(resolution=resolution)
+        obj = render_crop(page, bbox, resolution=resolution)
         buffered = BytesIO()
         obj.save(buffered, format='JPEG')
         img_str = base64.b64encode(buffered.getvalue())
@@ -563,7 +882,7 @@ class CoADoc:
             # Handle PDFs.
             try:
                 pdf_file = pdfplumber.open(text)
-                text = pdf_file.pages[0].extract_text()
+                text = self.get_page_text(pdf_file.pages[0])
             except (FileNotFoundError, OSError):
                 pass
         
@@ -573,13 +892,13 @@ class CoADoc:
                 page = doc.pages[0]
             else:
                 page = doc
-            text = page.extract_text()
+            text = self.get_page_text(page)
 
         # Handle custom LIMS.
         if lims is None:
             lims = LIMS
         
-        # Iterate over all known LIMS looking for URLs and LIMS names.
+        # Search for all known LIMS URLs and LIMS names at once.
         if isinstance(lims, str):
             try:
                 if self.lims[lims]['url'] in text:
@@ -588,15 +907,11 @@ class CoADoc:
                 if lims.lower() in text.lower():
                     known = lims
         else:
-            for key, values in lims.items():
-                url = values.get('url')
-                if url and url in text:
-                    known = key
-                    break
-                lab = values.get('lims')
-                if lab and lab in text:
-                    known = key
-                    break
+            if self.lims_index is not None and lims is self.lims_index.lims:
+                index = self.lims_index
+            else:
+                index = LIMSIndex(lims)
+            known = index.identify(text)
 
         # If the LIMS is still unknown, then try to identify the LIMS
         # with any a QR code, if the COA is a PDF.
@@ -799,6 +1114,250 @@ class CoADoc:
         # Return the parsed COAs.
         return coas
 
+    def parse_many(
+            self,
+            docs: Any,
+            workers: Optional[int] = None,
+            mode: Optional[str] = 'process',
+            ordered: Optional[bool] = True,
+            verbose: Optional[bool] = False,
+            **kwargs,
+        ) -> Tuple[list, list]:
+        """Parse many CoAs at once with a pool of workers. PDFs are
+        fanned out to a process pool and URLs to a thread pool. Each
+        worker initializes its own parser with this parser's settings.
+        Errors are recorded per document instead of aborting the batch.
+        Args:
+            docs (str or list): A directory, a .zip file, or a list of
+                PDF file paths, CoA URLs, and / or .zip files.
+            workers (int): The number of workers in each pool, the number
+                of CPUs by default (optional).
+            mode (str): The pool to parse PDFs, `process` by default,
+                or `thread` (optional).
+            ordered (bool): Whether to return results in the order of the
+                documents, `True` by default, otherwise results are
+                returned as they are completed (optional).
+            verbose (bool): Whether or not to print progress (optional).
+            kwargs (Keywords): Keywords to pass to `parse_pdf`, with
+                any applicable keywords also passed to `parse_url`. OCR
+                uses 1 process per worker unless `ocr_workers` is given.
+        Returns:
+            (tuple): Returns a list of the CoA data and a list of errors,
+                where each error is a dictionary with the `doc` and
+                the `error` message.
+        """
+        docs = get_coa_documents(docs)
+        completed = []
+        for i, data, error in self.iter_completed(docs, workers, mode, verbose, **kwargs):
+            completed.append((i, data, error))
+
+        # Return the results, in order if desired.
+        if ordered:
+            completed.sort(key=operator.itemgetter(0))
+        coas = [data for _, data, error in completed if error is None]
+        errors = [
+            {'doc': docs[i], 'error': error}
+            for i, _, error in completed if error is not None
+        ]
+        return coas, errors
+
+    def iter_completed(
+            self,
+            docs: List[str],
+            workers: Optional[int] = None,
+            mode: Optional[str] = 'process',
+            verbose: Optional[bool] = False,
+            **kwargs,
+        ) -> Iterator[Tuple[int, Any, Any]]:
+        """Parse CoAs with a pool of workers, yielding each result as
+        soon as it is completed. PDFs are fanned out to a process pool
+        and URLs to a thread pool. Each worker initializes its own parser
+        with this parser's settings.
+        Args:
+            docs (list): A list of PDF file paths and / or CoA URLs.
+            workers (int): The number of workers in each pool, the number
+                of CPUs by default (optional).
+            mode (str): The pool to parse PDFs, `process` by default,
+                or `thread` (optional).
+            verbose (bool): Whether or not to print progress (optional).
+            kwargs (Keywords): Keywords to pass to `parse_pdf`, with
+                any applicable keywords also passed to `parse_url`.
+        Returns:
+            (generator): Yields the index of each document, the CoA data
+                (or `None`), and any error message (or `None`).
+        """
+        if mode not in ['process', 'thread']:
+            raise ValueError('`mode` must be either "process" or "thread".')
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # Get all of the PDFs and URLs to parse.
+        urls = [i for i, doc in enumerate(docs) if doc.startswith('http')]
+        pdfs = [i for i, doc in enumerate(docs) if not doc.startswith('http')]
+        if mode == 'thread':
+            urls, pdfs = urls + pdfs, []
+
+        # Initialize each worker's parser with this parser's settings.
+        parser_config = {
+            'lims': self.lims,
+            'analyses': self.analyses,
+            'analytes': self.analytes,
+            'codings': self.codings,
+            'column_order': self.column_order,
+            'nuisance_columns': self.nuisance_columns,
+            'numeric_columns': self.numeric_columns,
+            'standard_fields': self.fields,
+            'google_maps_api_key': self.google_maps_api_key,
+            'headers': self.headers,
+            'cache': self.cache is not None,
+            'cache_dir': getattr(self.cache, 'cache_dir', None),
+            'cache_size': getattr(self.cache, 'max_size', DEFAULT_CACHE_SIZE),
+        }
+        pool_kwargs = {
+            'max_workers': workers,
+            'initializer': init_batch_worker,
+            'initargs': (parser_config,),
+        }
+
+        # Fan the documents out to the pools.
+        pools, futures = [], {}
+        if urls:
+            pools.append(ThreadPoolExecutor(**pool_kwargs))
+            for i in urls:
+                future = pools[-1].submit(parse_batch_document, docs[i], kwargs)
+                futures[future] = i
+        if pdfs:
+            pools.append(ProcessPoolExecutor(**pool_kwargs))
+            for i in pdfs:
+                future = pools[-1].submit(parse_batch_document, docs[i], kwargs)
+                futures[future] = i
+
+        # Yield the results as they are completed, cancelling any
+        # remaining documents if iteration is stopped early.
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    data, error = future.result()
+                except Exception as e:
+                    data, error = None, f'{type(e).__name__}: {e}'
+                if verbose:
+                    print('Error:' if error else 'Parsed:', docs[i])
+                yield i, data, error
+        finally:
+            for pool in pools:
+                pool.shutdown(cancel_futures=True)
+
+    def iter_parse(
+            self,
+            docs: Any,
+            sink: Optional[str] = None,
+            checkpoint: Optional[str] = None,
+            batch_size: Optional[int] = 100,
+            workers: Optional[int] = None,
+            mode: Optional[str] = 'process',
+            errors: Optional[list] = None,
+            verbose: Optional[bool] = False,
+            **kwargs,
+        ) -> Iterator[dict]:
+        """Parse CoAs one at a time, yielding the data of each CoA as
+        soon as it is parsed. The data can be written in batches to a
+        JSON Lines or Parquet sink, and a checkpoint of the hashes of the
+        CoAs written and the offset of the sink is saved after each batch,
+        so that a rerun skips CoAs already written and resumes the sink.
+        The yielded data can also be passed directly to `save`.
+        Args:
+            docs (str or list): A directory, a .zip file, or a list of
+                PDF file paths, CoA URLs, and / or .zip files.
+            sink (str): A `.jsonl` file or `.parquet` directory to write
+                the CoA data (optional).
+            checkpoint (str): A file to save the checkpoint, by default
+                `{sink}.checkpoint.json` if there is a sink (optional).
+            batch_size (int): The number of CoAs to write to the sink
+                at a time, 100 by default (optional).
+            workers (int): The number of workers to parse CoAs in parallel,
+                CoAs are parsed one by one by default (optional).
+            mode (str): The pool to parse PDFs in parallel, `process` by
+                default, or `thread` (optional).
+            errors (list): A list to record any errors, where each error
+                is a dictionary with the `doc` and the `error` (optional).
+            verbose (bool): Whether or not to print progress (optional).
+            kwargs (Keywords): Keywords to pass to `parse_pdf`, with
+                any applicable keywords also passed to `parse_url`.
+        Returns:
+            (generator): Yields the data of each CoA.
+        """
+        if checkpoint is None and sink is not None:
+            checkpoint = f'{sink}.checkpoint.json'
+        state = load_checkpoint(checkpoint)
+        hashes = state['hashes']
+        processed = set(hashes)
+        writer = None
+        if sink is not None:
+            writer = open_sink(sink, offset=state['offset'])
+        offset = writer.offset if writer is not None else state['offset']
+
+        # Skip any CoAs that were written before a prior interruption.
+        docs = get_coa_documents(docs)
+        keys = {}
+        pending = []
+        for i, doc in enumerate(docs):
+            keys[i] = get_document_key(doc)
+            if keys[i] is not None and keys[i] in processed:
+                if verbose:
+                    print('Skipping:', doc)
+                continue
+            pending.append(i)
+
+        # Parse the CoAs one by one or with a pool of workers.
+        if workers is None or workers == 1:
+            def parse_all():
+                for i in pending:
+                    data, error = parse_document(self, docs[i], kwargs)
+                    if verbose:
+                        print('Error:' if error else 'Parsed:', docs[i])
+                    yield i, data, error
+            results = parse_all()
+        else:
+            results = self.iter_completed(
+                [docs[i] for i in pending],
+                workers=workers,
+                mode=mode,
+                verbose=verbose,
+                **kwargs,
+            )
+            results = ((pending[j], data, error) for j, data, error in results)
+
+        # Write each batch to the sink, then save the checkpoint.
+        batch, batch_keys = [], []
+        def flush():
+            nonlocal offset
+            if writer is not None and batch:
+                offset = writer.write(batch)
+            hashes.extend(x for x in batch_keys if x is not None)
+            if checkpoint is not None and batch:
+                save_checkpoint(checkpoint, hashes, offset)
+            batch.clear()
+            batch_keys.clear()
+
+        # Yield each CoA as it is parsed.
+        try:
+            for i, data, error in results:
+                if error is not None:
+                    if errors is not None:
+                        errors.append({'doc': docs[i], 'error': error})
+                    continue
+                batch.append(data)
+                batch_keys.append(keys[i])
+                yield data
+                if len(batch) >= batch_size:
+                    flush()
+        finally:
+            results.close()
+            flush()
+            if writer is not None:
+                writer.close()
+
     def parse_pdf(
             self,
             pdf: Any,
@@ -812,6 +1371,9 @@ class CoADoc:
             temp_path: Optional[str] = '/tmp',
             use_cached: Optional[bool] = False,
             verbose: Optional[bool] = False,
+            cache: Optional[bool] = True,
+            ocr_resolutions: Optional[List[int]] = None,
+            ocr_workers: Optional[int] = None,
         ) -> dict:
         """Parse a CoA PDF. Searches the best guess image, then all
         images, for a QR code URL to find results online.
@@ -831,15 +1393,40 @@ class CoADoc:
             temp_path (str): A temporary directory used for OCR.
             temp_path (str): A temporary directory to store files used
                 during PDF OCR, `/tmp` by default (optional).
-            resolution (int): The resolution of rendered PDF images,
-                300 by default (optional).
+            resolution (int): The resolution used to render a PDF that
+                is not a file path or a pdfplumber PDF, 300 by default. OCR
+                uses `ocr_resolutions` instead (optional).
+            cache (bool): Whether or not to use any cached data for the
+                PDF and to cache the parsed data, `True` by default,
+                if the parser has a cache (optional).
+            ocr_resolutions (list): The resolutions to try, in order, when
+                applying OCR to identify the LIMS, 150 then 300 by
+                default (optional).
+            ocr_workers (int): The number of processes used to apply OCR
+                to pages, the number of CPUs by default (optional).
         Returns:
             (dict): The sample data.
         """
         if lims is None:
             lims = self.lims
+        if ocr_resolutions is None:
+            ocr_resolutions = OCR_RESOLUTIONS
+
+        # Return any cached data for the exact same PDF.
+        cache_key = None
+        if cache and self.cache is not None:
+            if isinstance(pdf, pdfplumber.pdf.PDF):
+                cache_key = self.cache.get_key(pdf.stream)
+            else:
+                cache_key = self.cache.get_key(pdf)
+            data = self.get_cached_data(cache_key)
+            if data is not None:
+                if verbose:
+                    print(f'Using cached data: {cache_key}')
+                return data
 
-        # Read the PDF.
+        # Read the PDF, closing any PDF opened here if it is replaced.
+        opened = not isinstance(pdf, pdfplumber.pdf.PDF)
         if isinstance(pdf, str):
             pdf_file = pdfplumber.open(pdf)
         elif isinstance(pdf, pdfplumber.pdf.PDF):
@@ -849,6 +1436,9 @@ class CoADoc:
                 temp_file.save(f'{temp_path}/coa.pdf')
             pdf_file = pdfplumber.open(f'{temp_path}/coa.pdf')
 
+        # Share extracted page text, images, and crops while parsing.
+        pdf_file = ParsedDocument.wrap(pdf_file)
+
         # Optional: Try to find any Metrc IDs to query the Cannlytics API.
         # Return cached results instead of parsing the CoA from scratch.
         if use_cached is True:
@@ -866,39 +1456,43 @@ class CoADoc:
         if verbose:
             print(f'Identified LIMS: {known_lims}')
         if known_lims is None:
-            temp_pdf = f'{temp_path}/ocr-coa.pdf'
             if isinstance(pdf, str):
                 filename = pdf
             elif isinstance(pdf, pdfplumber.pdf.PDF):
                 filename = pdf.stream.name
             else:
                 filename = f'{temp_path}/coa.pdf'
-            self.pdf_ocr(
-                filename,
-                temp_pdf,
-                temp_path=temp_path,
-                resolution=resolution,
-                cleanup=cleanup,
-            )
-            pdf_file = pdfplumber.open(temp_pdf)
-            known_lims = self.identify_lims(pdf_file, lims=lims)
-            if verbose:
-                print(f'Identified LIMS after OCR: {known_lims}')
+
+            # Try OCR at a low resolution first, only escalating
+            # to higher resolutions if the LIMS is still unknown.
+            for i, ocr_resolution in enumerate(ocr_resolutions):
+                ocr_pdf = self.pdf_ocr(
+                    filename,
+                    None,
+                    temp_path=temp_path,
+                    resolution=ocr_resolution,
+                    cleanup=cleanup,
+                    in_memory=True,
+                    workers=ocr_workers,
+                )
+                ocr_pdf.name = filename
+                if i > 0 or opened:
+                    pdf_file.close()
+                pdf_file = ParsedDocument(pdfplumber.open(ocr_pdf))
+                known_lims = self.identify_lims(pdf_file, lims=lims)
+                if verbose:
+                    print(f'Identified LIMS after OCR at {ocr_resolution} DPI: {known_lims}')
+                if known_lims is not None:
+                    break
             if known_lims is None:
+                pdf_file.close()
                 raise ValueError(UNIDENTIFIED_LIMS)
 
         # Get the time the CoA was created, if known.
         date_tested = self.get_pdf_creation_date(pdf_file)
 
         # Attempt to use an URL from any QR code on the PDF.
-        url = None
-        try:
-            qr_code_index = self.lims[known_lims].get('qr_code_index')
-            url = self.find_pdf_qr_code_url(pdf_file, qr_code_index)
-            if url is None and qr_code_index is not None:
-                url = self.find_pdf_qr_code_url(pdf_file)
-        except IndexError:
-            url = self.find_pdf_qr_code_url(pdf_file)
+        url = self.find_pdf_qr_code_url(pdf_file, lims=known_lims)
         # Experimental: Try to find QR codes on the second page.
         try:
             if not url and deep_search:
@@ -910,7 +1504,7 @@ class CoADoc:
 
         # Get the LIMS parsing routine.
         algorithm_name = LIMS[known_lims]['coa_algorithm_entry_point']
-        algorithm = getattr(getattr(self, algorithm_name), algorithm_name)
+        algorithm = self.get_algorithm(known_lims)
         if verbose:
             print(f'Using algorithm: {algorithm_name}')
 
@@ -951,16 +1545,28 @@ class CoADoc:
                 google_maps_api_key=self.google_maps_api_key,
             )
 
-        # Close the PDF.
+        # Close the PDF, recording the reuse of extracted page parts.
+        self.memo_hits.update(pdf_file.hits)
+        self.memo_misses.update(pdf_file.misses)
+        if verbose:
+            print('Page memo:', pdf_file.stats)
         pdf_file.close()
 
-        # Return the data.
+        # Return the data, caching the data if desired.
         sample = {
             'date_tested': date_tested,
             'lab_results_url': url,
             'lims': known_lims,
         }
-        return {**sample, **data}
+        data = {**sample, **data}
+        if cache_key is not None:
+            self.cache.set(
+                cache_key,
+                data,
+                known_lims,
+                self.get_algorithm_version(known_lims),
+            )
+        return data
 
     def parse_url(
             self,
@@ -970,6 +1576,7 @@ class CoADoc:
             max_delay: Optional[float] = 7,
             persist: Optional[bool] = False,
             verbose: Optional[bool] = False,
+            cache: Optional[bool] = True,
         ) -> dict:
         """Parse a CoA URL.
         Args:
@@ -982,12 +1589,25 @@ class CoADoc:
                 The default is `False`. If you do persist
                 the driver, then make sure to call `quit`
                 when you are finished.
+            cache (bool): Whether or not to use any cached data for the
+                URL and to cache the parsed data, `True` by default,
+                if the parser has a cache (optional).
         Returns:
             (dict): The sample data.
         """
         if lims is None:
             lims = self.lims
 
+        # Return any cached data for the same URL.
+        cache_key = None
+        if cache and self.cache is not None:
+            cache_key = self.cache.get_key(url)
+            data = self.get_cached_data(cache_key)
+            if data is not None:
+                if verbose:
+                    print(f'Using cached data: {cache_key}')
+                return data
+
         # Identify the LIMS.
         known_lims = self.identify_lims(url, lims=lims)
         if verbose:
@@ -1016,6 +1636,7 @@ class CoADoc:
             if verbose:
                 print(f'Identified LIMS after download: {known_lims}')
             if known_lims is None:
+                pdf_file.close()
                 raise ValueError(UNIDENTIFIED_LIMS)
             else:
                 url = temp_pdf
@@ -1024,7 +1645,7 @@ class CoADoc:
         algorithm_name = LIMS[known_lims]['coa_algorithm_entry_point']
         if verbose:
             print(f'Using algorithm: {algorithm_name}')
-        algorithm = getattr(getattr(self, algorithm_name), algorithm_name)
+        algorithm = self.get_algorithm(known_lims)
         data = algorithm(
             self,
             url,
@@ -1033,6 +1654,15 @@ class CoADoc:
             persist=persist,
             google_maps_api_key=self.google_maps_api_key,
         )
+
+        # Cache the data if desired.
+        if cache_key is not None:
+            self.cache.set(
+                cache_key,
+                data,
+                known_lims,
+                self.get_algorithm_version(known_lims),
+            )
         return data
 
     def pdf_ocr(
@@ -1042,23 +1672,44 @@ class CoADoc:
             temp_path: Optional[str] = '/tmp',
             resolution: Optional[int] = 300,
             cleanup: Optional[bool] = True,
-        ) -> None:
+            in_memory: Optional[bool] = False,
+            workers: Optional[int] = None,
+        ) -> Any:
         """Pass a PDF through OCR to recognize its text. Outputs a new PDF.
         A temporary directory is used, because the algorithm is to:
             1. Convert all PDF pages to images.
             2. Convert each image to PDF with text.
             3. Compile the PDFs with text to a single PDF.
         The rendered images and individual PDF files are removed by default.
+        In memory, pages are rendered to buffers, recognized concurrently
+        by a pool of processes, and merged without temporary files.
         Args:
             filename (str): The filename of the PDF to apply OCR.
-            outfile (str): A new PDF file to generate.
+            outfile (str): A new PDF file to generate. In memory, the PDF
+                is returned instead if no `outfile` is given.
             temp_path (str): A temporary directory to store files used
                 during PDF OCR, `/tmp` by default (optional).
             resolution (int): The resolution of rendered PDF images,
                 300 by default (optional).
             cleanup (bool): Whether or not to remove the files generated
                 during OCR, `True` by default (optional).
+            in_memory (bool): Whether or not to apply OCR in memory,
+                `False` by default (optional).
+            workers (int): The number of processes used to apply OCR
+                in memory, the number of CPUs by default (optional).
+        Returns:
+            (BytesIO): The PDF with text if applying OCR in memory,
+                otherwise `None`.
         """
+        # Optional: Apply OCR to pages in memory, in parallel.
+        if in_memory:
+            return self.pdf_ocr_in_memory(
+                filename,
+                outfile,
+                resolution=resolution,
+                workers=workers,
+            )
+
         # Create a directory to store images and rendered PDFs.
         if not os.path.exists(temp_path): os.makedirs(temp_path)
 
@@ -1101,7 +1752,52 @@ class CoADoc:
         #     path = os.path.join(temp_path, i)
         #     if os.path.isfile(path) and i.startswith('magick-'):
         #         os.remove(path)
-    
+
+    def pdf_ocr_in_memory(
+            self,
+            filename: str,
+            outfile: Optional[str] = None,
+            resolution: Optional[int] = 300,
+            workers: Optional[int] = None,
+        ) -> BytesIO:
+        """Pass a PDF through OCR to recognize its text in memory.
+        Each page is rendered to a buffer, the pages are recognized
+        concurrently by a pool of processes, and the recognized pages
+        are merged into a single PDF without any temporary files.
+        Args:
+            filename (str): The filename of the PDF to apply OCR.
+            outfile (str): A new PDF file to generate (optional).
+            resolution (int): The resolution of rendered PDF images,
+                300 by default (optional).
+            workers (int): The number of processes used to apply OCR,
+                the number of CPUs by default (optional).
+        Returns:
+            (BytesIO): The PDF with text.
+        """
+        # Render each PDF page to image data.
+        images = render_pdf_pages(filename, resolution=resolution)
+
+        # Recognize the text of the pages concurrently, in page order.
+        if workers == 1 or len(images) == 1:
+            pdf_pages = [ocr_image_data(x) for x in images]
+        else:
+            workers = min(workers or os.cpu_count() or 1, len(images))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pdf_pages = list(executor.map(ocr_image_data, images))
+
+        # Compile the PDFs with text to a single PDF.
+        merger = PdfMerger()
+        for pdf_page in pdf_pages:
+            merger.append(BytesIO(pdf_page))
+        ocr_pdf = BytesIO()
+        merger.write(ocr_pdf)
+        merger.close()
+        if outfile:
+            with open(outfile, 'wb') as f:
+                f.write(ocr_pdf.getvalue())
+        ocr_pdf.seek(0)
+        return ocr_pdf
+
     def open_pdf_with_ocr(self, doc: str) -> pdfplumber.pdf.PDF:
         """
         Tries to open a PDF document. If an error occurs when opening the PDF,
@@ -1144,6 +1840,10 @@ class CoADoc:
         data where each row is a result for an analyte, and a "Values"
         worksheet with wide-form data where each row is an observation
         and each column is the `value` field for each of the `results`.
+        The worksheets are streamed to the file with a write-only Workbook.
+        If the file ends in `.parquet`, `.arrow`, or `.feather`, then a
+        directory of Parquet or Arrow IPC files, one for each dataset,
+        such as `details.parquet`, is saved instead.
         Args:
             data (dict or list or DataFrame): The data to save.
             outfile (str): The file that you wish to save. Accepts a
@@ -1162,11 +1862,9 @@ class CoADoc:
             google_maps_api_key (str): A Google Maps API Key to supplement
                 addresses with latitude and longitude.
         Returns:
-            (Workbook): An openpyxl Workbook.
+            (Workbook or dict): An openpyxl Workbook, or a map of dataset
+                names to files for Parquet and Arrow IPC files.
         """
-        # Create a workbook for saving the data.
-        wb = openpyxl.Workbook()
-
         # Initialize the details data.
         details_data = None
         if isinstance(data, dict):
@@ -1240,23 +1938,14 @@ class CoADoc:
         except:
             pass
 
-        # Create a workbook for saving the data.
-        wb = openpyxl.Workbook()
-        ws = wb.worksheets[0]
-        ws.title = 'Values'
-        write_to_worksheet(ws, values_data)
-        wb.create_sheet(title='Details')
-        ws = wb.worksheets[1]
-        write_to_worksheet(ws, details_data)
-        wb.create_sheet(title='Results')
-        ws = wb.worksheets[2]
-        write_to_worksheet(ws, results_data)
-        wb.create_sheet(title='Codings')
-        ws = wb.worksheets[3]
-        write_to_worksheet(ws, coding_data)
-        wb.save(outfile)
-        wb.close()
-        return wb
+        # Save the "Values", "Details", "Results", and "Codings" datasets.
+        datasets = {
+            'Values': values_data,
+            'Details': details_data,
+            'Results': results_data,
+            'Codings': coding_data,
+        }
+        return save_datasets(datasets, outfile)
 
     def standardize(
             self,
@@ -1354,9 +2043,9 @@ class CoADoc:
                     try:
                         sample_results = ast.literal_eval(sample_results)
                         if isinstance(sample_results, str):
-                            sample_results = json.load(json.dumps(sample_results))
+                            sample_results = json.loads(sample_results)
                     except:
-                        json.loads(sample_results)
+                        sample_results = json.loads(sample_results)
                 for result in sample_results:
                     
                     analysis = result.get('analysis')
@@ -1409,7 +2098,18 @@ class CoADoc:
             return std
 
         # Standardize a list of dictionaries, series, or DataFrames.
+        # Lists of CoA data or long-form results are standardized as
+        # columns, for all of the results at once.
         elif isinstance(data, list):
+            if how in ['details', 'long'] and all(isinstance(x, dict) for x in data):
+                return standardize_records(
+                    data,
+                    how,
+                    codings=codings,
+                    numeric_columns=numeric_columns,
+                    standard_analyses=standard_analyses,
+                    standard_fields=standard_fields,
+                )
             return [self.standardize(
                 x,
                 how=how,
@@ -1455,8 +2155,7 @@ class CoADoc:
                 # TODO: Calculate totals if they don't already exist:
                 totals = [x for x in details_data.keys() if x.startswith('total_')]
                 for c in totals:
-                    details_data[c] = details_data[c].astype(str).apply(convert_to_numeric, strip=True)
-                    details_data[c] = details_data[c].apply(pd.to_numeric, errors='coerce')
+                    details_data[c] = strip_to_numeric(details_data[c].astype(str))
 
                 # Re-order columns.
                 details_data = reorder_columns(details_data, column_order)
@@ -1476,7 +2175,7 @@ class CoADoc:
                     try:
                         sample_results = ast.literal_eval(sample_results)
                         if isinstance(sample_results, str):
-                            sample_results = json.load(json.dumps(sample_results))
+                            sample_results = json.loads(sample_results)
                     except:
                         try:
                             sample_results = json.loads(sample_results)
@@ -1600,7 +2299,7 @@ class CoADoc:
                         try:
                             sample_results = ast.literal_eval(sample_results)
                             if isinstance(sample_results, str):
-                                sample_results = json.load(json.dumps(sample_results))
+                                sample_results = json.loads(sample_results)
                         except:
                             sample_results = json.loads(sample_results)
 
@@ -1685,6 +2384,7 @@ class CoADoc:
         Returns:
             (dict): The parsed CoA data.
         """
+        from cannlytics.data.coas.coa_ai import parse_coa_with_ai
         data, prompts, cost = parse_coa_with_ai(
             self,
             filename,
@@ -1785,6 +2485,7 @@ class CoADoc:
         # Read the resized image again (important) and try to decode QR codes.
         code = None
         image = Image.open(outfile)
+        self.qr_code_decodes += 1
         codes = pyzbar.decode(image)
         if codes:
             code = codes[0].data.decode('utf-8')
@@ -0,0 +1,191 @@
+"""
+CoA Document | Cannlytics
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    A wrapper around a pdfplumber PDF that memoizes the text, words,
+    images, crops, and rendered crops of each page, so that LIMS
+    identification, QR code decoding, Metrc ID search, and the LIMS
+    parsing algorithms extract each part of a page only once when
+    parsing a CoA. Hits and misses are counted for profiling.
+
+    Parsed pages and documents are pdfplumber pages and PDFs, so they
+    can be passed to any LIMS parsing algorithm, and copy the state of
+    the pages and PDFs that they wrap. They rely on the `is_original`,
+    `_get_textmap`, and `_pages` internals of pdfplumber 0.10 and 0.11,
+    the versions required by Cannlytics.
+
+"""
+# Standard imports.
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Optional
+
+# External imports.
+from pdfplumber.page import Page
+from pdfplumber.pdf import PDF
+
+
+def get_memo_key(name: str, *args, **kwargs) -> tuple:
+    """Get a hashable memo key for a page method and its arguments.
+    Args:
+        name (str): The name of the page method.
+    Returns:
+        (tuple): The memo key.
+    """
+    return (name, repr(args), repr(sorted(kwargs.items())))
+
+
+def render_crop(page: Any, bbox: tuple, resolution: Optional[int] = 300) -> Any:
+    """Render an area of a page as an image, using any previously
+    rendered image if the page is part of a `ParsedDocument`.
+    Args:
+        page (Page): A pdfplumber page.
+        bbox (tuple): The bounding box of the area to render.
+        resolution (int): The resolution of the image, 300 by default (optional).
+    Returns:
+        (PageImage): The rendered pdfplumber page image.
+    """
+    if isinstance(page, ParsedPage):
+        return page.render_crop(bbox, resolution=resolution)
+    return page.crop(bbox).to_image(resolution=resolution)
+
+
+class ParsedPage(Page):
+    """A pdfplumber page that memoizes its extracted text, words,
+    images, crops, and rendered crops."""
+
+    def __init__(self, page: Page, document: 'ParsedDocument') -> None:
+        """Initialize a parsed page.
+        Args:
+            page (Page): A pdfplumber page or cropped page.
+            document (ParsedDocument): The document of the page,
+                used to count memo hits and misses.
+        """
+        # Cropped pages filter the objects of their parent page.
+        if not page.is_original:
+            page.objects
+            self.is_original = False
+        self.__dict__.update(page.__dict__)
+        self.get_textmap = lru_cache()(self._get_textmap)
+        self.document = document
+        self.memo = {}
+
+    def memoize(self, key: tuple, func: Any) -> Any:
+        """Get a memoized value, computing the value if needed.
+        Args:
+            key (tuple): The memo key, beginning with the method name.
+            func (function): A function to compute the value.
+        Returns:
+            (any): The memoized value.
+        """
+        try:
+            value = self.memo[key]
+            self.document.hits[key[0]] += 1
+        except KeyError:
+            value = func()
+            self.memo[key] = value
+            self.document.misses[key[0]] += 1
+        return value
+
+    def extract_text(self, **kwargs) -> str:
+        """Extract the text of the page, only once for given arguments."""
+        return self.memoize(
+            get_memo_key('extract_text', **kwargs),
+            lambda: super(ParsedPage, self).extract_text(**kwargs),
+        )
+
+    def extract_words(self, **kwargs) -> list:
+        """Extract the words of the page, only once for given arguments."""
+        return self.memoize(
+            get_memo_key('extract_words', **kwargs),
+            lambda: super(ParsedPage, self).extract_words(**kwargs),
+        )
+
+    @property
+    def images(self) -> list:
+        """The images of the page."""
+        return self.memoize(
+            get_memo_key('images'),
+            lambda: self.objects.get('image', []),
+        )
+
+    def crop(self, bbox: tuple, relative: bool = False, strict: bool = True) -> 'ParsedPage':
+        """Crop the page, only once for a given bounding box."""
+        return self.memoize(
+            get_memo_key('crop', tuple(bbox), relative, strict),
+            lambda: ParsedPage(
+                super(ParsedPage, self).crop(bbox, relative=relative, strict=strict),
+                self.document,
+            ),
+        )
+
+    def within_bbox(self, bbox: tuple, relative: bool = False, strict: bool = True) -> 'ParsedPage':
+        """Filter the page to objects within a bounding box, only once
+        for a given bounding box."""
+        return self.memoize(
+            get_memo_key('within_bbox', tuple(bbox), relative, strict),
+            lambda: ParsedPage(
+                super(ParsedPage, self).within_bbox(bbox, relative=relative, strict=strict),
+                self.document,
+            ),
+        )
+
+    def render_crop(self, bbox: tuple, resolution: Optional[int] = 300) -> Any:
+        """Render an area of the page as an image, only once for a
+        given bounding box and resolution.
+        Args:
+            bbox (tuple): The bounding box of the area to render.
+            resolution (int): The resolution of the image, 300 by default (optional).
+        Returns:
+            (PageImage): The rendered pdfplumber page image.
+        """
+        return self.memoize(
+            get_memo_key('render_crop', tuple(bbox), resolution),
+            lambda: self.crop(bbox).to_image(resolution=resolution),
+        )
+
+    def close(self) -> None:
+        """Clear the memo of the page and close the page."""
+        self.memo = {}
+        super().close()
+
+
+class ParsedDocument(PDF):
+    """A pdfplumber PDF whose pages memoize their extracted text,
+    words, images, crops, and rendered crops. Memo hits and misses
+    are counted by method in `hits` and `misses`."""
+
+    def __init__(self, pdf: PDF) -> None:
+        """Initialize a parsed document.
+        Args:
+            pdf (PDF): An open pdfplumber PDF.
+        """
+        pages = pdf.pages
+        self.__dict__.update(pdf.__dict__)
+        self.hits = Counter()
+        self.misses = Counter()
+        self._pages = [ParsedPage(page, self) for page in pages]
+
+    @classmethod
+    def wrap(cls, pdf: PDF) -> 'ParsedDocument':
+        """Wrap a pdfplumber PDF, unless the PDF is already wrapped.
+        Args:
+            pdf (PDF): An open pdfplumber PDF.
+        Returns:
+            (ParsedDocument): The parsed document.
+        """
+        if isinstance(pdf, cls):
+            return pdf
+        return cls(pdf)
+
+    @property
+    def stats(self) -> dict:
+        """The number of memo hits and misses by method."""
+        return {'hits': dict(self.hits), 'misses': dict(self.misses)}
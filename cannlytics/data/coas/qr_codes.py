@@ -0,0 +1,157 @@
+"""
+CoA QR Code Locator | Cannlytics
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    Rank the images of a CoA PDF page by how likely each image is to be
+    a QR code, using only the image metadata in the PDF, so that the
+    most likely images are rendered and decoded first. The image index
+    of the QR code on CoAs from each LIMS is learned from past successes
+    and tried before any other image.
+
+"""
+# Standard imports.
+import json
+import os
+import threading
+from typing import List, Optional
+
+# Internal imports.
+from cannlytics.utils import sandwich_list
+
+
+# The range of aspect ratios of a QR code image, as used when scanning.
+QR_CODE_ASPECT_RATIOS = (0.85, 1.3)
+
+# The range of widths, in points, of a QR code on a CoA.
+QR_CODE_WIDTHS = (20, 300)
+
+# Filters of bilevel images, the usual encoding of QR codes.
+BILEVEL_FILTERS = ['CCITTFaxDecode', 'JBIG2Decode']
+
+
+def get_qr_code_score(img: dict) -> int:
+    """Score how likely a PDF image is to be a QR code, from the image's
+    size, aspect ratio, and encoding, without rendering the image.
+    Args:
+        img (dict): A pdfplumber image.
+    Returns:
+        (int): The score, where higher scores are more likely QR codes.
+    """
+    score = 0
+    low, high = QR_CODE_ASPECT_RATIOS
+    width, height = img.get('width') or 0, img.get('height') or 0
+    if height and low < width / height < high:
+        score += 4
+    if QR_CODE_WIDTHS[0] <= width <= QR_CODE_WIDTHS[1]:
+        score += 2
+    try:
+        src_width, src_height = img['srcsize']
+        if src_height and low < src_width / src_height < high:
+            score += 2
+    except (KeyError, TypeError, ValueError):
+        pass
+    filters = []
+    try:
+        filters = img['stream'].get_filters()
+        filters = [str(getattr(f, 'name', f)) for f, _ in filters]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        pass
+    if img.get('bits') == 1 or img.get('imagemask') \
+            or any(f in BILEVEL_FILTERS for f in filters):
+        score += 1
+    return score
+
+
+def rank_qr_code_images(
+        images: List[dict],
+        known_indexes: Optional[List[int]] = None,
+    ) -> List[int]:
+    """Rank the images of a page by how likely each image is to be a
+    QR code. Any known image indexes are ranked first, then images are
+    ranked by score, with ties in the order of `sandwich_list`.
+    Args:
+        images (list): The pdfplumber images of a page.
+        known_indexes (list): Image indexes of previously found QR codes,
+            most likely first (optional).
+    Returns:
+        (list): The image indexes, most likely QR code first.
+    """
+    count = len(images)
+    order = sandwich_list(list(range(count)))
+    ranked = sorted(order, key=lambda x: -get_qr_code_score(images[x]))
+    known = []
+    for index in known_indexes or []:
+        if isinstance(index, int) and -count <= index < count:
+            index = index % count
+            if index not in known:
+                known.append(index)
+    return known + [x for x in ranked if x not in known]
+
+
+class QRCodeIndex:
+    """The image indexes of QR codes found on the CoAs of each LIMS,
+    learned from past successes and optionally persisted to a file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize a QR code index.
+        Args:
+            path (str): A JSON file to persist the index (optional).
+        """
+        self.path = path
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> dict:
+        """Load the index from its file, if any.
+        Returns:
+            (dict): The count of QR codes found at each image index
+                for each LIMS.
+        """
+        if self.path is None:
+            return self.counts
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.counts = json.load(f)
+        except (OSError, ValueError):
+            pass
+        return self.counts
+
+    def get(self, lims: str) -> List[int]:
+        """Get the image indexes where QR codes were found for a LIMS.
+        Args:
+            lims (str): The name of a LIMS.
+        Returns:
+            (list): The image indexes, most frequent first.
+        """
+        counts = self.counts.get(lims, {})
+        return [int(x) for x in sorted(counts, key=lambda x: -counts[x])]
+
+    def record(self, lims: str, image_index: int) -> None:
+        """Record the image index where a QR code was found for a LIMS,
+        merging the record with the persisted index.
+        Args:
+            lims (str): The name of a LIMS.
+            image_index (int): The image index of the QR code.
+        """
+        with self.lock:
+            self.load()
+            counts = self.counts.setdefault(lims, {})
+            counts[str(image_index)] = counts.get(str(image_index), 0) + 1
+            if self.path is None:
+                return
+            temp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp, 'w', encoding='utf-8') as f:
+                    json.dump(self.counts, f)
+                os.replace(temp, self.path)
+            except OSError:
+                pass
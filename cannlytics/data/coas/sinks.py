@@ -0,0 +1,252 @@
+"""
+CoA Data Sinks | Cannlytics
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    Sinks that write parsed CoA data in batches as the data is parsed,
+    to a JSON Lines file or to a directory of Parquet files, and
+    checkpoints that record the CoAs written and the offset of the sink,
+    so that an interrupted batch can resume where it left off. Saved
+    datasets are written to Parquet, Arrow IPC, or streamed to Excel.
+
+"""
+# Standard imports.
+import json
+import os
+import threading
+from typing import Any, List, Optional
+
+# External imports.
+import openpyxl
+import pandas as pd
+
+# Internal imports.
+from cannlytics.data.data import write_to_worksheet
+
+
+# Extensions of columnar files that datasets can be saved to.
+COLUMNAR_EXTENSIONS = ['.parquet', '.arrow', '.feather']
+
+
+def load_checkpoint(checkpoint: Optional[str] = None) -> dict:
+    """Load a checkpoint of parsed CoAs.
+    Args:
+        checkpoint (str): The checkpoint file (optional).
+    Returns:
+        (dict): The checkpoint, with the `hashes` of the CoAs written
+            and the `offset` of the sink, empty if there is no checkpoint.
+    """
+    state = {'hashes': [], 'offset': 0}
+    if checkpoint is None:
+        return state
+    try:
+        with open(checkpoint, 'r', encoding='utf-8') as f:
+            state.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return state
+
+
+def save_checkpoint(checkpoint: str, hashes: List[str], offset: int) -> None:
+    """Save a checkpoint of parsed CoAs, replacing any prior checkpoint.
+    Args:
+        checkpoint (str): The checkpoint file.
+        hashes (list): The hashes of the CoAs written.
+        offset (int): The offset of the sink after the CoAs were written.
+    """
+    temp = f'{checkpoint}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump({'hashes': hashes, 'offset': offset}, f)
+    os.replace(temp, checkpoint)
+
+
+def is_null(value: Any) -> bool:
+    """Determine if a value is `None` or NaN."""
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def format_columnar_data(data: pd.DataFrame) -> pd.DataFrame:
+    """Format data for a columnar file, writing the values of any
+    column of nested or mixed values, such as `results`, as JSON.
+    Args:
+        data (DataFrame): The data to format.
+    Returns:
+        (DataFrame): The formatted data.
+    """
+    for column in data.columns:
+        if data[column].dtype != object:
+            continue
+        values = data[column].dropna()
+        if not values.map(lambda x: isinstance(x, str)).all():
+            data[column] = data[column].map(
+                lambda x: None if is_null(x) else json.dumps(x, default=str)
+            )
+    return data
+
+
+class JSONLSink:
+    """Write CoA data to a JSON Lines file, one CoA per line. The offset
+    of the sink is the size of the file in bytes."""
+
+    def __init__(self, path: str, offset: Optional[int] = 0) -> None:
+        """Open a JSON Lines sink, truncating the file to the offset
+        to remove any lines written after the last checkpoint.
+        Args:
+            path (str): The JSON Lines file.
+            offset (int): The offset to resume writing, 0 by default (optional).
+        """
+        self.path = path
+        mode = 'r+b' if offset and os.path.exists(path) else 'wb'
+        self.file = open(path, mode)
+        self.file.seek(offset if mode == 'r+b' else 0)
+        self.file.truncate()
+        self.offset = self.file.tell()
+
+    def write(self, records: List[dict]) -> int:
+        """Write CoA data to the sink.
+        Args:
+            records (list): A list of CoA data.
+        Returns:
+            (int): The offset of the sink after writing.
+        """
+        for record in records:
+            line = json.dumps(record, default=str) + '\n'
+            self.file.write(line.encode('utf-8'))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.offset = self.file.tell()
+        return self.offset
+
+    def close(self) -> None:
+        """Close the sink."""
+        self.file.close()
+
+
+class ParquetSink:
+    """Write CoA data to a directory of Parquet files, one file per
+    batch, that can be read as one dataset with `pd.read_parquet`.
+    Nested fields, such as `results`, are written as JSON. The offset
+    of the sink is the number of files written."""
+
+    def __init__(self, path: str, offset: Optional[int] = 0) -> None:
+        """Open a Parquet sink, removing any files written after the
+        last checkpoint.
+        Args:
+            path (str): The directory of Parquet files.
+            offset (int): The offset to resume writing, 0 by default (optional).
+        """
+        self.path = path
+        self.offset = offset or 0
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            try:
+                part = int(name.split('-')[-1].split('.')[0])
+            except ValueError:
+                continue
+            if name.startswith('part-') and part >= self.offset:
+                os.remove(os.path.join(path, name))
+
+    def write(self, records: List[dict]) -> int:
+        """Write CoA data to the sink.
+        Args:
+            records (list): A list of CoA data.
+        Returns:
+            (int): The offset of the sink after writing.
+        """
+        if not records:
+            return self.offset
+        data = format_columnar_data(pd.DataFrame(records))
+        outfile = os.path.join(self.path, f'part-{self.offset:05d}.parquet')
+        data.to_parquet(outfile, index=False)
+        self.offset += 1
+        return self.offset
+
+    def close(self) -> None:
+        """Close the sink."""
+        pass
+
+
+def open_sink(path: str, offset: Optional[int] = 0) -> Any:
+    """Open a sink for CoA data given the extension of the path,
+    `.jsonl` for JSON Lines or `.parquet` for Parquet.
+    Args:
+        path (str): The JSON Lines file or directory of Parquet files.
+        offset (int): The offset to resume writing, 0 by default (optional).
+    Returns:
+        (JSONLSink or ParquetSink): The sink.
+    """
+    extension = os.path.splitext(path)[-1].lower()
+    if extension in ['.jsonl', '.ndjson']:
+        return JSONLSink(path, offset=offset)
+    if extension in ['.parquet', '.pq']:
+        return ParquetSink(path, offset=offset)
+    raise ValueError('The sink must be a `.jsonl` or `.parquet` path.')
+
+
+def read_sink(path: str) -> pd.DataFrame:
+    """Read all of the CoA data written to a sink.
+    Args:
+        path (str): The JSON Lines file or directory of Parquet files.
+    Returns:
+        (DataFrame): The CoA data.
+    """
+    extension = os.path.splitext(path)[-1].lower()
+    if extension in ['.jsonl', '.ndjson']:
+        with open(path, 'r', encoding='utf-8') as f:
+            return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+    parts = sorted(x for x in os.listdir(path) if x.startswith('part-'))
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(
+        [pd.read_parquet(os.path.join(path, x)) for x in parts],
+        ignore_index=True,
+    )
+
+
+def save_datasets(datasets: dict, outfile: Any) -> Any:
+    """Save named datasets given the extension of the file, as a
+    directory with a Parquet file (`.parquet`) or an Arrow IPC file
+    (`.arrow` or `.feather`) for each dataset, otherwise as an Excel
+    workbook with a worksheet for each dataset, streamed to the file
+    with a write-only workbook.
+    Args:
+        datasets (dict): A map of dataset names to DataFrames.
+        outfile (str): The file or directory that you wish to save.
+            Accepts a response object for returning in an HTTP request.
+    Returns:
+        (dict or Workbook): A map of dataset names to saved files for
+            columnar files, otherwise an openpyxl Workbook.
+    """
+    extension = ''
+    if isinstance(outfile, (str, os.PathLike)):
+        extension = os.path.splitext(outfile)[-1].lower()
+
+    # Save a columnar file for each dataset.
+    if extension in COLUMNAR_EXTENSIONS:
+        os.makedirs(outfile, exist_ok=True)
+        files = {}
+        for name, data in datasets.items():
+            data = format_columnar_data(data.reset_index(drop=True).copy())
+            data.columns = [str(x) for x in data.columns]
+            filename = os.path.join(outfile, f'{name.lower()}{extension}')
+            if extension == '.parquet':
+                data.to_parquet(filename, index=False)
+            else:
+                data.to_feather(filename)
+            files[name] = filename
+        return files
+
+    # Stream each dataset to a worksheet of a write-only workbook.
+    wb = openpyxl.Workbook(write_only=True)
+    for name, data in datasets.items():
+        ws = wb.create_sheet(title=name)
+        write_to_worksheet(ws, data)
+    wb.save(outfile)
+    wb.close()
+    return wb
@@ -0,0 +1,210 @@
+"""
+CoA Standardization | Cannlytics
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description:
+
+    Columnar standardization of lists of CoA data and long-form results.
+    The results of all CoAs are gathered once into columns, and the
+    analysis mapping, codings, and numeric coercion are applied to
+    whole columns, producing the same data as standardizing each CoA
+    and each result one at a time.
+
+"""
+# Standard imports.
+import ast
+import json
+from numbers import Number
+from typing import Any, List
+
+# External imports.
+import numpy as np
+import pandas as pd
+
+
+# Pattern of characters removed before converting strings to numbers.
+NON_NUMERIC = r'[^\d\.]'
+
+# Pattern of stripped strings that can be converted to numbers.
+NUMERIC = r'\d+\.?\d*|\.\d+'
+
+
+def map_values(values: pd.Series, mapping: dict) -> pd.Series:
+    """Map the values of a column that are keys of a mapping,
+    keeping any other values, as with `mapping.get(x, x)`.
+    Args:
+        values (Series): The values to map.
+        mapping (dict): A mapping of values.
+    Returns:
+        (Series): The mapped values.
+    """
+    if not mapping or values.empty:
+        return values
+    hits = values.isin(list(mapping.keys()))
+    if not hits.any():
+        return values
+    mapped = values.copy()
+    mapped[hits] = [mapping[x] for x in values[hits]]
+    return mapped
+
+
+def strip_to_numeric(values: pd.Series) -> pd.Series:
+    """Convert strings to numbers, removing any non-numeric characters,
+    as with `convert_to_numeric(x, strip=True)` followed by
+    `pd.to_numeric(x, errors='coerce')`.
+    Each distinct string is converted only once.
+    Args:
+        values (Series): The strings to convert.
+    Returns:
+        (Series): The numbers, with `NaN` for any invalid numbers.
+    """
+    codes, strings = pd.factorize(values)
+    stripped = pd.Series(strings, dtype=object).str.replace(NON_NUMERIC, '', regex=True)
+    valid = stripped.str.fullmatch(NUMERIC).fillna(False).astype(bool)
+    numbers = np.full(len(strings), np.nan)
+    numbers[valid.to_numpy()] = stripped[valid].astype(float).to_numpy()
+    return pd.Series(numbers[codes], index=values.index, dtype=float)
+
+
+def get_value_kind(value_type: type) -> str:
+    """Get how to coerce values of a given type to numbers."""
+    if issubclass(value_type, str):
+        return 'string'
+    if value_type is type(None):
+        return 'null'
+    if issubclass(value_type, Number):
+        return 'number'
+    return 'other'
+
+
+def standardize_values(values: pd.Series, codings: dict) -> pd.Series:
+    """Apply codings to a column of values and coerce the values to
+    numbers, as done for each value when standardizing one at a time.
+    Args:
+        values (Series): The values to standardize.
+        codings (dict): A map of value codings, from actual to coding.
+    Returns:
+        (Series): The numeric values.
+    """
+    values = map_values(values.astype(object), codings)
+    kinds = values.map(type)
+    kinds = kinds.map({t: get_value_kind(t) for t in kinds.unique()})
+    numbers = values.copy()
+    strings = kinds == 'string'
+    if strings.any():
+        numbers[strings] = strip_to_numeric(values[strings]).tolist()
+    numbers[kinds == 'null'] = np.nan
+    others = kinds == 'other'
+    if others.any():
+        numbers[others] = [
+            pd.to_numeric(x, errors='coerce')
+            for x in values[others]
+        ]
+    return numbers
+
+
+def parse_sample_results(sample_results: Any) -> Any:
+    """Parse the results of a CoA, if the results are a string, as done
+    when standardizing CoA data one at a time.
+    Args:
+        sample_results (list or str): The results of a CoA.
+    Returns:
+        (list): The results of the CoA.
+    """
+    if isinstance(sample_results, str):
+        try:
+            sample_results = ast.literal_eval(sample_results)
+            if isinstance(sample_results, str):
+                sample_results = json.loads(sample_results)
+        except:
+            sample_results = json.loads(sample_results)
+    return sample_results
+
+
+def format_dates(records: List[dict]) -> None:
+    """Turn the values of all `date` fields of records to ISO format,
+    formatting each distinct value only once.
+    Args:
+        records (list): A list of records to format in place.
+    """
+    formatted = {}
+    for record in records:
+        for key in [x for x in record.keys() if x.startswith('date')]:
+            value = record[key]
+            try:
+                memo = (type(value), value)
+                if memo not in formatted:
+                    try:
+                        formatted[memo] = pd.to_datetime(value).isoformat()
+                    except:
+                        formatted[memo] = value
+                record[key] = formatted[memo]
+            except TypeError:
+                try:
+                    record[key] = pd.to_datetime(value).isoformat()
+                except:
+                    pass
+
+
+def standardize_records(
+        data: List[dict],
+        how: str,
+        codings: dict,
+        numeric_columns: List[str],
+        standard_analyses: dict,
+        standard_fields: dict,
+    ) -> List[dict]:
+    """Standardize a list of CoA data (`details`) or long-form results
+    (`long`) with columnar operations.
+    Args:
+        data (list): A list of CoA data or long-form results.
+        how (str): Either `details` or `long`.
+        codings (dict): A map of value codings, from actual to coding.
+        numeric_columns (list): A list of columns to treat as numeric
+            and apply codings.
+        standard_analyses (dict): A mapping of encountered analyses to
+            standard analyses.
+        standard_fields (dict): A mapping of encountered fields to
+            standard fields.
+    Returns:
+        (list): The standardized data.
+    """
+    # Standardize fields.
+    records = [{standard_fields.get(k, k): v for k, v in x.items()} for x in data]
+
+    # Gather the results of all CoAs, or the long-form results.
+    if how == 'details':
+        rows, results = [], []
+        for i, (obs, std) in enumerate(zip(data, records)):
+            std['analyses'] = [standard_analyses.get(x, x) for x in std['analyses']]
+            std['results'] = []
+            for result in parse_sample_results(obs['results']):
+                rows.append(i)
+                results.append(result)
+    else:
+        results = records
+
+    # Standardize the `analysis` and numeric columns of all results at once.
+    columns = {}
+    analyses = pd.Series([x.get('analysis') for x in results], dtype=object)
+    columns['analysis'] = map_values(analyses, standard_analyses).tolist()
+    for c in numeric_columns:
+        values = pd.Series([x.get(c) for x in results], dtype=object)
+        columns[c] = standardize_values(values, codings).tolist()
+
+    # Assign the standardized results.
+    for j, result in enumerate(results):
+        if how == 'details':
+            result = dict(result)
+            records[rows[j]]['results'].append(result)
+        for key, values in columns.items():
+            result[key] = values[j]
+
+    # Turn dates values to ISO format.
+    format_dates(records)
+    return records
@@ -4,7 +4,7 @@ Copyright (c) 2022 Cannlytics
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 4/21/2022
-Updated: 9/8/2022
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 """
 # Internal imports.
@@ -16,6 +16,7 @@ import re
 from typing import Any, Optional
 
 # External imports.
+from openpyxl.cell.cell import KNOWN_TYPES
 from openpyxl.utils.dataframe import dataframe_to_rows
 import pandas as pd
 
@@ -219,20 +220,19 @@ def create_sample_id(private_key, public_key, salt='') -> str:
 # === Data saving tools. ===
 
 def write_to_worksheet(ws, values):
-    """Write data to an Excel Worksheet.
+    """Write data to an Excel Worksheet, one row at a time, so that
+    data can be streamed to the worksheet of a write-only Workbook.
+    Values that cannot be written to Excel are written as strings.
     Credit: Charlie Clark <https://stackoverflow.com/a/36664027>
     License: CC BY-SA 3.0 <https://creativecommons.org/licenses/by-sa/3.0/>
     Args:
         ws (Worksheet) An openpyxl Worksheet.
         values (list): A list of values to print to the worksheet.
     """
-    rows = dataframe_to_rows(pd.DataFrame(values), index=False)
-    for r_idx, row in enumerate(rows, 1):
-        for c_idx, value in enumerate(row, 1):
-            try:
-                ws.cell(row=r_idx, column=c_idx, value=value)
-            except ValueError:
-                ws.cell(row=r_idx, column=c_idx, value=str(value))
+    if not isinstance(values, pd.DataFrame):
+        values = pd.DataFrame(values)
+    for row in dataframe_to_rows(values, index=False):
+        ws.append([x if isinstance(x, KNOWN_TYPES) else str(x) for x in row])
 
 
 # === Tests ===
@@ -4,11 +4,14 @@ Copyright (c) 2021-2022 Cannlytics
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/6/2021
-Updated: 1/14/2023
+Updated: 10/17/2026
 """
 from typing import Any, Optional
+from .async_client import AsyncMetrc
+from .bulk import BulkResult
 from .client import Metrc
-from .exceptions import MetrcAPIError
+from .exceptions import MetrcAPIError, MetrcBulkError
+from .fanout import LicenseResults
 from .models import (
     Delivery,
     Category,
@@ -48,6 +51,7 @@ def initialize_metrc(
         primary_license (str): An optional primary license to use if no license is specified.
         state (str): The state of the traceability system, `ca` by default.
         client_class: By default :class:`cannlytics.metrc.client.Client` is used.
+            Use :class:`cannlytics.metrc.async_client.AsyncMetrc` for coroutines.
     Returns:
         (Metrc): Returns an instance of the Metrc client.
     """
@@ -62,8 +66,12 @@ def initialize_metrc(
 
 __all__ = [
     initialize_metrc,
+    AsyncMetrc,
+    BulkResult,
+    LicenseResults,
     Metrc,
     MetrcAPIError,
+    MetrcBulkError,
     Delivery,
     Category,
     Employee,
@@ -0,0 +1,241 @@
+"""
+Asynchronous Metrc Client | Cannlytics
+Copyright (c) 2021-2026 Cannlytics
+
+Authors:
+    Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+This module contains the `AsyncMetrc` class, which exposes the same
+`get_*`, `create_*`, `update_*`, and other request methods as the
+`Metrc` client as coroutines, so that many requests, for instance for
+many licenses, can be awaited at once. Each request is made by the
+`Metrc` client, over a shared pool of connections, in a worker thread,
+with a limit on the number of concurrent requests to each host and to
+each license.
+
+Example:
+
+```py
+async with AsyncMetrc(vendor_api_key, user_api_key, state='ca') as track:
+    packages = await asyncio.gather(*[
+        track.get_packages(license_number=x) for x in licenses
+    ])
+```
+
+"""
+# Standard imports.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
+import inspect
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+# Internal imports.
+from .client import Metrc
+from .constants import DEFAULT_HOST_LIMIT, DEFAULT_LICENSE_LIMIT
+
+
+# Methods of the `Metrc` client that are not wrapped as coroutines,
+# either because they do not make requests or are generators.
+SYNC_METHODS = [
+    'create_log',
+    'create_models',
+    'create_session',
+    'for_licenses',
+    'format_params',
+    'get_cache_key',
+    'initialize_logs',
+    'invalidate_cache',
+    'iter_range',
+    'reset_session',
+]
+
+
+@lru_cache(maxsize=None)
+def get_method_signature(name):
+    """Get the signature of a `Metrc` client method.
+    Args:
+        name (str): The name of the method.
+    Returns:
+        (Signature): The signature of the method.
+    """
+    return inspect.signature(getattr(Metrc, name))
+
+
+class AsyncMetrc(object):
+    """An instance of this class communicates with the Metrc API
+    asynchronously, with bounded concurrency."""
+
+    def __init__(
+            self,
+            vendor_api_key,
+            user_api_key,
+            logs=True,
+            primary_license='',
+            state='ma',
+            test=True,
+            host_limit=DEFAULT_HOST_LIMIT,
+            license_limit=DEFAULT_LICENSE_LIMIT,
+            client=None,
+        ):
+        """Initialize an asynchronous Metrc API client.
+        Args:
+            vendor_api_key (str): Required Metrc API key, obtained from Metrc
+                upon successful certification.
+            user_api_key (str): Required user secret obtained
+                from a licensee's Metrc user interface.
+            logs (bool): Whether or not to log Metrc API requests, True by default.
+            primary_license (str): A license to use if no license is provided
+                on individual requests.
+            state (str): The state of the licensee, Massachusetts (ma) by default.
+            test (bool): Whether or not to use the test sandbox, True by default.
+            host_limit (int): The maximum number of concurrent requests
+                to each host, 8 by default.
+            license_limit (int): The maximum number of concurrent requests
+                for each license, 4 by default.
+            client (Metrc): An existing `Metrc` client to make requests,
+                otherwise a client is created (optional).
+        """
+        if client is None:
+            client = Metrc(
+                vendor_api_key,
+                user_api_key,
+                logs=logs,
+                primary_license=primary_license,
+                state=state,
+                test=test,
+                pool_size=host_limit,
+            )
+        self.client = client
+        self.host = urlparse(client.base).netloc
+        self.host_limit = host_limit
+        self.license_limit = license_limit
+        self.executor = ThreadPoolExecutor(
+            max_workers=host_limit,
+            thread_name_prefix='metrc',
+        )
+        self._semaphores = WeakKeyDictionary()
+
+    @classmethod
+    def from_client(
+            cls,
+            client,
+            host_limit=DEFAULT_HOST_LIMIT,
+            license_limit=DEFAULT_LICENSE_LIMIT,
+        ):
+        """Initialize an asynchronous client from a `Metrc` client.
+        Args:
+            client (Metrc): A `Metrc` client to make requests.
+            host_limit (int): The maximum number of concurrent requests
+                to each host, 8 by default.
+            license_limit (int): The maximum number of concurrent requests
+                for each license, 4 by default.
+        Returns:
+            (AsyncMetrc): Returns an asynchronous Metrc client.
+        """
+        return cls(
+            client.vendor_api_key,
+            client.user_api_key,
+            host_limit=host_limit,
+            license_limit=license_limit,
+            client=client,
+        )
+
+    def __getattr__(self, name):
+        """Get an attribute of the `Metrc` client, wrapping any request
+        method as a coroutine."""
+        if name in ['client', 'executor', '_semaphores']:
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if name.startswith('_') or name in SYNC_METHODS or \
+                not callable(attr) or not hasattr(Metrc, name):
+            return attr
+
+        @wraps(attr)
+        async def method(*args, **kwargs):
+            license_number = self.get_license_number(name, args, kwargs)
+            return await self.run(license_number, attr, *args, **kwargs)
+
+        return method
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the client, waiting for any running requests."""
+        self.executor.shutdown(wait=True)
+        self.client.session.close()
+
+    def get_license_number(self, name, args, kwargs):
+        """Get the license number of a call to a `Metrc` client method.
+        Args:
+            name (str): The name of the method.
+            args (tuple): The positional arguments of the call.
+            kwargs (dict): The keyword arguments of the call.
+        Returns:
+            (str): The license number, or the primary license by default.
+        """
+        try:
+            bound = get_method_signature(name).bind_partial(None, *args, **kwargs)
+            license_number = bound.arguments.get('license_number')
+        except (TypeError, ValueError):
+            license_number = kwargs.get('license_number')
+        return license_number or self.client.primary_license
+
+    def get_semaphore(self, kind, key, limit):
+        """Get the semaphore limiting concurrent requests for a given
+        host or license in the running event loop.
+        Args:
+            kind (str): The kind of limit, `host` or `license`.
+            key (str): The host or license.
+            limit (int): The maximum number of concurrent requests.
+        Returns:
+            (Semaphore): Returns an asyncio semaphore.
+        """
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        semaphore = semaphores.get((kind, key))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(limit)
+            semaphores[(kind, key)] = semaphore
+        return semaphore
+
+    async def run(self, license_number, func, /, *args, **kwargs):
+        """Run a blocking call, such as a `Metrc` client method, in a
+        worker thread once the host and license limits allow.
+        Args:
+            license_number (str): The license of the call, or the primary
+                license if empty.
+            func (Callable): The function to call with any given arguments.
+        Returns:
+            (Any): Returns the result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        license_number = license_number or self.client.primary_license
+        license_limit = self.get_semaphore('license', license_number, self.license_limit)
+        host_limit = self.get_semaphore('host', self.host, self.host_limit)
+        async with license_limit:
+            async with host_limit:
+                return await loop.run_in_executor(
+                    self.executor,
+                    partial(func, *args, **kwargs),
+                )
+
+    async def request(self, method, endpoint, data=None, params=None):
+        """Make a request to the Metrc API."""
+        license_number = (params or {}).get('licenseNumber', '')
+        return await self.run(
+            license_number,
+            self.client.request,
+            method,
+            endpoint,
+            data=data,
+            params=params,
+        )
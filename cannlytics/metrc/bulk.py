@@ -0,0 +1,109 @@
+"""
+Metrc Bulk Requests | Cannlytics
+Copyright (c) 2021-2026 Cannlytics and Cannlytics Contributors
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+This module contains the results of bulk requests to the Metrc API,
+where a list of data is sent in chunks, recording which chunks
+succeeded or failed so that only the failed chunks need to be retried.
+"""
+
+
+class Chunk(object):
+    """A chunk of the data of a bulk request."""
+
+    def __init__(self, index, start, data):
+        """Initialize a chunk.
+        Args:
+            index (int): The index of the chunk.
+            start (int): The index of the first item of the chunk in the data.
+            data (list): The items of the chunk.
+        """
+        self.index = index
+        self.start = start
+        self.data = data
+        self.response = None
+        self.error = None
+        self.attempts = 0
+
+    def __repr__(self):
+        status = 'failed' if self.error else 'ok' if self.attempts else 'pending'
+        return f'<Chunk {self.index} [{self.start}:{self.stop}] {status}>'
+
+    @property
+    def ok(self):
+        """Whether or not the chunk was sent successfully."""
+        return self.attempts > 0 and self.error is None
+
+    @property
+    def stop(self):
+        """The index after the last item of the chunk in the data."""
+        return self.start + len(self.data)
+
+
+class BulkResult(object):
+    """The result of a bulk request to the Metrc API."""
+
+    def __init__(self, client, method, endpoint, params, chunks, workers=1):
+        """Initialize a bulk result.
+        Args:
+            client (Metrc): The client that sends the chunks.
+            method (str): The request method, e.g. `post`.
+            endpoint (str): The request endpoint.
+            params (dict): The request parameters.
+            chunks (list): The chunks (Chunk) of data.
+            workers (int): The number of chunks to send concurrently.
+        """
+        self.client = client
+        self.method = method
+        self.endpoint = endpoint
+        self.params = params
+        self.chunks = chunks
+        self.workers = workers
+
+    def __repr__(self):
+        return f'<BulkResult {len(self.succeeded)} of {len(self.chunks)} chunks succeeded>'
+
+    @property
+    def ok(self):
+        """Whether or not all chunks were sent successfully."""
+        return all(x.ok for x in self.chunks)
+
+    @property
+    def succeeded(self):
+        """The chunks that were sent successfully."""
+        return [x for x in self.chunks if x.ok]
+
+    @property
+    def failed(self):
+        """The chunks that failed."""
+        return [x for x in self.chunks if x.error is not None]
+
+    @property
+    def failed_data(self):
+        """The items of all failed chunks."""
+        return [item for x in self.failed for item in x.data]
+
+    @property
+    def response(self):
+        """The responses of the chunks, combined into one list if the
+        responses are lists, otherwise the response of the last chunk."""
+        responses = [x.response for x in self.chunks]
+        if responses and all(isinstance(x, list) for x in responses):
+            return [item for x in responses for item in x]
+        return responses[-1] if responses else None
+
+    def retry(self, workers=None):
+        """Send the failed chunks again.
+        Args:
+            workers (int): The number of chunks to send concurrently,
+                the number of workers of the original request by default.
+        Returns:
+            (BulkResult): Returns the updated result.
+        """
+        self.client.send_chunks(self, self.failed, workers=workers)
+        return self
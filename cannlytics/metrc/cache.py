@@ -0,0 +1,289 @@
+"""
+Metrc Cache | Cannlytics
+Copyright (c) 2021-2026 Cannlytics and Cannlytics Contributors
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+This module contains caches for responses of Metrc reference-data
+endpoints, such as item categories and location types, that rarely
+change. Responses are cached for a time to live, shorter for endpoints
+that change more often, such as facilities, keyed by state, the
+API keys, license, and endpoint, either in memory by each process or
+in a local SQLite file shared by workers. Writes to a resource remove
+the cached responses of the resource.
+"""
+# Standard imports.
+from collections import Counter, OrderedDict
+import sqlite3
+import threading
+import time
+
+# Internal imports.
+from .urls import (
+    METRC_BATCHES_URL,
+    METRC_FACILITIES_URL,
+    METRC_HARVESTS_URL,
+    METRC_ITEMS_URL,
+    METRC_LAB_RESULTS_URL,
+    METRC_LOCATIONS_URL,
+    METRC_PACKAGES_URL,
+    METRC_PLANTS_URL,
+    METRC_SALES_URL,
+    METRC_TRANSFERS_URL,
+    METRC_UOM_URL,
+)
+
+
+# Endpoints of near-static reference data that are cached.
+CACHED_ENDPOINTS = [
+    METRC_BATCHES_URL % 'types',
+    METRC_FACILITIES_URL,
+    METRC_HARVESTS_URL % 'waste/types',
+    METRC_ITEMS_URL % 'categories',
+    METRC_LAB_RESULTS_URL % 'states',
+    METRC_LAB_RESULTS_URL % 'types',
+    METRC_LOCATIONS_URL % 'types',
+    METRC_PACKAGES_URL % 'adjust/reasons',
+    METRC_PACKAGES_URL % 'types',
+    METRC_PLANTS_URL % 'additives/types',
+    METRC_PLANTS_URL % 'growthphases',
+    METRC_PLANTS_URL % 'waste/methods',
+    METRC_PLANTS_URL % 'waste/reasons',
+    METRC_SALES_URL % 'customertypes',
+    METRC_SALES_URL % 'delivery/returnreasons',
+    METRC_TRANSFERS_URL % 'delivery/packages/states',
+    METRC_TRANSFERS_URL % 'types',
+    METRC_UOM_URL,
+]
+
+# The default number of responses cached and their time to live in seconds.
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 3600
+
+# Shorter times to live in seconds of endpoints that change more often,
+# such as facilities, which change as licenses are added to API keys.
+CACHE_TTLS = {
+    METRC_FACILITIES_URL: 300,
+}
+
+# The fields of cache keys, which can be used to invalidate responses.
+CACHE_KEY_FIELDS = ['state', 'credentials', 'license_number', 'endpoint', 'params']
+
+
+def get_resource_endpoints(endpoint):
+    """Get the cached endpoints of the resource of an endpoint, for
+    instance `/locations/v1/types` for `/locations/v1/create`.
+    Args:
+        endpoint (str): A request endpoint.
+    Returns:
+        (list): Returns the cached endpoints of the resource.
+    """
+    resource = endpoint.strip('/').split('/')[0]
+    return [x for x in CACHED_ENDPOINTS if x.strip('/').split('/')[0] == resource]
+
+
+def matches_key(key, **fields):
+    """Determine if a cache key matches all of the given key fields
+    that are not `None`.
+    Args:
+        key (tuple): A cache key.
+        **fields: Values of the key fields, e.g. `endpoint`.
+    Returns:
+        (bool): Returns True if the key matches.
+    """
+    for i, field in enumerate(CACHE_KEY_FIELDS):
+        value = fields.get(field)
+        if value is not None and key[i] != value:
+            return False
+    return True
+
+
+class TTLCache(object):
+    """A thread-safe, in-memory, least-recently-used cache, where
+    values expire after a time to live."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        """Initialize an in-memory cache.
+        Args:
+            maxsize (int): The largest number of values cached, 1024 by default.
+            ttl (float): The seconds that values are cached, 1 hour by default.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key):
+        """Get a value from the cache.
+        Args:
+            key (tuple): The cache key.
+        Returns:
+            (tuple): Returns whether the value was found and the value.
+        """
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at > time.monotonic():
+                    self.data.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return True, value
+                del self.data[key]
+                self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return False, None
+
+    def set(self, key, value, ttl=None):
+        """Set a value in the cache, evicting the least recently used
+        value if the cache is full.
+        Args:
+            key (tuple): The cache key.
+            value (str): The value to cache.
+            ttl (float): The seconds that the value is cached, if shorter
+                than the cache's time to live (optional).
+        """
+        ttl = min(self.ttl, ttl) if ttl is not None else self.ttl
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, **fields):
+        """Remove all values with keys that match the given key fields,
+        or all values if no fields are given.
+        Args:
+            **fields: Values of the key fields, e.g. `endpoint`.
+        Returns:
+            (int): Returns the number of values removed.
+        """
+        with self.lock:
+            keys = [x for x in self.data if matches_key(x, **fields)]
+            for key in keys:
+                del self.data[key]
+            self.stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Remove all values from the cache."""
+        return self.invalidate()
+
+
+class SQLiteCache(object):
+    """A cache in a local SQLite file, shared by all workers on a
+    machine, where values expire after a time to live."""
+
+    def __init__(self, path, ttl=DEFAULT_CACHE_TTL):
+        """Initialize a SQLite cache, creating the file if necessary.
+        Args:
+            path (str): The SQLite file.
+            ttl (float): The seconds that values are cached, 1 hour by default.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.local = threading.local()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        columns = ', '.join(f'{x} TEXT' for x in CACHE_KEY_FIELDS)
+        with self.connect() as connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS metrc_cache ({columns}, '
+                'value TEXT, expires_at REAL, '
+                f'PRIMARY KEY ({", ".join(CACHE_KEY_FIELDS)}))'
+            )
+
+    def __len__(self):
+        with self.connect() as connection:
+            return connection.execute('SELECT COUNT(*) FROM metrc_cache').fetchone()[0]
+
+    def connect(self):
+        """Get the SQLite connection of the current thread."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self.local.connection = connection
+        return connection
+
+    def count(self, key):
+        """Add to a cache counter in `stats`."""
+        with self.lock:
+            self.stats[key] += 1
+
+    def get(self, key):
+        """Get a value from the cache.
+        Args:
+            key (tuple): The cache key.
+        Returns:
+            (tuple): Returns whether the value was found and the value.
+        """
+        where = ' AND '.join(f'{x} = ?' for x in CACHE_KEY_FIELDS)
+        with self.connect() as connection:
+            row = connection.execute(
+                f'SELECT value, expires_at FROM metrc_cache WHERE {where}',
+                [str(x) for x in key],
+            ).fetchone()
+        if row is not None:
+            if row[1] > time.time():
+                self.count('hits')
+                return True, row[0]
+            self.count('expirations')
+        self.count('misses')
+        return False, None
+
+    def set(self, key, value, ttl=None):
+        """Set a value in the cache.
+        Args:
+            key (tuple): The cache key.
+            value (str): The value to cache.
+            ttl (float): The seconds that the value is cached, if shorter
+                than the cache's time to live (optional).
+        """
+        ttl = min(self.ttl, ttl) if ttl is not None else self.ttl
+        placeholders = ', '.join(['?'] * (len(CACHE_KEY_FIELDS) + 2))
+        with self.connect() as connection:
+            connection.execute(
+                f'INSERT OR REPLACE INTO metrc_cache VALUES ({placeholders})',
+                [str(x) for x in key] + [value, time.time() + ttl],
+            )
+            connection.execute(
+                'DELETE FROM metrc_cache WHERE expires_at <= ?',
+                [time.time()],
+            )
+
+    def invalidate(self, **fields):
+        """Remove all values with keys that match the given key fields,
+        or all values if no fields are given.
+        Args:
+            **fields: Values of the key fields, e.g. `endpoint`.
+        Returns:
+            (int): Returns the number of values removed.
+        """
+        fields = {
+            k: v for k, v in fields.items()
+            if v is not None and k in CACHE_KEY_FIELDS
+        }
+        where = ' AND '.join(f'{x} = ?' for x in fields) or '1 = 1'
+        with self.connect() as connection:
+            cursor = connection.execute(
+                f'DELETE FROM metrc_cache WHERE {where}',
+                [str(x) for x in fields.values()],
+            )
+        with self.lock:
+            self.stats['invalidations'] += cursor.rowcount
+        return cursor.rowcount
+
+    def clear(self):
+        """Remove all values from the cache."""
+        return self.invalidate()
+
+
+# A cache shared by all clients in a process.
+REFERENCE_CACHE = TTLCache()
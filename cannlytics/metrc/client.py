@@ -5,7 +5,7 @@ Copyright (c) 2021-2023 Cannlytics
 Authors:
     Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/5/2021
-Updated: 1/26/2023
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 This module contains the `Metrc` class responsible for communicating
@@ -20,20 +20,60 @@ TODO: Implement the remaining Metrc functionality:
 
 """
 # Standard imports.
-from datetime import datetime
-from json import dumps
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from hashlib import sha256
+from itertools import islice
+import json
 import logging
 import os
+import random
 import tempfile
+import threading
+import time
 
 # External imports.
 from pandas import read_excel
 from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
 # Internal imports.
-from .constants import parameters, DEFAULT_HISTORY
-from .exceptions import MetrcAPIError
+from .constants import (
+    parameters,
+    DEFAULT_BACKOFF,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BULK_WORKERS,
+    DEFAULT_HISTORY,
+    DEFAULT_LICENSE_LIMIT,
+    DEFAULT_LOG_BODY_LIMIT,
+    DEFAULT_LOG_SAMPLE_RATE,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RETRIES,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUS_CODES,
+    THROTTLE_STATUS_CODE,
+)
+from .bulk import BulkResult, Chunk
+from .cache import (
+    CACHE_TTLS,
+    CACHED_ENDPOINTS,
+    REFERENCE_CACHE,
+    get_resource_endpoints,
+)
+from .exceptions import MetrcAPIError, MetrcBulkError
+from .fanout import LicenseFanOut
+from .throttle import (
+    get_backoff,
+    get_rate_limiter,
+    get_retry_after,
+    is_connect_error,
+)
 from .models import (
+    Model,
     Delivery,
     Category,
     Employee,
@@ -78,9 +118,33 @@ from .urls import (
 from ..utils.utils import (
     camel_to_snake,
     clean_dictionary,
+    get_date_windows,
     get_timestamp,
 )
 
+# A lock to configure the `metrc` logger once, shared by all clients.
+LOGS_LOCK = threading.Lock()
+
+
+class TruncatedBody(object):
+    """A request or response body, truncated and decoded only if it is
+    logged."""
+
+    def __init__(self, body, limit):
+        self.body = body
+        self.limit = limit
+
+    def __str__(self):
+        body = self.body
+        if not body:
+            return ''
+        text = body[:self.limit]
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', errors='replace')
+        if len(body) > self.limit:
+            text += f'... ({len(body)} bytes)'
+        return text
+
 
 class Metrc(object):
     """An instance of this class communicates with the Metrc API."""
@@ -93,6 +157,17 @@ class Metrc(object):
             primary_license='',
             state='ma',
             test=True,
+            pool_size=DEFAULT_POOL_SIZE,
+            rate_limit=DEFAULT_RATE_LIMIT,
+            retries=DEFAULT_RETRIES,
+            backoff=DEFAULT_BACKOFF,
+            max_backoff=DEFAULT_MAX_BACKOFF,
+            batch_size=DEFAULT_BATCH_SIZE,
+            bulk_workers=DEFAULT_BULK_WORKERS,
+            log_sample_rate=DEFAULT_LOG_SAMPLE_RATE,
+            log_bodies=False,
+            output='models',
+            cache=None,
         ):
         """Initialize a Metrc API client.
         Args:
@@ -108,6 +183,36 @@ class Metrc(object):
                 on individual requests.
             state (str): The state of the licensee, Oklahoma (ok) by default.
             test (bool): Whether or not to use the test sandbox, True by default.
+            pool_size (int): The number of connections to keep open to
+                Metrc, 10 by default.
+            rate_limit (float): The number of requests per second allowed
+                for the state and vendor API key, shared by all clients,
+                150 by default. Pass `None` to not limit requests.
+            retries (int): The number of times to retry throttled (429)
+                requests, server errors and connection errors of `GET`,
+                `PUT`, and `DELETE` requests, and failures to connect,
+                3 by default.
+            backoff (float): The base delay in seconds between retries,
+                doubled with each retry, 0.5 by default.
+            max_backoff (float): The longest delay in seconds between
+                retries, 30 by default.
+            batch_size (int): The largest number of items to send in each
+                request when creating or updating a list of objects, 100 by
+                default. Longer lists are sent in chunks. Pass `None` to
+                send lists in one request.
+            bulk_workers (int): The number of chunks to send concurrently,
+                1 by default.
+            log_sample_rate (float): The fraction of successful requests
+                to log, all by default. Failed requests are always logged.
+            log_bodies (bool): Whether or not to log truncated request and
+                response bodies at the debug level, False by default.
+            output (str): How to return lists of observations: `models`
+                by default, `records` for compact, read-only records, or
+                `json` for the data as returned by Metrc.
+            cache (bool or TTLCache or SQLiteCache): A cache for responses
+                of reference-data endpoints, such as item categories, or
+                True to use a cache shared by all clients in the process.
+                Responses are not cached by default.
 
         Example:
 
@@ -121,6 +226,10 @@ class Metrc(object):
         ```
         """
         self.logs = logs
+        self.log_bodies = log_bodies
+        self.log_body_limit = DEFAULT_LOG_BODY_LIMIT
+        self.log_sample_rate = log_sample_rate
+        self.logger = logging.getLogger('metrc')
         self.parameters = parameters
         self.primary_license = primary_license
         self.default_time_period = DEFAULT_HISTORY
@@ -128,8 +237,28 @@ class Metrc(object):
         self.test = test
         self.user_api_key = user_api_key
         self.vendor_api_key = vendor_api_key
-        self.session = Session()
-        self.session.auth = (vendor_api_key, user_api_key)
+        self.pool_size = pool_size
+        self.session = self.create_session()
+        self.session_lock = threading.Lock()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = batch_size
+        self.bulk_workers = bulk_workers
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = get_rate_limiter(state, vendor_api_key, rate_limit)
+        self.output = output
+        if cache is True:
+            cache = REFERENCE_CACHE
+        elif cache is False:
+            cache = None
+        self.cache = cache
+        credentials = f'{test}:{vendor_api_key}:{user_api_key}'
+        self.credentials = sha256(credentials.encode()).hexdigest()[:16]
+        self.local = threading.local()
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
         if test:
             self.base = METRC_API_BASE_URL_TEST % state
         else:
@@ -145,24 +274,256 @@ class Metrc(object):
             data=None,
             params=None,
         ):
-        """Make a request to the Metrc API."""
-        url = self.base + endpoint
+        """Make a request to the Metrc API. Responses of reference-data
+        endpoints are cached if the client has a cache, and removed from
+        the cache by any write to the same resource, e.g. `locations`.
+        Lists of data longer than the batch size are sent in chunks,
+        raising a `MetrcBulkError` with the result of each chunk if any
+        chunk fails.
+        """
+        if self.cache is not None and method.lower() == 'get' and \
+                endpoint in CACHED_ENDPOINTS:
+            key = self.get_cache_key(endpoint, params)
+            found, value = self.cache.get(key)
+            if found:
+                self._count('cache_hits')
+                return json.loads(value)
+            self._count('cache_misses')
+            response = self.send_request(method, endpoint, data=data, params=params)
+            self.cache.set(key, json.dumps(response), ttl=CACHE_TTLS.get(endpoint))
+            return response
         try:
-            response = getattr(self.session, method)(url, json=data, params=params)
-        except ConnectionError:
-            self.session = Session()
-            self.session.auth = (self.vendor_api_key, self.user_api_key)
-            response = getattr(self.session, method)(url, json=data, params=params)
-        if self.logs:
-            self.create_log(response)
-        if response.status_code == 200:
+            if isinstance(data, list) and self.batch_size and \
+                    len(data) > self.batch_size and method.lower() != 'get':
+                result = self.request_chunks(method, endpoint, data, params=params)
+                if not result.ok:
+                    raise MetrcBulkError(result)
+                return result.response
+            return self.send_request(method, endpoint, data=data, params=params)
+        finally:
+            if self.cache is not None and method.lower() != 'get':
+                for cached_endpoint in get_resource_endpoints(endpoint):
+                    self.invalidate_cache(endpoint=cached_endpoint)
+
+
+    def send_request(
+            self,
+            method,
+            endpoint,
+            data=None,
+            params=None,
+        ):
+        """Send a single request to the Metrc API, waiting for the rate
+        limiter and retrying throttled requests, server errors and
+        connection errors for idempotent methods, and failures to
+        connect for any method, with exponential backoff and jitter,
+        honoring any `Retry-After` header. A connection that fails after
+        a `POST` is sent is not retried, as Metrc may have created the
+        objects.
+        """
+        url = self.base + endpoint
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                waited = self.rate_limiter.acquire()
+                if waited:
+                    self._count('rate_limited')
+                    self._count('rate_limited_seconds', waited)
+            self._count('requests')
+            session = self.session
+            try:
+                response = getattr(session, method)(url, json=data, params=params)
+            except (ConnectionError, RequestsConnectionError) as error:
+                self._count('connection_errors')
+                retry = method.lower() in IDEMPOTENT_METHODS or \
+                    is_connect_error(error)
+                if attempt >= self.retries or not retry:
+                    raise
+                self.reset_session(session)
+                self._retry(get_backoff(attempt, self.backoff, self.max_backoff))
+                attempt += 1
+                continue
+            if self.logs:
+                self.create_log(response)
+            status_code = response.status_code
+            if status_code == THROTTLE_STATUS_CODE:
+                self._count('throttles')
+            retry = status_code == THROTTLE_STATUS_CODE or \
+                method.lower() in IDEMPOTENT_METHODS
+            if attempt < self.retries and retry and \
+                    status_code in RETRY_STATUS_CODES:
+                delay = get_retry_after(response)
+                if delay is None:
+                    delay = get_backoff(attempt, self.backoff, self.max_backoff)
+                if status_code == THROTTLE_STATUS_CODE and self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+                self._retry(delay)
+                attempt += 1
+                continue
+            break
+        if status_code == 200:
             try:
                 return response.json()
             except ValueError:
                 return response.text
         else:
             raise MetrcAPIError(response)
-    
+
+
+    def request_chunks(
+            self,
+            method,
+            endpoint,
+            data,
+            params=None,
+            batch_size=None,
+            workers=None,
+        ):
+        """Make a bulk request to the Metrc API, sending a list of data
+        in chunks no larger than the batch size.
+        Args:
+            method (str): The request method, e.g. `post`.
+            endpoint (str): The request endpoint.
+            data (list): The list of data to send.
+            params (dict): The request parameters (optional).
+            batch_size (int): The largest number of items in a chunk,
+                the client's batch size by default.
+            workers (int): The number of chunks to send concurrently,
+                the client's bulk workers by default.
+        Returns:
+            (BulkResult): Returns the result of each chunk, which can be
+                used to retry any failed chunks with `result.retry()`.
+        """
+        size = batch_size or self.batch_size or len(data) or 1
+        chunks = [
+            Chunk(i, start, data[start:start + size])
+            for i, start in enumerate(range(0, len(data), size))
+        ]
+        result = BulkResult(
+            self,
+            method,
+            endpoint,
+            params,
+            chunks,
+            workers=workers or self.bulk_workers,
+        )
+        self.send_chunks(result, chunks)
+        return result
+
+
+    def send_chunks(self, result, chunks, workers=None):
+        """Send chunks of a bulk request, recording the response or error
+        of each chunk on the chunk.
+        Args:
+            result (BulkResult): The result of the bulk request.
+            chunks (list): The chunks (Chunk) to send.
+            workers (int): The number of chunks to send concurrently,
+                the workers of the result by default.
+        """
+        def send(chunk):
+            chunk.attempts += 1
+            try:
+                chunk.response = self.send_request(
+                    result.method,
+                    result.endpoint,
+                    data=chunk.data,
+                    params=result.params,
+                )
+                chunk.error = None
+            except (MetrcAPIError, ConnectionError, RequestsConnectionError) as e:
+                chunk.error = e
+                self._count('failed_chunks')
+
+        workers = workers or result.workers or 1
+        if workers == 1:
+            for chunk in chunks:
+                send(chunk)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(send, chunks))
+
+
+    def get_cache_key(self, endpoint, params=None):
+        """Get the key of a cached response, given by the state, a hash
+        of the API keys, the license, the endpoint, and any parameters.
+        Args:
+            endpoint (str): The request endpoint.
+            params (dict): The request parameters (optional).
+        Returns:
+            (tuple): Returns the cache key.
+        """
+        params = dict(params or {})
+        license_number = params.pop(self.parameters['license_number'], '') or ''
+        return (
+            self.state,
+            self.credentials,
+            license_number,
+            endpoint,
+            json.dumps(params, sort_keys=True),
+        )
+
+
+    def invalidate_cache(self, endpoint=None, license_number=None):
+        """Remove cached responses for the client's state and API keys.
+        Args:
+            endpoint (str): Only remove responses of an endpoint (optional).
+            license_number (str): Only remove responses for a license (optional).
+        Returns:
+            (int): Returns the number of responses removed.
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate(
+            state=self.state,
+            credentials=self.credentials,
+            license_number=license_number,
+            endpoint=endpoint,
+        )
+
+
+    def _count(self, key, value=1):
+        """Add to a request counter in the client's `stats`."""
+        with self.stats_lock:
+            self.stats[key] += value
+
+
+    def _retry(self, delay):
+        """Wait a number of seconds before retrying a request."""
+        self._count('retries')
+        self._count('retry_seconds', delay)
+        time.sleep(delay)
+
+
+    def create_session(self):
+        """Create a session authenticated with the vendor and user API
+        keys, keeping a pool of connections to Metrc open that can be
+        shared by concurrent requests.
+        Returns:
+            (Session): Returns a requests session.
+        """
+        session = Session()
+        session.auth = (self.vendor_api_key, self.user_api_key)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+    def reset_session(self, session):
+        """Replace a session after a connection error, unless another
+        thread has already replaced it, closing its idle connections.
+        Args:
+            session (Session): The session of the failed request.
+        """
+        with self.session_lock:
+            if self.session is not session:
+                return
+            self.session = self.create_session()
+        session.close()
+
 
     def format_params(self, **kwargs):
         """Format Metrc request parameters.
@@ -178,41 +539,208 @@ class Metrc(object):
 
 
     def create_log(self, response):
-        """Create a log given an HTTP response.
+        """Log the method, URL, status code, latency, and size of a
+        request, for a sample of successful requests and all failed
+        requests, with the details in the `metrc` field of the record.
+        Truncated request and response bodies are logged at the debug
+        level if `log_bodies` is True.
         Args:
             response (HTTPResponse): An HTTP request response.
         """
-        try:
-            self.logger.debug(f'Request: {response.request.method} {response.request.url}')
-            self.logger.debug(f'Body: {response.request.body}')
-            self.logger.debug(f'Status code: {response.status_code}')
-            try:
-                log = dumps(response.json())
-                self.logger.debug(f'Response: {log}')
-            except ValueError:
-                self.logger.debug(f'Response: {response.text}')
-        except KeyError:
-            raise MetrcAPIError({'message': '`logs=True` but no logger initialized. Use `client.initialize_logs()`.'})
+        status_code = response.status_code
+        failed = status_code >= 400
+        if not failed and self.log_sample_rate < 1 and \
+                random.random() >= self.log_sample_rate:
+            return
+        request = response.request
+        elapsed = getattr(response, 'elapsed', None)
+        latency = elapsed.total_seconds() * 1000 if elapsed else 0
+        size = len(response.content or b'')
+        details = {
+            'method': request.method,
+            'url': request.url,
+            'status_code': status_code,
+            'latency_ms': latency,
+            'bytes': size,
+        }
+        level = logging.WARNING if failed else logging.INFO
+        self.logger.log(
+            level,
+            '%s %s %s %.0fms %dB',
+            request.method,
+            request.url,
+            status_code,
+            latency,
+            size,
+            extra={'metrc': details},
+        )
+        if self.log_bodies and self.logger.isEnabledFor(logging.DEBUG):
+            limit = self.log_body_limit
+            self.logger.debug('Body: %s', TruncatedBody(request.body, limit))
+            self.logger.debug('Response: %s', TruncatedBody(response.content, limit))
 
 
     def initialize_logs(self):
-        """Initialize Metrc logs."""
-        timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-        temp_dir = tempfile.gettempdir()
-        temp_file = os.path.join(temp_dir, f'cannlytics-{timestamp}.log')
-        logging.getLogger('metrc').handlers.clear()
-        logging.basicConfig(
-            filename=temp_file,
-            filemode='w+',
-            level=logging.DEBUG,
-            format='%(asctime)s %(message)s',
-            datefmt='%Y-%m-%dT%H:%M:%S',
-        )
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG)
+        """Initialize Metrc logs, written to a temporary file and the
+        console by the `metrc` logger, without configuring other loggers.
+        The logger is configured once per process, unless an application
+        has already added handlers, and is shared by all clients."""
         self.logger = logging.getLogger('metrc')
-        self.logger.addHandler(handler)
-        self.logger.debug('Metrc initialized.')
+        with LOGS_LOCK:
+            if not self.logger.handlers:
+                timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
+                temp_dir = tempfile.gettempdir()
+                temp_file = os.path.join(temp_dir, f'cannlytics-{timestamp}-{os.getpid()}.log')
+                formatter = logging.Formatter(
+                    '%(asctime)s %(message)s',
+                    datefmt='%Y-%m-%dT%H:%M:%S',
+                )
+                file_handler = logging.FileHandler(temp_file, mode='a')
+                file_handler.setFormatter(formatter)
+                self.logger.addHandler(file_handler)
+                self.logger.addHandler(logging.StreamHandler())
+                self.logger.setLevel(logging.INFO)
+                self.logger.info('Metrc initialized.')
+            if self.log_bodies and not self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.setLevel(logging.DEBUG)
+
+
+    def create_models(self, model, response, license_number=''):
+        """Create models from a list of observations returned by Metrc,
+        given the client's `output`: full models, compact records, or
+        the observations as returned.
+        Args:
+            model (Model): The class of the model, e.g. `Package`.
+            response (list): A list of observations returned by Metrc.
+            license_number (str): A specific license number.
+        Returns:
+            (list): Returns a list of models, records, or observations.
+        """
+        output = getattr(self.local, 'output', None) or self.output
+        if output == 'json':
+            return response
+        if output == 'records':
+            return model.to_records(response)
+        return [model(self, x, license_number) for x in response]
+
+
+    def get_dataframe(self, method, *args, **kwargs):
+        """Get a DataFrame of the observations returned by a client
+        method, such as `get_packages`, building columns directly from
+        the data returned by Metrc without creating a model for each
+        observation.
+        Args:
+            method (str or Callable): A client method, or the name of a
+                client method, that returns a list of observations.
+            *args, **kwargs: Any arguments for the method.
+        Returns:
+            (DataFrame): Returns a DataFrame with a column for each property.
+
+        Example:
+
+        ```py
+        packages = track.get_dataframe('get_packages', license_number='123')
+        ```
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        prior = getattr(self.local, 'output', None)
+        self.local.output = 'json'
+        try:
+            response = method(*args, **kwargs)
+        finally:
+            self.local.output = prior
+        if isinstance(response, (dict, Model)):
+            response = [response]
+        return Model.to_dataframe(response or [])
+
+
+    def for_licenses(self, licenses, workers=None):
+        """Call client methods for many licenses concurrently, over the
+        client's pool of connections, returning results keyed by license.
+        Args:
+            licenses (list): License numbers, or facilities.
+            workers (int): The number of licenses to request concurrently,
+                the pool size by default.
+        Returns:
+            (LicenseFanOut): Returns a fan-out with the methods of the client.
+
+        Example:
+
+        ```py
+        packages = track.for_licenses(licenses).get_packages(action='active')
+        for license_number, error in packages.errors.items():
+            print('Failed to get packages:', license_number, error)
+        ```
+        """
+        return LicenseFanOut(self, licenses, workers=workers)
+
+
+    def iter_range(
+            self,
+            method,
+            start,
+            end,
+            window=timedelta(hours=24),
+            workers=DEFAULT_LICENSE_LIMIT,
+            **kwargs,
+        ):
+        """Iterate over the observations of a list endpoint, such as
+        `get_packages`, modified in a range of time of any length,
+        splitting the range into windows accepted by Metrc. Windows are
+        requested concurrently and observations are yielded in the order
+        of the windows, skipping any observation with an `id` already
+        yielded.
+        Args:
+            method (str or Callable): A client method, or the name of a
+                client method, that accepts `start` and `end` arguments.
+            start (str or datetime): The start of the range of last
+                modified times.
+            end (str or datetime): The end of the range of last modified times.
+            window (timedelta): The longest window of a request,
+                24 hours by default.
+            workers (int): The number of concurrent requests, 4 by default.
+            **kwargs: Any other arguments for the method,
+                such as `license_number`.
+        Yields:
+            (Model): Yields each observation, e.g. a Package.
+
+        Example:
+
+        ```py
+        packages = list(track.iter_range('get_packages', '2023-01-01', '2023-04-01'))
+        ```
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        windows = iter(get_date_windows(start, end, window))
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = deque()
+            try:
+                for a, b in islice(windows, max(1, workers)):
+                    futures.append(executor.submit(method, start=a, end=b, **kwargs))
+                while futures:
+                    response = futures.popleft().result()
+                    for a, b in islice(windows, 1):
+                        futures.append(executor.submit(method, start=a, end=b, **kwargs))
+                    if response is None:
+                        continue
+                    if not isinstance(response, list):
+                        response = [response]
+                    for obs in response:
+                        if isinstance(obs, dict):
+                            uid = obs.get('Id', obs.get('id'))
+                        else:
+                            uid = getattr(obs, 'uid', None)
+                        if uid is not None:
+                            if uid in seen:
+                                continue
+                            seen.add(uid)
+                        yield obs
+            finally:
+                for future in futures:
+                    future.cancel()
 
 
     #-------------------------------------------------------------------
@@ -223,7 +751,7 @@ class Metrc(object):
         """Get all facilities."""
         url = METRC_FACILITIES_URL
         response = self.request('get', url)
-        return [Facility(self, x) for x in response]
+        return self.create_models(Facility, response)
 
 
     def get_facility(self, license_number=''):
@@ -247,7 +775,7 @@ class Metrc(object):
         url = METRC_EMPLOYEES_URL
         params = self.format_params(license_number=license_number or self.primary_license)
         response = self.request('get', url, params=params)
-        return [Employee(self, x) for x in response]
+        return self.create_models(Employee, response)
 
 
     #-------------------------------------------------------------------
@@ -308,7 +836,7 @@ class Metrc(object):
         try:
             return Receipt(self, response, license_number)
         except AttributeError:
-            return [Receipt(self, x, license_number) for x in response]
+            return self.create_models(Receipt, response, license_number)
 
 
     def get_return_reasons(self, license_number=''):
@@ -396,7 +924,7 @@ class Metrc(object):
             return Harvest(self, response, license_number)
         except AttributeError:
             try:
-                return [Harvest(self, x, license_number) for x in response]
+                return self.create_models(Harvest, response, license_number)
             except AttributeError:
                 return response
 
@@ -484,7 +1012,7 @@ class Metrc(object):
         params = self.format_params(license_number=license_number or self.primary_license)
         response = self.request('get', url, params=params)
         try:
-            return [Category(self, x, license_number) for x in response]
+            return self.create_models(Category, response, license_number)
         except AttributeError:
             return response
 
@@ -536,7 +1064,7 @@ class Metrc(object):
             return Item(self, response, license_number)
         except AttributeError:
             try:
-                return [Item(self, x, license_number) for x in response]
+                return self.create_models(Item, response, license_number)
             except AttributeError:
                 return response
 
@@ -659,7 +1187,7 @@ class Metrc(object):
             license_number=license_number or self.primary_license,
         )
         response = self.request('get', url, params=params)
-        return [LabResult(self, x) for x in response]
+        return self.create_models(LabResult, response)
 
 
     def get_test_types(self, license_number=''):
@@ -793,7 +1321,7 @@ class Metrc(object):
             return Location(self, response, license_number)
         except AttributeError:
             try:
-                return [Location(self, x, license_number) for x in response]
+                return self.create_models(Location, response, license_number)
             except:
                 return response
 
@@ -949,7 +1477,7 @@ class Metrc(object):
             return Package(self, response, license_number)
         except AttributeError:
             try:
-                return [Package(self, x, license_number) for x in response]
+                return self.create_models(Package, response, license_number)
             except AttributeError:
                 return response
 
@@ -1102,7 +1630,7 @@ class Metrc(object):
             return Patient(self, response, license_number)
         except AttributeError:
             try:
-                return [Patient(self, x, license_number) for x in response]
+                return self.create_models(Patient, response, license_number)
             except AttributeError:
                 return response
 
@@ -1240,7 +1768,7 @@ class Metrc(object):
             return PlantBatch(self, response, license_number)
         except AttributeError:
             try:
-                return [PlantBatch(self, x, license_number) for x in response]
+                return self.create_models(PlantBatch, response, license_number)
             except AttributeError:
                 return response
 
@@ -1449,7 +1977,7 @@ class Metrc(object):
             return Plant(self, response, license_number)
         except AttributeError:
             try:
-                return [Plant(self, x, license_number) for x in response]
+                return self.create_models(Plant, response, license_number)
             except AttributeError:
                 return response
 
@@ -1566,7 +2094,7 @@ class Metrc(object):
         try:
             return Receipt(self, response, license_number)
         except AttributeError:
-            return [Receipt(self, x, license_number) for x in response]
+            return self.create_models(Receipt, response, license_number)
 
 
     def get_transactions(
@@ -1594,7 +2122,7 @@ class Metrc(object):
         try:
             return Transaction(self, response, license_number)
         except AttributeError:
-            return [Transaction(self, x, license_number) for x in response]
+            return self.create_models(Transaction, response, license_number)
 
 
     def get_customer_types(self, license_number=''):
@@ -1707,7 +2235,7 @@ class Metrc(object):
         try:
             return Strain(self, response, license_number)
         except AttributeError:
-            return [Strain(self, x, license_number) for x in response]
+            return self.create_models(Strain, response, license_number)
 
 
     def create_strain(self, data, license_number='', return_obs=False):
@@ -1839,7 +2367,7 @@ class Metrc(object):
         try:
             return Transfer(self, response, license_number)
         except AttributeError:
-            return [Transfer(self, x, license_number) for x in response]
+            return self.create_models(Transfer, response, license_number)
 
 
     def get_transfer_packages(self, uid, license_number='', action='packages'):
@@ -2030,7 +2558,7 @@ class Metrc(object):
         try:
             return TransferTemplate(self, response, license_number)
         except AttributeError:
-            return [TransferTemplate(self, x, license_number) for x in response]
+            return self.create_models(TransferTemplate, response, license_number)
 
 
     def create_transfer_templates(self, data, license_number='', return_obs=False):
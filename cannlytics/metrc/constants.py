@@ -4,7 +4,7 @@ Copyright (c) 2021-2022 Cannlytics and Cannlytics Contributors
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/5/2021
-Updated: 12/10/2021
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 This module contains Metrc variables that are constant.
@@ -14,6 +14,39 @@ This module contains Metrc variables that are constant.
 # when creating and updating objects and returning observations.
 DEFAULT_HISTORY = 5
 
+# The number of connections to keep open to the Metrc API.
+DEFAULT_POOL_SIZE = 10
+
+# The number of concurrent requests allowed to each Metrc API host,
+# and to each license, by an asynchronous client.
+DEFAULT_HOST_LIMIT = 8
+DEFAULT_LICENSE_LIMIT = 4
+
+# The number of requests per second allowed for each state and vendor
+# API key, and the retries of throttled or failed requests, with the
+# base and longest delays in seconds between retries.
+DEFAULT_RATE_LIMIT = 150
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+
+# The status codes of responses that are retried, where server errors
+# are only retried for idempotent methods.
+THROTTLE_STATUS_CODE = 429
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+IDEMPOTENT_METHODS = ['get', 'put', 'delete']
+
+# The largest number of items sent in each request when creating or
+# updating a list of objects, and the number of chunks sent concurrently.
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BULK_WORKERS = 1
+
+# The fraction of successful requests that are logged, and the largest
+# number of bytes of request and response bodies logged when bodies are
+# logged. Failed requests are always logged.
+DEFAULT_LOG_SAMPLE_RATE = 1.0
+DEFAULT_LOG_BODY_LIMIT = 1000
+
 additive_types = [
     'Fertilizer',
     'Pesticide',
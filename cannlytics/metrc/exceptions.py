@@ -4,7 +4,7 @@ Copyright (c) 2021-2022 Cannlytics and Cannlytics Contributors
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/5/2021
-Updated: 11/8/2021
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 Exceptions used when interfacing with the Metrc API.
@@ -43,3 +43,20 @@ class MetrcAPIError(Exception):
         except (AttributeError, KeyError, ValueError):
             message = 'Unknown Metrc API error'
         return message
+
+
+class MetrcBulkError(MetrcAPIError):
+    """An error raised when any chunk of a bulk request to the Metrc
+    API fails. The `result` of the bulk request records which chunks
+    failed, so that the failed chunks can be retried with
+    `error.result.retry()`.
+    """
+
+    def __init__(self, result):
+        failed = result.failed
+        message = f'{len(failed)} of {len(result.chunks)} chunks failed.'
+        if failed:
+            message += f' {failed[0].error}'
+        Exception.__init__(self, message)
+        self.response = getattr(failed[0].error, 'response', None) if failed else None
+        self.result = result
@@ -0,0 +1,129 @@
+"""
+Metrc License Fan-Out | Cannlytics
+Copyright (c) 2021-2026 Cannlytics and Cannlytics Contributors
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+This module contains the fan-out of a `Metrc` client method to many
+licenses, calling the method for each license concurrently and
+returning the results keyed by license, with any errors recorded by
+license instead of raised, so that one failing license does not lose
+the results of the others.
+"""
+# Standard imports.
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LicenseResults(dict):
+    """The results of a `Metrc` client method called for many
+    licenses, keyed by license. Errors are recorded in `errors`."""
+
+    def __init__(self, method, licenses):
+        """Initialize the results of a fan-out.
+        Args:
+            method (str): The name of the client method.
+            licenses (list): The licenses of the calls.
+        """
+        super().__init__()
+        self.method = method
+        self.licenses = licenses
+        self.errors = {}
+
+    def __repr__(self):
+        return f'<LicenseResults {self.method}: {len(self)} of {len(self.licenses)} licenses succeeded>'
+
+    @property
+    def ok(self):
+        """Whether or not the calls for all licenses succeeded."""
+        return not self.errors
+
+    @property
+    def succeeded(self):
+        """The licenses whose calls succeeded."""
+        return [x for x in self.licenses if x in self]
+
+    @property
+    def failed(self):
+        """The licenses whose calls failed."""
+        return [x for x in self.licenses if x in self.errors]
+
+    def raise_for_errors(self):
+        """Raise the error of the first failed license, if any."""
+        for license_number in self.failed:
+            raise self.errors[license_number]
+
+
+class LicenseFanOut(object):
+    """Call `Metrc` client methods for many licenses concurrently, e.g.
+    `track.for_licenses(licenses).get_packages(action='active')`."""
+
+    def __init__(self, client, licenses, workers=None):
+        """Initialize a fan-out.
+        Args:
+            client (Metrc): The client that makes the requests.
+            licenses (list): License numbers, or facilities with a
+                `license_number`. Duplicates are ignored.
+            workers (int): The number of licenses to request concurrently,
+                the client's pool size by default.
+        """
+        license_numbers = []
+        for license_number in licenses:
+            license_number = getattr(license_number, 'license_number', license_number)
+            if license_number not in license_numbers:
+                license_numbers.append(license_number)
+        self.client = client
+        self.licenses = license_numbers
+        self.workers = workers or client.pool_size
+
+    def __repr__(self):
+        return f'<LicenseFanOut {len(self.licenses)} licenses>'
+
+    def __getattr__(self, name):
+        """Get a client method that is called for each license."""
+        if name in ['client', 'licenses', 'workers'] or name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(self.client, name)
+        if not callable(method):
+            return method
+
+        def fan_out(*args, **kwargs):
+            return self.call(method, *args, **kwargs)
+
+        fan_out.__name__ = name
+        fan_out.__doc__ = method.__doc__
+        return fan_out
+
+    def call(self, method, *args, **kwargs):
+        """Call a method for each license concurrently.
+        Args:
+            method (str or Callable): A client method, or the name of a
+                client method, that accepts a `license_number` argument.
+            *args: Any positional arguments for the method.
+            **kwargs: Any other keyword arguments for the method.
+        Returns:
+            (LicenseResults): Returns the result of each license that
+                succeeded, keyed by license, and the error of each license
+                that failed in `errors`.
+        """
+        if isinstance(method, str):
+            method = getattr(self.client, method)
+        results = LicenseResults(method.__name__, self.licenses)
+        if not self.licenses:
+            return results
+        workers = max(1, min(self.workers, len(self.licenses)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                x: executor.submit(method, *args, license_number=x, **kwargs)
+                for x in self.licenses
+            }
+            for license_number, future in futures.items():
+                try:
+                    results[license_number] = future.result()
+                except Exception as error:
+                    results.errors[license_number] = error
+        if results.errors:
+            self.client._count('fan_out_errors', len(results.errors))
+        return results
@@ -4,13 +4,17 @@ Copyright (c) 2021-2023 Cannlytics and Cannlytics Contributors
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/5/2021
-Updated: 1/17/2023
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 This module contains common Metrc models.
 """
 # Standard imports:
-from typing import Any, Callable, Optional
+from collections import namedtuple
+from typing import Any, Callable, List, Optional
+
+# External imports.
+from pandas import DataFrame
 
 # Internal imports.
 from ..firebase import get_document, update_document
@@ -26,6 +30,82 @@ from ..utils.utils import (
 )
 
 
+# Record types of each model, keyed by the model and the keys of the data.
+RECORD_TYPES = {}
+
+# Formatted keys of nested data, keyed by the function and the keys.
+KEY_NAMES = {}
+
+
+def clean_nested_value(value: Any, function: Callable = camel_to_snake) -> Any:
+    """Format the keys of a nested value, a dictionary or list of
+    dictionaries, as done by `clean_nested_dictionary`.
+    Args:
+        value (Any): A value of a dictionary.
+        function (function): A function to apply to each key.
+    Returns:
+        (Any): Returns the value with cleaned keys.
+    """
+    if isinstance(value, dict):
+        keys = tuple(value)
+        names = KEY_NAMES.get((function, keys))
+        if names is None:
+            names = KEY_NAMES[(function, keys)] = [function(k) for k in keys]
+        return dict(zip(names, [
+            clean_nested_value(v, function) if isinstance(v, (dict, list)) else v
+            for v in value.values()
+        ]))
+    elif isinstance(value, list):
+        x = []
+        for v in value:
+            if isinstance(v, dict):
+                try:
+                    v = clean_nested_value(v, function)
+                except:
+                    pass
+            x.append(v)
+        return x
+    return value
+
+
+def get_record_type(model: Any, keys: tuple) -> Any:
+    """Get a compact, tuple-backed record type for the data of a model
+    with given keys. Record types are created once for each model and
+    set of keys.
+    Args:
+        model (Model): The class of the model, e.g. `Package`.
+        keys (tuple): The keys of the data, as returned by Metrc.
+    Returns:
+        (type): Returns a named tuple type with snake-case fields.
+    """
+    record_type = RECORD_TYPES.get((model, keys))
+    if record_type is None:
+        fields = [camel_to_snake(k) for k in keys]
+        base = namedtuple(f'{model.__name__}Record', fields, rename=True)
+        record_type = type(base.__name__, (base, Record), {
+            '__slots__': (),
+            '_model': model,
+        })
+        RECORD_TYPES[(model, keys)] = record_type
+    return record_type
+
+
+class Record(object):
+    """Base class of compact, read-only records of Metrc models, which
+    store values in a tuple without a reference to the client."""
+
+    __slots__ = ()
+
+    @property
+    def uid(self):
+        """The record's unique ID."""
+        return getattr(self, 'id', None)
+
+    def to_dict(self) -> dict:
+        """Returns the record's properties as a dictionary."""
+        return dict(zip(self._fields, self))
+
+
 class Model(object):
     """Base class for all Metrc models."""
 
@@ -60,6 +140,48 @@ class Model(object):
         obj = cls(client, context)
         return obj
 
+    @classmethod
+    def to_records(cls, data: List[dict]) -> List[Any]:
+        """Create compact records of the model from a list of data, with
+        the same properties as models but without per-instance
+        dictionaries, a reference to the client, or model methods.
+        Args:
+            data (list): A list of data returned by Metrc.
+        Returns:
+            (list): Returns a list of records.
+        """
+        records = []
+        for obs in data:
+            record_type = get_record_type(cls, tuple(obs.keys()))
+            records.append(record_type._make([
+                clean_nested_value(v) if isinstance(v, (dict, list)) else v
+                for v in obs.values()
+            ]))
+        return records
+
+    @classmethod
+    def to_dataframe(cls, data: List[Any]) -> DataFrame:
+        """Create a DataFrame of the model's properties from a list of
+        data returned by Metrc, building columns directly from the data
+        without creating a model for each observation. Models and
+        records are also accepted.
+        Args:
+            data (list): A list of data, models, or records.
+        Returns:
+            (DataFrame): Returns a DataFrame with a column for each property.
+        """
+        if not data:
+            return DataFrame()
+        if isinstance(data[0], (Model, Record)):
+            return DataFrame([x.to_dict() for x in data])
+        df = DataFrame.from_records(data)
+        df.columns = [camel_to_snake(x) for x in df.columns]
+        for column in df.columns[df.dtypes == object]:
+            types = set(map(type, df[column].values))
+            if dict in types or list in types:
+                df[column] = df[column].map(clean_nested_value)
+        return df
+
     @classmethod
     def from_fb(cls, client: Any, ref: str) -> Any:
         """Initialize a class from Firebase data.
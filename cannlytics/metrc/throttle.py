@@ -0,0 +1,153 @@
+"""
+Metrc Throttling | Cannlytics
+Copyright (c) 2021-2026 Cannlytics and Cannlytics Contributors
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+This module contains a token-bucket rate limiter, shared by all clients
+in a process that use the same state and vendor API key, and the delays
+used to retry throttled or failed requests to the Metrc API.
+"""
+# Standard imports.
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+import random
+import threading
+import time
+
+# External imports.
+from requests.exceptions import ConnectTimeout
+from urllib3.exceptions import NewConnectionError
+
+
+# Rate limiters shared by clients, keyed by state and vendor API key.
+RATE_LIMITERS = {}
+RATE_LIMITERS_LOCK = threading.Lock()
+
+
+class TokenBucket(object):
+    """A thread-safe token-bucket rate limiter, allowing a steady rate
+    of requests with bursts up to the capacity of the bucket."""
+
+    def __init__(self, rate, capacity=None):
+        """Initialize a token bucket.
+        Args:
+            rate (float): The number of requests allowed per second.
+            capacity (float): The largest burst of requests, the rate by default.
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, waiting until they are available.
+        Args:
+            tokens (float): The number of tokens to take, 1 by default.
+        Returns:
+            (float): Returns the number of seconds waited.
+        """
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated_at
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = max(
+                    self.paused_until - now,
+                    (tokens - self.tokens) / self.rate,
+                )
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Pause all requests for a number of seconds, for instance when
+        the API responds that requests are being throttled.
+        Args:
+            seconds (float): The number of seconds to pause.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def get_rate_limiter(state, vendor_api_key, rate, capacity=None):
+    """Get the rate limiter shared by all clients for a state and
+    vendor API key, creating the rate limiter if necessary.
+    Args:
+        state (str): The state of the traceability system.
+        vendor_api_key (str): The vendor API key.
+        rate (float): The number of requests allowed per second.
+        capacity (float): The largest burst of requests, the rate by default.
+    Returns:
+        (TokenBucket): Returns a token-bucket rate limiter.
+    """
+    key_hash = sha256(str(vendor_api_key).encode()).hexdigest()
+    key = (str(state).lower(), key_hash, rate, capacity)
+    with RATE_LIMITERS_LOCK:
+        limiter = RATE_LIMITERS.get(key)
+        if limiter is None:
+            limiter = TokenBucket(rate, capacity)
+            RATE_LIMITERS[key] = limiter
+    return limiter
+
+
+def get_retry_after(response):
+    """Get the number of seconds to wait before retrying a request from
+    the `Retry-After` header of a response, given in seconds or as a date.
+    Args:
+        response (Response): A request response.
+    Returns:
+        (float): Returns the number of seconds to wait, or `None`.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_backoff(attempt, backoff, max_backoff):
+    """Get a random delay before retrying a request, with exponential
+    backoff and full jitter.
+    Args:
+        attempt (int): The number of attempts already retried.
+        backoff (float): The base delay in seconds.
+        max_backoff (float): The longest delay in seconds.
+    Returns:
+        (float): Returns the number of seconds to wait.
+    """
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+def is_connect_error(error):
+    """Determine if a connection error happened while connecting, before
+    a request was sent, so that the request can be retried without
+    repeating it, even if it is not idempotent.
+    Args:
+        error (Exception): A connection error.
+    Returns:
+        (bool): Returns True if the request was not sent.
+    """
+    if isinstance(error, (ConnectTimeout, ConnectionRefusedError)):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
@@ -4,7 +4,7 @@ Copyright (c) 2021-2022 Cannlytics and Cannlytics Contributors
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/6/2021
-Updated: 8/18/2022
+Updated: 10/17/2026
 """
 from .utils import (
     camelcase,
@@ -18,6 +18,7 @@ from .utils import (
     dump_column,
     encode_pdf,
     get_date_range,
+    get_date_windows,
     get_directory_files,
     get_keywords,
     get_random_string,
@@ -62,6 +63,7 @@ __all__ = [
     'download_file_from_url',
     'dump_column',
     'get_date_range',
+    'get_date_windows',
     'get_directory_files',
     'get_keywords',
     'get_random_string',
@@ -5,7 +5,7 @@ Copyright (c) 2021-2023 Cannlytics
 Authors:
     Keegan Skeate <https://github.com/keeganskeate>
 Created: 11/6/2021
-Updated: 2/5/2023
+Updated: 10/17/2026
 License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 
 Description: This module contains general Cannlytics utility functions.
@@ -13,6 +13,7 @@ Description: This module contains general Cannlytics utility functions.
 # Standard imports.
 from base64 import b64encode, decodebytes
 from datetime import datetime, timedelta
+from functools import lru_cache
 import json
 import os
 from re import split, sub, findall
@@ -63,10 +64,12 @@ def camelcase(string: str) -> str:
     return key
 
 
+@lru_cache(maxsize=4096)
 def camel_to_snake(string: str) -> str:
     """Turn a camel-case string to a snake-case string.
     This function handles CamelCase better than `snake_case`.
     The function does not do well with all caps, e.g. "APP_ID".
+    Strings are memoized, as the same keys are converted repeatedly.
     Args:
         string (str): The string to convert to snake-case.
     Returns:
@@ -694,6 +697,35 @@ def get_date_range(start_date: str, end_date: str):
     return date_range
 
 
+def get_date_windows(
+        start: Any,
+        end: Any,
+        window: Optional[timedelta] = timedelta(hours=24),
+    ) -> List[Tuple[str, str]]:
+    """Split a range of times into consecutive windows that are no
+    longer than a given duration, e.g. to query an API that only
+    accepts bounded time ranges.
+    Args:
+        start (str or datetime): The start of the range.
+        end (str or datetime): The end of the range.
+        window (timedelta): The longest window, 24 hours by default (optional).
+    Returns:
+        (list): A list of tuples of ISO formatted start and end times.
+    """
+    if window <= timedelta(0):
+        raise ValueError('The window must be a positive duration.')
+    if isinstance(start, str):
+        start = parser.parse(start)
+    if isinstance(end, str):
+        end = parser.parse(end)
+    windows = []
+    while start < end:
+        stop = min(start + window, end)
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop
+    return windows
+
+
 def get_timestamp(
         date: Optional[str] = None,
         past: Optional[int] = 0,
@@ -22,14 +22,18 @@ Data Source:
 from datetime import datetime
 import gc
 import os
+import shutil
+import tempfile
 from typing import  List, Optional
 
 # External imports:
 from cannlytics.data.ccrs import (
     CCRS,
     CCRS_DATASETS,
+    build_cache,
     get_datafiles,
     merge_datasets,
+    read_datafile,
     standardize_dataset,
     unzip_datafiles,
 )
@@ -205,6 +209,168 @@ def ripple_list(file_paths, n):
     return dataset_paths
 
 
+def get_handoff_file(handoff_dir: str, datafile: str) -> str:
+    """Get the path of the handoff file of a sales items datafile."""
+    basename = datafile.split('/')[-1]
+    index = int(basename.split('_')[-1].split('.')[0])
+    return os.path.join(handoff_dir, f'sales_{index}.pkl')
+
+
+def curate_sales_datafile(
+        datafile: str,
+        data_dir: str,
+        stats_dir: str,
+        handoff_dir: str,
+    ) -> dict:
+    """Curate a CCRS sales items datafile by merging sale headers and
+    curated inventory, saving the augmented sales items. Sales items
+    datafiles are independent, so they can be curated in parallel.
+    Returns:
+        (dict): Returns the path of the augmented sales items, `outfile`,
+            and of the augmented sales items with their types and month,
+            `items`, pickled to the `handoff_dir` to be saved by month.
+    """
+    print('Augmenting:', datafile)
+    start = datetime.now()
+
+    # Define all sales fields.
+    # Note: `IsDeleted` throws a ValueError if it's a bool.
+    fields = CCRS_DATASETS['sale_details']['fields']
+    date_fields = CCRS_DATASETS['sale_details']['date_fields']
+    item_cols = list(fields.keys()) + date_fields
+    item_types = {k: fields[k] for k in fields if k not in date_fields}
+    item_types['IsDeleted'] = 'string'
+
+    # Read in the sales items.
+    items = read_datafile(
+        datafile,
+        engine='c',
+        parse_dates=date_fields,
+        usecols=item_cols,
+        dtype=item_types,
+        on_bad_lines='error',
+    )
+
+    # Remove any sales items that were deleted.
+    items = items.loc[
+        (items['IsDeleted'] != 'True') &
+        (items['IsDeleted'] != True)
+    ]
+
+    # Efficiently order sales headers.
+    basename = datafile.split('/')[-1]
+    index = int(basename.split('_')[-1].split('.')[0])
+    sale_headers_files = get_datafiles(data_dir, 'SaleHeader_', desc=False)
+    try:
+        sale_headers_files = ripple_list(sale_headers_files, index)
+    except IndexError:
+        pass
+
+    # Iterate over the sales headers until all items have been augmented.
+    items = merge_datasets(
+        items,
+        sale_headers_files,
+        dataset='sale_headers',
+        on='SaleHeaderId',
+        target='LicenseeId',
+        how='left',
+        validate='m:1',
+    )
+
+    # Standardize inventory items.
+    items = standardize_dataset(items)
+
+    # Augment with curated inventory.
+    inventory_dir = os.path.join(stats_dir, 'inventory')
+    for inventory_file in sorted_nicely(os.listdir(inventory_dir)):
+
+        # Read inventory data file.
+        try:
+            inventory_data = pd.read_excel(os.path.join(inventory_dir, inventory_file))
+        except:
+            continue
+
+        # Remove inventory item duplicates.
+        # FIXME: Why are there duplicates?
+        inventory_data['inventory_id'] = inventory_data['inventory_id'].astype(str)
+        inventory_data.drop_duplicates(subset='inventory_id', keep='first', inplace=True)
+
+        # Merge inventory data with sales data.
+        items = rmerge(
+            items,
+            inventory_data,
+            on='inventory_id',
+            how='left',
+            validate='m:1',
+        )
+
+    # # Augment with curated lab results.
+    # # FIXME: This may be overwriting data points.
+    # # Note: I think a product lab results file is needed.
+    # manager.create_log('Merging lab result data...')
+    # lab_results_columns = {
+    #     'inventory_id': str,
+    #     'lab_id': str,
+    #     'created_by': str,
+    #     'created_date': str,
+    #     'updated_by': str,
+    #     'updated_date': str,
+    #     'delta_9_thc': str,
+    #     'thca': str,
+    #     'total_thc': str,
+    #     'cbd': str,
+    #     'cbda': str,
+    #     'total_cbd': str,
+    #     'moisture_content': str,
+    #     'water_activity': str,
+    #     'status': str,
+    #     'results': str,
+    #     'pesticides': str,
+    #     'residual_solvents': str,
+    #     'heavy_metals': str,
+    # }
+    # lab_results = pd.read_excel(
+    #     results_file,
+    #     usecols=list(lab_results_columns.keys()),
+    #     dtype=lab_results_columns,
+    # )
+    # lab_results.rename(columns={
+    #     'created_by': 'lab_result_created_by',
+    #     'created_date': 'lab_result_created_date',
+    #     'updated_by': 'lab_result_updated_by',
+    #     'updated_date': 'lab_result_updated_date',
+    # }, inplace=True)
+    # # TODO: Convert certain values to numeric?
+    # # lab_results['inventory_id'] = lab_results['inventory_id'].astype(str)
+    # lab_results.drop_duplicates(subset='inventory_id', keep='first', inplace=True)
+    # items = rmerge(
+    #     items,
+    #     lab_results,
+    #     on='inventory_id',
+    #     how='left',
+    #     validate='m:1',
+    # )
+    # del lab_results
+    # gc.collect()
+
+    # Save the augmented sales items.
+    outfile = os.path.join(stats_dir, 'sales', f'sales_{index}.csv')
+    items.to_csv(outfile, index=False)
+
+    # Hand off the typed sales items to be saved by licensee by month,
+    # removing any partially written handoff file if the write fails.
+    items['month'] = items['sale_date'].apply(lambda x: x.isoformat()[:7])
+    handoff_file = get_handoff_file(handoff_dir, datafile)
+    try:
+        items.to_pickle(handoff_file)
+    except BaseException:
+        if os.path.exists(handoff_file):
+            os.remove(handoff_file)
+        raise
+    print('Curated sales file in:', datetime.now() - start)
+    return {'outfile': outfile, 'items': handoff_file}
+
+
 def curate_ccrs_sales(
         data_dir,
         stats_dir,
@@ -212,8 +378,13 @@ def curate_ccrs_sales(
         first_file: Optional[int] = 0,
         last_file: Optional[int] = None,
         manager: Optional[CCRS] = None,
+        workers: Optional[int] = 1,
+        max_memory: Optional[int] = None,
     ):
-    """Curate CCRS sales by merging additional datasets."""
+    """Curate CCRS sales by merging additional datasets. Sales items
+    datafiles are curated in a pool of `workers` processes, 1 by default
+    as each datafile may be several gigabytes, each limited to
+    `max_memory` bytes if given, then saved by licensee by month."""
 
     # Initialize.
     if manager is None:
@@ -224,6 +395,9 @@ def curate_ccrs_sales(
     # Unzip all CCRS datafiles.
     unzip_datafiles(data_dir)
 
+    # Transcode the datafiles to Parquet once, to read them quickly.
+    build_cache(data_dir, datasets=['sale_details', 'sale_headers'])
+
     # Create stats directory if it doesn't already exist.
     licensees_dir = os.path.join(stats_dir, 'licensee_stats')
     sales_stats_dir = os.path.join(stats_dir, 'sales_stats')
@@ -232,168 +406,66 @@ def curate_ccrs_sales(
     if not os.path.exists(sales_dir): os.makedirs(sales_dir)
     if not os.path.exists(sales_stats_dir): os.makedirs(sales_stats_dir)
 
-    # Define all sales fields.
-    # Note: `IsDeleted` throws a ValueError if it's a bool.
-    fields = CCRS_DATASETS['sale_details']['fields']
-    date_fields = CCRS_DATASETS['sale_details']['date_fields']
-    item_cols = list(fields.keys()) + date_fields
-    item_types = {k: fields[k] for k in fields if k not in date_fields}
-    item_types['IsDeleted'] = 'string'
-
     # Get all datafiles.
-    inventory_dir = os.path.join(stats_dir, 'inventory')
-    inventory_files = sorted_nicely(os.listdir(inventory_dir))
     sales_items_files = get_datafiles(data_dir, 'SalesDetail_')
     # lab_results_dir = os.path.join(stats_dir, 'lab_results')
     # results_file = os.path.join(lab_results_dir, 'inventory_lab_results_0.xlsx')
 
-    # Iterate over all sales items files to calculate stats.
-    # daily_licensee_sales = {}
+    # Curate each sales items file, in parallel unless `workers` is 0.
     if last_file: sales_items_files = sales_items_files[:last_file]
     if reverse:
         sales_items_files.reverse()
-    for datafile in sales_items_files[first_file:]:
-        manager.create_log(f'Augmenting: {datafile}')
-        midpoint_start = datetime.now()
-
-        # Read in the sales items.
-        items = pd.read_csv(
-            datafile,
-            sep='\t',
-            encoding='utf-16',
-            parse_dates=date_fields,
-            usecols=item_cols,
-            dtype=item_types,
+    handoff_dir = tempfile.mkdtemp(dir=stats_dir)
+    try:
+        results = manager.map_datafiles(
+            sales_items_files[first_file:],
+            curate_sales_datafile,
+            args=(data_dir, stats_dir, handoff_dir),
+            workers=workers,
+            max_memory=max_memory,
         )
 
-        # Remove any sales items that were deleted.
-        items = items.loc[
-            (items['IsDeleted'] != 'True') &
-            (items['IsDeleted'] != True)
-        ]
-
-        # Efficiently order sales headers.
-        manager.create_log('Merging sale header data...')
-        basename = datafile.split('/')[-1]
-        index = int(basename.split('_')[-1].split('.')[0])
-        sale_headers_files = get_datafiles(data_dir, 'SaleHeader_', desc=False)
-        try:
-            sale_headers_files = ripple_list(sale_headers_files, index)
-        except IndexError:
-            pass
-
-        # Iterate over the sales headers until all items have been augmented.
-        items = merge_datasets(
-            items,
-            sale_headers_files,
-            dataset='sale_headers',
-            on='SaleHeaderId',
-            target='LicenseeId',
-            how='left',
-            validate='m:1',
-        )
+        # Remove any handoff files of the datafiles that failed, e.g.
+        # if a worker was killed after handing off its sales items.
+        for datafile in results.failed:
+            manager.create_log(f'Failed to curate {datafile}: {results.errors[datafile]}')
+            handoff_file = get_handoff_file(handoff_dir, datafile)
+            if os.path.exists(handoff_file):
+                os.remove(handoff_file)
+
+        # Iterate over all augmented sales items, in order, to save sales
+        # by licensee by month, as licensees have sales in many datafiles.
+        # daily_licensee_sales = {}
+        for result in results.values():
+            manager.create_log('Saved augmented sales datafile: ' + result['outfile'])
+            try:
+                items = pd.read_pickle(result['items'])
+            finally:
+                os.remove(result['items'])
 
-        # Standardize inventory items.
-        items = standardize_dataset(items)
+            # Optional: Create a hash of the augmented sales data
+            # and save a log of the hash and the datafile name.
 
-        # Augment with curated inventory.
-        manager.create_log('Merging inventory data...')
-        for datafile in inventory_files:
+            # # At this stage, sales by licensee by day can be incremented.
+            # manager.create_log('Updating sales statistics...')
+            # daily_licensee_sales = calc_daily_sales(items, daily_licensee_sales)
 
-            # Read inventory data file.
-            try:
-                inventory_data = pd.read_excel(os.path.join(inventory_dir, datafile))
-            except:
-                continue
-
-            # Remove inventory item duplicates.
-            # FIXME: Why are there duplicates?
-            inventory_data['inventory_id'] = inventory_data['inventory_id'].astype(str)
-            inventory_data.drop_duplicates(subset='inventory_id', keep='first', inplace=True)
-            
-            # Merge inventory data with sales data.
-            items = rmerge(
+            # Save augmented sales to licensee-specific files by month.
+            manager.create_log('Saving augmented sales by month...')
+            save_licensee_items_by_month(
+                manager,
                 items,
-                inventory_data,
-                on='inventory_id',
-                how='left',
-                validate='m:1',
+                licensees_dir,
+                subset='sale_detail_id',
+                verbose=False,
             )
+            del items
+            gc.collect()
 
-        # # Augment with curated lab results.
-        # # FIXME: This may be overwriting data points.
-        # # Note: I think a product lab results file is needed.
-        # manager.create_log('Merging lab result data...')
-        # lab_results_columns = {
-        #     'inventory_id': str,
-        #     'lab_id': str,
-        #     'created_by': str,
-        #     'created_date': str,
-        #     'updated_by': str,
-        #     'updated_date': str,
-        #     'delta_9_thc': str,
-        #     'thca': str,
-        #     'total_thc': str,
-        #     'cbd': str,
-        #     'cbda': str,
-        #     'total_cbd': str,
-        #     'moisture_content': str,
-        #     'water_activity': str,
-        #     'status': str,
-        #     'results': str,
-        #     'pesticides': str,
-        #     'residual_solvents': str,
-        #     'heavy_metals': str,
-        # }
-        # lab_results = pd.read_excel(
-        #     results_file,
-        #     usecols=list(lab_results_columns.keys()),
-        #     dtype=lab_results_columns,
-        # )
-        # lab_results.rename(columns={
-        #     'created_by': 'lab_result_created_by',
-        #     'created_date': 'lab_result_created_date',
-        #     'updated_by': 'lab_result_updated_by',
-        #     'updated_date': 'lab_result_updated_date',
-        # }, inplace=True)
-        # # TODO: Convert certain values to numeric?
-        # # lab_results['inventory_id'] = lab_results['inventory_id'].astype(str)
-        # lab_results.drop_duplicates(subset='inventory_id', keep='first', inplace=True)
-        # items = rmerge(
-        #     items,
-        #     lab_results,
-        #     on='inventory_id',
-        #     how='left',
-        #     validate='m:1',
-        # )
-        # del lab_results
-        # gc.collect()
-
-        # Save the augmented sales items.
-        manager.create_log('Saving augmented sales data...')
-        outfile = os.path.join(sales_dir, f'sales_{index}.csv')
-        items.to_csv(outfile, index=False)
-        manager.create_log('Saved augmented sales datafile: ' + str(index))
-
-        # Optional: Create a hash of the augmented sales data
-        # and save a log of the hash and the datafile name.
-
-        # # At this stage, sales by licensee by day can be incremented.
-        # manager.create_log('Updating sales statistics...')
-        # daily_licensee_sales = calc_daily_sales(items, daily_licensee_sales)
-
-        # Save augmented sales to licensee-specific files by month.
-        manager.create_log('Saving augmented sales by month...')
-        items['month'] = items['sale_date'].apply(lambda x: x.isoformat()[:7])
-        save_licensee_items_by_month(
-            manager,
-            items,
-            licensees_dir,
-            subset='sale_detail_id',
-            verbose=False,
-        )
-        midpoint_end = datetime.now()
-        manager.create_log('Curated sales file in: ' + str(midpoint_end - midpoint_start))
+    # Always remove the handoff directory, with any handoff files that
+    # were not saved, even if curating or saving the sales fails.
+    finally:
+        shutil.rmtree(handoff_dir, ignore_errors=True)
 
     # === Deprecated ===
 
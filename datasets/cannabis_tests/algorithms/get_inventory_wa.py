@@ -30,8 +30,10 @@ from cannlytics.data.ccrs import (
     CCRS_DATASETS,
     CURATED_CCRS_DATASETS,
     anonymize,
+    build_cache,
     get_datafiles,
     merge_datasets,
+    read_datafile,
     save_dataset,
     unzip_datafiles,
 )
@@ -46,13 +48,13 @@ def read_items(
         date_fields: list,
     ):
     """Read CCRS inventory items and format accordingly."""
-    items = pd.read_csv(
+    items = read_datafile(
         datafile,
-        sep='\t',
-        encoding='utf-16',
+        engine='c',
         parse_dates=date_fields,
         usecols=item_cols,
         dtype=item_types,
+        on_bad_lines='error',
     )
     return items.rename(columns={
         'CreatedBy': 'inventory_created_by',
@@ -66,10 +68,10 @@ def read_items(
 
 def read_licensees(data_dir: str):
     """Read CCRS licensees data and format accordingly."""
-    licensees = pd.read_csv(
+    licensees = read_datafile(
         f'{data_dir}/Licensee_0/Licensee_0/Licensee_0.csv',
-        sep='\t',
-        encoding='utf-16',
+        engine='c',
+        on_bad_lines='error',
         usecols=['LicenseeId', 'Name', 'DBA'],
         dtype={
             'LicenseeId': 'string',
@@ -95,10 +97,10 @@ def read_products(
     fields['IsDeleted'] = 'string'
     fields['CreatedDate'] = 'string'
     fields['UpdatedDate'] = 'string'
-    products = pd.read_csv(
+    products = read_datafile(
         datafile,
-        sep='\t',
-        encoding='utf-16',
+        engine='c',
+        on_bad_lines='error',
         parse_dates=parse_dates,
         usecols=use_cols,
         dtype=fields,
@@ -284,6 +286,11 @@ def curate_ccrs_inventory(manager: CCRS, data_dir: str, stats_dir: str):
     # Unzip all CCRS datafiles.
     unzip_datafiles(data_dir)
 
+    # Transcode the datafiles to Parquet once, to read them quickly.
+    build_cache(data_dir, datasets=[
+        'areas', 'inventory', 'licensees', 'products', 'strains',
+    ])
+
     # Create stats directory if it doesn't already exist.
     inventory_dir = os.path.join(stats_dir, 'inventory')
     if not os.path.exists(inventory_dir): os.makedirs(inventory_dir)
@@ -31,9 +31,11 @@ from cannlytics.data.ccrs import (
     CCRS_ANALYSES,
     CCRS_DATASETS,
     anonymize,
+    build_cache,
     get_datafiles,
     find_detections,
     format_test_value,
+    read_datafile,
     save_dataset,
     unzip_datafiles,
 )
@@ -54,11 +56,8 @@ def read_lab_results(
     dtype = {k: v for k, v in fields.items() if v != 'datetime64'}
     dtype[value_key] = 'string' # Hot-fix for `ValueError`.
     for datafile in lab_result_files:
-        data = pd.read_csv(
+        data = read_datafile(
             datafile,
-            sep='\t',
-            encoding='utf-16',
-            engine='python',
             parse_dates=parse_dates,
             dtype=dtype,
             usecols=usecols,
@@ -198,6 +197,9 @@ def curate_ccrs_lab_results(
     # Unzip all CCRS datafiles.
     unzip_datafiles(data_dir)
 
+    # Transcode the datafiles to Parquet once, to read them quickly.
+    build_cache(data_dir, datasets=['lab_results'])
+
     # Read all lab results.
     lab_results = read_lab_results(data_dir)
 
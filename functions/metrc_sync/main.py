@@ -4,22 +4,33 @@ Copyright (c) 2023 Cannlytics
 
 Authors: Keegan Skeate <https://github.com/keeganskeate>
 Created: 3/24/2023
-Updated: 3/26/2023
+Updated: 10/17/2026
 License: MIT License <https://github.com/cannlytics/cannlytics-website/blob/main/LICENSE>
+
+Description: Sync Metrc data with Firestore incrementally. Each
+document is saved with a hash of its data, so that only new or changed
+documents are written. Entities that can be queried by last modified
+time, such as plants, are requested only for the time since the last
+sync of each license, the watermark, however long ago, falling back to
+a full resync if there is no valid watermark or a full sync is
+requested with the `full_sync` field of the API key data.
 """
 # Internal imports.
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import timedelta
+from hashlib import sha256
+import json
+from typing import Callable, Optional
 
 # External imports.
 from cannlytics.firebase import (
     access_secret_version,
-    get_collection,
+    get_document,
     update_documents,
     update_document,
 )
 from cannlytics.metrc import Metrc, MetrcAPIError
 from cannlytics.utils import get_timestamp
+from dateutil import parser
 from firebase_admin import initialize_app, firestore
 import google.auth
 
@@ -32,6 +43,16 @@ except ValueError:
 db = firestore.client()
 _, project_id = google.auth.default()
 
+# The start of a full resync of entities queried by last modified time.
+DEFAULT_SYNC_START = '2021-01-01'
+
+# The overlap of incremental syncs, to allow for clock skew and
+# observations committed late in Metrc.
+SYNC_OVERLAP = timedelta(minutes=10)
+
+# The number of stored hashes read from Firestore at a time.
+HASH_BATCH_SIZE = 300
+
 
 def get_vendor_api_key(
         state: str,
@@ -67,169 +88,284 @@ def initialize_metrc_from_key_data(
         logs=logs,
         state=state,
         test=test,
+        cache=True,
     )
 
 
+#-----------------------------------------------------------------------
+# Incremental sync engine.
+#-----------------------------------------------------------------------
+
+def get_data_hash(data: dict) -> str:
+    """Get a hash of the data of a document, independent of key order."""
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return sha256(text.encode()).hexdigest()[:32]
+
+
+def get_stored_hashes(refs: list) -> dict:
+    """Get the hashes of the data stored in Firestore documents,
+    reading only the `sync_hash` field of each document.
+    Args:
+        refs (list): A list of document paths (str).
+    Returns:
+        (dict): Returns the hash of each existing document by path.
+    """
+    hashes = {}
+    for i in range(0, len(refs), HASH_BATCH_SIZE):
+        docs = [db.document(x) for x in refs[i:i + HASH_BATCH_SIZE]]
+        for snapshot in db.get_all(docs, field_paths=['sync_hash']):
+            if snapshot.exists:
+                values = snapshot.to_dict() or {}
+                hashes[snapshot.reference.path] = values.get('sync_hash')
+    return hashes
+
+
+def save_changed_documents(
+        track: Metrc,
+        col: str,
+        objs: list,
+        get_id: Optional[Callable] = lambda x: x.id,
+    ) -> dict:
+    """Save only new or changed observations to Firestore, comparing
+    the hash of each observation with the hash stored in Firestore.
+    Args:
+        track (Metrc): The Metrc client of the observations.
+        col (str): The Firestore collection of the observations.
+        objs (list): A list of Metrc models.
+        get_id (Callable): A function to get the ID of an observation.
+    Returns:
+        (dict): Returns the number of `total` and `written` documents.
+    """
+    docs, refs = {}, []
+    for obj in objs:
+        ref = f'{col}/{get_id(obj)}'
+        if ref not in docs:
+            refs.append(ref)
+        docs[ref] = obj.to_dict()
+    stored = get_stored_hashes(refs)
+    timestamp = get_timestamp(zone=track.state)
+    changed_refs, changed_docs = [], []
+    for ref in refs:
+        data = docs[ref]
+        data_hash = get_data_hash(data)
+        if stored.get(ref) == data_hash:
+            continue
+        data['sync_hash'] = data_hash
+        data['synced_at'] = timestamp
+        changed_refs.append(ref)
+        changed_docs.append(data)
+    update_documents(changed_refs, changed_docs, database=db)
+    return {'total': len(refs), 'written': len(changed_refs)}
+
+
+def get_sync_window(
+        track: Metrc,
+        watermark: dict,
+        full: Optional[bool] = False,
+    ) -> tuple:
+    """Get the range of last modified times to sync, from the watermark
+    of the last sync less an overlap, or for a full resync if there is
+    no watermark or the watermark can not be parsed. An old watermark
+    is still used, as it is a lower bound of the changes to sync.
+    Args:
+        track (Metrc): A Metrc client.
+        watermark (dict): The watermark of the last sync, if any.
+        full (bool): Whether or not to perform a full resync.
+    Returns:
+        (tuple): Returns the start and end of the range and whether
+            or not the sync is a full resync.
+    """
+    end = get_timestamp(zone=track.state)
+    last_modified = None if full else watermark.get('last_modified')
+    if last_modified:
+        try:
+            start = parser.parse(last_modified) - SYNC_OVERLAP
+            return start.isoformat(), end, False
+        except (TypeError, ValueError, OverflowError):
+            pass
+    start = get_timestamp(date=DEFAULT_SYNC_START, zone=track.state)
+    return start, end, True
+
+
+def sync_metrc_entity(
+        track: Metrc,
+        org_id: str,
+        license_number: str,
+        entity: str,
+        get_objs: Callable,
+        full: Optional[bool] = False,
+    ) -> dict:
+    """Sync the observations of an entity modified since the last sync
+    of a license, saving only new or changed documents, then advance
+    the watermark of the license and entity. The watermark is only
+    advanced once all documents are saved.
+    Args:
+        track (Metrc): A Metrc client.
+        org_id (str): The organization of the license.
+        license_number (str): The license to sync.
+        entity (str): The entity to sync, e.g. `plants`.
+        get_objs (Callable): A function that returns the observations
+            modified in a range given `start` and `end` arguments.
+        full (bool): Whether or not to perform a full resync.
+    Returns:
+        (dict): Returns the number of `total` and `written` documents
+            and whether or not the sync was a `full` resync.
+    """
+    col = f'organizations/{org_id}/metrc/{license_number}/{entity}'
+    ref = f'organizations/{org_id}/metrc/{license_number}/sync/{entity}'
+    watermark = get_document(ref, database=db)
+    start, end, full = get_sync_window(track, watermark, full=full)
+    objs = get_objs(start=start, end=end)
+    stats = save_changed_documents(track, col, objs)
+    update_document(ref, {
+        'entity': entity,
+        'full_sync': full,
+        'last_modified': end,
+        'license_number': license_number,
+        'synced_at': get_timestamp(zone=track.state),
+        'total': stats['total'],
+        'written': stats['written'],
+    }, database=db)
+    stats['full'] = full
+    return stats
+
+
+def sync_metrc_license_lists(
+        track: Metrc,
+        org_id: str,
+        licenses: list,
+        entity: str,
+        method: str,
+        get_id: Optional[Callable] = lambda x: x.id,
+    ) -> dict:
+    """Sync an entity that can only be listed in full, such as
+    locations, for each license, saving only new or changed documents.
+    Args:
+        track (Metrc): A Metrc client.
+        org_id (str): The organization of the licenses.
+        licenses (list): The licenses to sync.
+        entity (str): The entity to sync, e.g. `locations`.
+        method (str): The client method that lists the entity.
+        get_id (Callable): A function to get the ID of an observation.
+    Returns:
+        (dict): Returns the number of `total` and `written` documents.
+    """
+    stats = {'total': 0, 'written': 0}
+    org_col = f'organizations/{org_id}/metrc'
+    results = track.for_licenses(licenses).call(method)
+    for license_number, e in results.errors.items():
+        print(f'ERROR GETTING {entity.upper()} ({license_number})', e)
+    for license_number, objs in results.items():
+        col = f'{org_col}/{license_number}/{entity}'
+        result = save_changed_documents(track, col, objs, get_id=get_id)
+        stats['total'] += result['total']
+        stats['written'] += result['written']
+    return stats
+
+
+#-----------------------------------------------------------------------
+# Entities.
+#-----------------------------------------------------------------------
+
 def sync_metrc_facilities(track: Metrc, org_id: str):
     """Sync Metrc facilities with Firestore."""
-    # Get all facilities.
-    docs, refs = [], []
     col = f'organizations/{org_id}/facilities'
     facilities = track.get_facilities()
-    licenses = [x.license['number'] for x in facilities]
-    for i, obj in enumerate(facilities):
-        data = obj.to_dict()
-        data['synced_at'] = get_timestamp(zone=track.state)
-        docs.append(data)
-        license_number = licenses[i]
-        refs.append(f'{col}/{license_number}')
-
-    # Save facilities to Firestore.
-    update_documents(refs, docs, database=db)
-    return licenses
+    save_changed_documents(
+        track,
+        col,
+        facilities,
+        get_id=lambda x: x.license['number'],
+    )
+    return [x.license['number'] for x in facilities]
 
 
 def sync_metrc_employees(track: Metrc, org_id: str, licenses: list):
     """Sync Metrc employees with Firestore."""
-    # Get all employees from each license.
-    docs, refs = [], []
-    org_col = f'organizations/{org_id}/metrc'
-    for license_number in licenses:
-        col = f'{org_col}/{license_number}/employees'
-        try:
-            objs = track.get_employees(license_number=license_number)
-        except MetrcAPIError as e:
-            print(f'ERROR GETTING EMPLOYEES ({license_number})', e)
-            continue
-        for obj in objs:
-            data = obj.to_dict()
-            data['synced_at'] = get_timestamp(zone=track.state)
-            docs.append(data)
-            employee_id = objs[0].license['number']
-            refs.append(f'{col}/{employee_id}')
-
-    # Save employees to Firestore.
-    update_documents(refs, docs, database=db)
-    return docs
+    return sync_metrc_license_lists(
+        track,
+        org_id,
+        licenses,
+        'employees',
+        'get_employees',
+        get_id=lambda x: x.license['number'],
+    )
 
 
 def sync_metrc_locations(track: Metrc, org_id: str, licenses: list):
     """Sync Metrc locations with Firestore."""
-    # Get all locations from each license.
-    docs, refs = [], []
-    org_col = f'organizations/{org_id}/metrc'
-    for license_number in licenses:
-        col = f'{org_col}/{license_number}/locations'
-        try:
-            objs = track.get_locations(license_number=license_number)
-        except MetrcAPIError as e:
-            print(f'ERROR GETTING LOCATIONS ({license_number})', e)
-            continue
-        for obj in objs:
-            data = obj.to_dict()
-            data['synced_at'] = get_timestamp(zone=track.state)
-            docs.append(data)
-            doc_id = obj.id
-            refs.append(f'{col}/{doc_id}')
-
-    # Save employees to Firestore.
-    update_documents(refs, docs, database=db)
-    return docs
+    return sync_metrc_license_lists(
+        track,
+        org_id,
+        licenses,
+        'locations',
+        'get_locations',
+    )
 
 
 def sync_metrc_strains(track: Metrc, org_id: str, licenses: list):
     """Sync Metrc strains with Firestore."""
-    # Get all strains from each license.
-    docs, refs = [], []
-    org_col = f'organizations/{org_id}/metrc'
-    for license_number in licenses:
-        col = f'{org_col}/{license_number}/strains'
-        try:
-            objs = track.get_strains(license_number=license_number)
-        except MetrcAPIError as e:
-            print(f'ERROR GETTING STRAINS ({license_number})', e)
-            continue
-        for obj in objs:
-            data = obj.to_dict()
-            data['synced_at'] = get_timestamp(zone=track.state)
-            docs.append(data)
-            doc_id = obj.id
-            refs.append(f'{col}/{doc_id}')
-
-    # Save employees to Firestore.
-    update_documents(refs, docs, database=db)
-    return docs
+    return sync_metrc_license_lists(
+        track,
+        org_id,
+        licenses,
+        'strains',
+        'get_strains',
+    )
 
 
 # FIXME:
 # def sync_metrc_patients(track: Metrc, org_id: str, licenses: list):
 #     """Sync Metrc patients with Firestore."""
-#     # Get all patients from each license.
-#     docs, refs = [], []
-#     org_col = f'organizations/{org_id}/metrc'
-#     for license_number in licenses:
-#         col = f'{org_col}/{license_number}/patients'
-#         try:
-#             objs = track.get_patients(license_number=license_number)
-#         except MetrcAPIError as e:
-#             print(f'ERROR GETTING PATIENTS ({license_number})', e)
-#             continue
-#         for obj in objs:
-#             data = obj.to_dict()
-#             data['synced_at'] = get_timestamp(zone=track.state)
-#             docs.append(data)
-#             doc_id = obj.id
-#             refs.append(f'{col}/{doc_id}')
-
-#     # Save employees to Firestore.
-#     update_documents(refs, docs, database=db)
-#     return docs
+#     return sync_metrc_license_lists(
+#         track,
+#         org_id,
+#         licenses,
+#         'patients',
+#         'get_patients',
+#     )
 
 
 def sync_metrc_plants(
         track: Metrc,
         org_id: str,
-        licenses: list
+        licenses: list,
+        full: Optional[bool] = False,
     ):
-    """Sync Metrc strains with Firestore."""
-    # TODO: Handle starting / ending dates.
-    start_date = datetime.fromisoformat('2021-01-01')
-    end_date = datetime.fromisoformat('2021-02-01')
-    delta = end_date - start_date
-    date_list = [start_date + timedelta(days=x) for x in range(delta.days + 1)]
-    iso_date_list = [d.isoformat() for d in date_list]
-
-    # Get all strains from each license.
-    docs, refs = [], []
-    org_col = f'organizations/{org_id}/metrc'
+    """Sync Metrc vegetative and flowering plants modified since the
+    last sync of each license with Firestore."""
+    stats = {'total': 0, 'written': 0, 'full': 0}
     for license_number in licenses:
 
-        # TODO: Get vegetative plants.
-        plants = track.get_plants(
-            action='vegetative',
-            license_number=cultivator.license_number,
-            start=today
-        )
+        def get_plants(start, end):
+            """Get vegetative and flowering plants modified in a range."""
+            objs = []
+            for action in ['vegetative', 'flowering']:
+                objs += list(track.iter_range(
+                    'get_plants',
+                    start,
+                    end,
+                    action=action,
+                    license_number=license_number,
+                ))
+            return objs
 
-        # TODO: Get flowering plants.
-
-
-        col = f'{org_col}/{license_number}/plants'
         try:
-            objs = track.get_plants(license_number=license_number)
+            result = sync_metrc_entity(
+                track,
+                org_id,
+                license_number,
+                'plants',
+                get_plants,
+                full=full,
+            )
         except MetrcAPIError as e:
             print(f'ERROR GETTING PLANTS ({license_number})', e)
             continue
-        for obj in objs:
-            data = obj.to_dict()
-            data['synced_at'] = get_timestamp(zone=track.state)
-            docs.append(data)
-            doc_id = obj.id
-            refs.append(f'{col}/{doc_id}')
-
-    # Save employees to Firestore.
-    update_documents(refs, docs, database=db)
-    return docs
+        stats['total'] += result['total']
+        stats['written'] += result['written']
+        stats['full'] += int(result['full'])
+    return stats
 
 
 def metrc_sync(data, context):
@@ -281,27 +417,30 @@ def metrc_sync(data, context):
     # Collect aggregate statistics
     stats = {}
 
+    # Determine if a full resync is requested.
+    full = data['value']['fields'].get('full_sync', {}).get('booleanValue', False)
+
     # Sync facilities.
     licenses = sync_metrc_facilities(track, org_id)
     stats['total_facilities'] = len(licenses)
     print('Saved facilities to Firestore.')
 
-    # Sync employees.
-    docs = sync_metrc_employees(track, org_id, licenses)
-    stats['total_employees'] = len(docs)
-    print('Saved employees to Firestore.')
-
-    # Sync locations.
-    docs = sync_metrc_locations(track, org_id, licenses)
-    stats['total_locations'] = len(docs)
-    print('Saved locations to Firestore.')
-
-    # TODO: Sync strains.
-    docs = sync_metrc_strains(track, org_id, licenses)
-    stats['total_strains'] = len(docs)
-    print('Saved strains to Firestore.')
-
-    # TODO: Sync plants.
+    # Sync employees, locations, and strains, writing only changes.
+    for entity, sync_entity in [
+        ('employees', sync_metrc_employees),
+        ('locations', sync_metrc_locations),
+        ('strains', sync_metrc_strains),
+    ]:
+        result = sync_entity(track, org_id, licenses)
+        stats[f'total_{entity}'] = result['total']
+        stats[f'written_{entity}'] = result['written']
+        print(f'Saved {entity} to Firestore.')
+
+    # Sync plants modified since the last sync.
+    result = sync_metrc_plants(track, org_id, licenses, full=full)
+    stats['total_plants'] = result['total']
+    stats['written_plants'] = result['written']
+    print('Saved plants to Firestore.')
 
     # TODO: Sync plant batches.
 
@@ -331,7 +470,7 @@ def metrc_sync(data, context):
     # Update the API key data to indicate that syncing has finished.
     timestamp = get_timestamp(zone=track.state)
     refs = [ref]
-    docs = [{'sync': False, 'synced_at': timestamp}]
+    docs = [{'sync': False, 'full_sync': False, 'synced_at': timestamp}]
 
     # Prepare the statistics document for Firestore.
     refs.append(f'organizations/{org_id}/metrc_stats/{metrc_hash}')
@@ -0,0 +1,290 @@
+"""
+CCRS Cache Test
+Copyright (c) 2022-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License <https://opensource.org/licenses/MIT>
+
+Description: Test reading CCRS datafiles from a Parquet cache, using
+small synthetic CCRS exports, UTF-16, tab-separated files.
+"""
+# Standard imports.
+import os
+import random
+
+# External imports.
+import pandas as pd
+import pytest
+
+# Internal imports.
+from cannlytics.data.ccrs import (
+    CCRS,
+    CCRS_DATASETS,
+    DatasetIndex,
+    build_cache_file,
+    is_cache_fresh,
+    iter_datafile,
+    merge_datasets,
+    read_datafile,
+)
+
+
+def create_datafile(data_dir, name, rows):
+    """Create a synthetic CCRS datafile, as unzipped from an export."""
+    folder = os.path.join(data_dir, name, name)
+    os.makedirs(folder, exist_ok=True)
+    datafile = os.path.join(folder, f'{name}.csv')
+    pd.DataFrame(rows).to_csv(datafile, sep='\t', encoding='utf-16', index=False)
+    return datafile
+
+
+@pytest.fixture(name='data_dir')
+def fixture_data_dir(tmp_path):
+    """A directory of synthetic CCRS areas and products datafiles."""
+    rng = random.Random(420)
+    for i in range(2):
+        create_datafile(tmp_path, f'Areas_{i}', [{
+            'AreaId': str(i * 100 + j),
+            'LicenseeId': str(rng.randint(1, 9)),
+            'Name': f'Area {i * 100 + j}',
+            'IsQuarantine': rng.choice(['True', 'False']),
+            'ExternalIdentifier': '',
+            'IsDeleted': rng.choice(['True', 'False']),
+            'CreatedBy': 'admin',
+            'CreatedDate': f'2022-0{rng.randint(1, 9)}-1{j % 10} 12:00:00',
+            'UpdatedBy': 'admin',
+            'UpdatedDate': '2023-01-01 00:00:00',
+        } for j in range(100)])
+    create_datafile(tmp_path, 'Product_0', [{
+        'ProductId': str(j),
+        'LicenseeId': str(rng.randint(1, 9)),
+        'InventoryType': rng.choice(['Usable Marijuana', 'Waste']),
+        'Name': f'Product {j}',
+        'Description': rng.choice(['', 'Flower', 'Pre-roll']),
+        'UnitWeightGrams': rng.choice(['1', '3.5', '', 'NULL']),
+        'ExternalIdentifier': '',
+        'IsDeleted': rng.choice(['True', 'False']),
+        'CreatedBy': 'admin',
+        'CreatedDate': '2022-06-01 08:00:00',
+        'UpdatedBy': 'admin',
+        'UpdatedDate': '',
+    } for j in range(100)])
+    return str(tmp_path)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Build a Parquet cache of CCRS datafiles.
+#-----------------------------------------------------------------------
+
+def test_build_cache(data_dir):
+    """Test that each datafile is cached once and re-cached when stale."""
+    manager = CCRS(data_dir=data_dir, logs=False)
+    result = manager.build_cache()
+    assert len(result['built']) == 3
+    assert all(is_cache_fresh(x) for x in result['built'])
+    result = manager.build_cache()
+    assert not result['built'] and len(result['fresh']) == 3
+    datafile = os.path.join(data_dir, 'Areas_1', 'Areas_1', 'Areas_1.csv')
+    create_datafile(data_dir, 'Areas_1', [{'AreaId': '1', 'Name': 'Vault'}])
+    assert not is_cache_fresh(datafile)
+    assert manager.build_cache(['areas'])['built'] == [datafile]
+
+
+def test_read_datafile(data_dir):
+    """Test that reading from the cache matches reading the datafile."""
+    CCRS(data_dir=data_dir, logs=False).build_cache()
+    for dataset, name in [('areas', 'Areas_0'), ('products', 'Product_0')]:
+        datafile = os.path.join(data_dir, name, name, f'{name}.csv')
+        fields = CCRS_DATASETS[dataset]['fields']
+        parse_dates = CCRS_DATASETS[dataset]['date_fields']
+        dtype = {k: v for k, v in fields.items() if v != 'datetime64'}
+        dtype['UnitWeightGrams'] = 'string'
+        dtype = {k: v for k, v in dtype.items() if k in fields}
+        kwargs = {
+            'dtype': dtype,
+            'usecols': list(fields.keys()) + parse_dates,
+            'parse_dates': parse_dates,
+        }
+        expected = read_datafile(datafile, cache=False, **kwargs)
+        cached = read_datafile(datafile, **kwargs)
+        pd.testing.assert_frame_equal(cached, expected, check_dtype=False)
+        assert [x.kind for x in cached.dtypes] == [x.kind for x in expected.dtypes]
+
+
+def test_merge_datasets_from_cache(data_dir):
+    """Test that merging datasets from the cache matches merging the
+    datafiles."""
+    items = pd.DataFrame({'AreaId': [str(x) for x in range(0, 200, 7)]})
+    area_files = [
+        os.path.join(data_dir, x, x, f'{x}.csv') for x in ['Areas_0', 'Areas_1']
+    ]
+    kwargs = {'dataset': 'areas', 'on': 'AreaId', 'target': 'Name'}
+    expected = merge_datasets(items, area_files, **kwargs)
+    CCRS(data_dir=data_dir, logs=False).build_cache()
+    cached = merge_datasets(items, area_files, **kwargs)
+    pd.testing.assert_frame_equal(cached, expected)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Read and merge CCRS datafiles in chunks.
+#-----------------------------------------------------------------------
+
+def test_iter_datafile(data_dir):
+    """Test that chunks of a datafile, from the datafile and from the
+    cache, match reading the datafile at once."""
+    datafile = os.path.join(data_dir, 'Areas_0', 'Areas_0', 'Areas_0.csv')
+    kwargs = {
+        'dtype': {'AreaId': 'string', 'IsDeleted': 'boolean'},
+        'usecols': ['AreaId', 'IsDeleted', 'CreatedDate'],
+        'parse_dates': ['CreatedDate'],
+    }
+    expected = read_datafile(datafile, cache=False, **kwargs)
+    for cache in [False, True]:
+        if cache:
+            build_cache_file(datafile, chunksize=30)
+        chunks = list(iter_datafile(datafile, chunksize=30, **kwargs))
+        assert [len(x) for x in chunks] == [30, 30, 30, 10]
+        data = pd.concat(chunks, ignore_index=True)
+        pd.testing.assert_frame_equal(data, expected, check_dtype=False)
+
+
+def test_build_cache_file_in_chunks(tmp_path):
+    """Test that a field that can only be typed in the first chunks
+    is cached as text."""
+    rows = [{'ProductId': str(i), 'UnitWeightGrams': '1'} for i in range(100)]
+    rows[-1]['CreatedDate'] = 'Not a date'
+    for row in rows[:-1]:
+        row['CreatedDate'] = '2022-06-01 08:00:00'
+    datafile = create_datafile(tmp_path, 'Product_0', rows)
+    expected = read_datafile(datafile, parse_dates=['CreatedDate'], cache=False)
+    build_cache_file(datafile, chunksize=25)
+    data = read_datafile(datafile)
+    assert str(data['CreatedDate'].dtype) == 'string'
+    assert data['CreatedDate'].iloc[-1] == 'Not a date'
+    assert len(data) == 100
+    data = read_datafile(datafile, parse_dates=['CreatedDate'])
+    assert data['CreatedDate'].tolist() == expected['CreatedDate'].tolist()
+    for cache in [False, True]:
+        with pytest.raises(ValueError):
+            read_datafile(datafile, usecols=['ProductId', 'Name'], cache=cache)
+
+
+def test_merge_datasets_in_chunks(data_dir):
+    """Test that merging datasets a chunk at a time matches merging
+    each datafile at once."""
+    items = pd.DataFrame({
+        'AreaId': [str(x) for x in range(0, 200, 7)],
+        'Quantity': range(29),
+    })
+    area_files = [
+        os.path.join(data_dir, x, x, f'{x}.csv') for x in ['Areas_0', 'Areas_1']
+    ]
+    kwargs = {
+        'dataset': 'areas',
+        'on': 'AreaId',
+        'target': 'area_name',
+        'rename': {'Name': 'area_name'},
+    }
+    expected = merge_datasets(items, area_files, **kwargs)
+    for cache in [False, True]:
+        if cache:
+            CCRS(data_dir=data_dir, logs=False).build_cache()
+        merged = merge_datasets(items, area_files, chunksize=16, **kwargs)
+        pd.testing.assert_frame_equal(merged, expected)
+
+
+def test_merge_datasets_in_chunks_renamed(data_dir):
+    """Test that merging in chunks on a renamed column filters the
+    datafiles on the column before it is renamed."""
+    items = pd.DataFrame({'area_id': [str(x) for x in range(0, 200, 7)]})
+    area_files = [
+        os.path.join(data_dir, x, x, f'{x}.csv') for x in ['Areas_0', 'Areas_1']
+    ]
+    kwargs = {
+        'dataset': 'areas',
+        'on': 'area_id',
+        'target': 'Name',
+        'rename': {'AreaId': 'area_id'},
+    }
+    expected = merge_datasets(items, area_files, **kwargs)
+    merged = merge_datasets(items, area_files, chunksize=16, **kwargs)
+    assert len(merged) == len(items)
+    pd.testing.assert_frame_equal(merged, expected)
+
+
+def test_merge_datasets_in_chunks_empty(tmp_path):
+    """Test that merging an empty datafile in chunks, from the datafile
+    and from the cache, matches merging the datafile at once."""
+    fields = CCRS_DATASETS['areas']['fields']
+    datafile = create_datafile(tmp_path, 'Areas_0', {x: [] for x in fields})
+    items = pd.DataFrame({'AreaId': ['1', '2']})
+    kwargs = {'dataset': 'areas', 'on': 'AreaId', 'target': 'Name'}
+    expected = merge_datasets(items, [datafile], **kwargs)
+    for cache in [False, True]:
+        if cache:
+            build_cache_file(datafile)
+        merged = merge_datasets(items, [datafile], chunksize=10, **kwargs)
+        assert merged.empty
+        assert list(merged.columns) == list(expected.columns)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Merge CCRS datafiles with an index of keys.
+#-----------------------------------------------------------------------
+
+def test_merge_datasets_with_index(data_dir, tmp_path):
+    """Test that merging only the indexed rows of the cached datafiles
+    matches merging the datafiles, falling back to merging the datafiles
+    if they are not cached."""
+    items = pd.DataFrame({
+        'AreaId': [str(x) for x in range(0, 250, 7)],
+        'Quantity': range(36),
+    })
+    area_files = [
+        os.path.join(data_dir, x, x, f'{x}.csv') for x in ['Areas_0', 'Areas_1']
+    ]
+    kwargs = {
+        'dataset': 'areas',
+        'on': 'AreaId',
+        'target': 'area_name',
+        'rename': {'Name': 'area_name'},
+    }
+    expected = merge_datasets(items, area_files, **kwargs)
+    with pytest.warns(UserWarning):
+        merged = merge_datasets(items, area_files, index=True, **kwargs)
+    pd.testing.assert_frame_equal(merged, expected)
+    for datafile in area_files:
+        build_cache_file(datafile, chunksize=16)
+    merged = merge_datasets(items, area_files, index=True, **kwargs)
+    pd.testing.assert_frame_equal(merged, expected)
+    path = str(tmp_path / 'areas_index.parquet')
+    missing = pd.DataFrame({'AreaId': ['999'], 'Quantity': [1]})
+    expected = merge_datasets(missing, area_files, **kwargs)
+    for index in [True, path]:
+        merged = merge_datasets(missing, area_files, index=index, **kwargs)
+        assert merged.empty
+        assert list(merged.columns) == list(expected.columns)
+
+
+def test_dataset_index(data_dir, tmp_path):
+    """Test that an index is saved, loaded without re-indexing, and
+    re-indexes only changed datafiles."""
+    area_files = [
+        os.path.join(data_dir, x, x, f'{x}.csv') for x in ['Areas_0', 'Areas_1']
+    ]
+    path = str(tmp_path / 'areas_index.parquet')
+    index = DatasetIndex(area_files, 'AreaId', path=path)
+    assert len(index.index) == 200
+    hits = index.lookup(['7', '107', '999'])
+    assert list(hits['datafile']) == area_files
+    assert list(hits['row']) == [7, 7]
+    loaded = DatasetIndex(area_files, 'AreaId', path=path)
+    assert loaded.update() == []
+    pd.testing.assert_frame_equal(loaded.index, index.index)
+    create_datafile(data_dir, 'Areas_1', [{'AreaId': '999', 'Name': 'Vault'}])
+    assert loaded.update() == [area_files[1]]
+    assert list(loaded.lookup(['107', '999'])['row']) == [0]
+    rows = loaded.read_rows(area_files[1], [0], usecols=['AreaId', 'Name'])
+    assert rows['Name'].tolist() == ['Vault']
@@ -0,0 +1,131 @@
+"""
+CCRS Lab Results Test
+Copyright (c) 2022-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License <https://opensource.org/licenses/MIT>
+
+Description: Test formatting CCRS lab results for all items at once
+against formatting the lab results of each item one at a time.
+"""
+# Standard imports.
+import random
+
+# External imports.
+import numpy as np
+import pandas as pd
+import pytest
+
+# Internal imports.
+from cannlytics.data.ccrs import (
+    CCRS_ANALYSES,
+    CCRS_ANALYTES,
+    find_detections,
+    format_lab_results,
+    format_test_value,
+)
+
+
+ANALYTES = [
+    'delta_9_thc',
+    'thca',
+    'total_thc',
+    'cbd',
+    'cbda',
+    'total_cbd',
+    'moisture_content',
+    'water_activity',
+]
+
+
+def format_item_results(item_results):
+    """Format the lab results of one item with `format_test_value` and
+    `find_detections`, one test scan per value."""
+    tests = item_results.copy()
+    analytes = tests['TestName'].map(CCRS_ANALYTES)
+    tests['key'] = analytes.map(lambda x: x['key'])
+    tests['type'] = analytes.map(lambda x: x['type']).map(CCRS_ANALYSES)
+    item = item_results.iloc[0].drop(['TestName', 'TestValue', 'LabTestStatus'])
+    entry = {
+        **item.to_dict(),
+        'analyses': list(tests['type'].dropna().unique()),
+        **{x: format_test_value(tests, x) for x in ANALYTES},
+        'status': 'Fail' if 'Fail' in item_results['LabTestStatus'].unique() else 'Pass',
+    }
+    for analysis in ['pesticides', 'residual_solvents', 'heavy_metals']:
+        entry[analysis] = find_detections(
+            tests,
+            analysis,
+            analysis_key='type',
+            value_key='TestValue',
+        )
+    return entry
+
+
+@pytest.fixture(name='lab_results')
+def fixture_lab_results():
+    """Synthetic CCRS lab results of many items."""
+    rng = random.Random(420)
+    test_names = [
+        'd9-THC',
+        'd9-THCA',
+        'Total d9-THC',
+        'CBD',
+        'CBDA',
+        'Total CBD',
+        'Moisture Content',
+        'Water Activity',
+        'Pesticide - Abamectin (ppm)',
+        'Pesticide - Acephate (ppm)',
+        'Residual Solvent - Butanes (ppm)',
+        'Heavy Metal - Lead (ppm)',
+        'Microbiological - Salmonella (CFU/g)',
+    ]
+    rows = []
+    for i in range(200):
+        for test_name in rng.sample(test_names, rng.randint(1, len(test_names))):
+            for _ in range(rng.choice([1, 1, 2])):
+                rows.append({
+                    'LabResultId': str(len(rows)),
+                    'InventoryId': str(i),
+                    'LabTestStatus': rng.choice(['Pass'] * 9 + ['Fail']),
+                    'TestName': test_name,
+                    'TestValue': rng.choice([0, 0.1, 1.5, 22.4, '', 'ND']),
+                })
+    return pd.DataFrame(rows).sample(frac=1, random_state=420)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Format lab results.
+#-----------------------------------------------------------------------
+
+def test_format_lab_results(lab_results):
+    """Test that formatting the lab results of all items at once matches
+    formatting the lab results of each item."""
+    items = pd.DataFrame({'InventoryId': [str(x) for x in range(0, 250, 3)]})
+    formatted = format_lab_results(items, lab_results)
+    matches = lab_results.loc[lab_results['InventoryId'].isin(items['InventoryId'])]
+    expected = pd.DataFrame([
+        format_item_results(x)
+        for _, x in matches.groupby('InventoryId', sort=False)
+    ])
+    assert len(formatted) == matches['InventoryId'].nunique()
+    assert list(formatted.columns) == list(expected.columns)
+    for column in expected.columns:
+        if column in ANALYTES:
+            np.testing.assert_allclose(
+                formatted[column].astype(float),
+                expected[column].astype(float),
+            )
+        else:
+            assert formatted[column].tolist() == expected[column].tolist(), column
+
+
+def test_format_lab_results_no_matches(lab_results):
+    """Test that items without lab results are formatted as empty."""
+    items = pd.DataFrame({'InventoryId': ['not-an-item']})
+    formatted = format_lab_results(items, lab_results)
+    assert formatted.empty
+    assert 'InventoryId' in formatted.columns
@@ -0,0 +1,125 @@
+"""
+CCRS Map Datafiles Test
+Copyright (c) 2022-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License <https://opensource.org/licenses/MIT>
+
+Description: Test mapping a function over CCRS datafiles in a pool of
+processes, with ordered results, partial failures, memory limits, and
+killed workers.
+"""
+# Standard imports.
+from concurrent.futures.process import BrokenProcessPool
+import os
+import sys
+
+# External imports.
+import numpy as np
+import pandas as pd
+import pytest
+
+# Internal imports.
+from cannlytics.data.ccrs import CCRS, map_datafiles, read_datafile
+
+
+def create_datafile(data_dir, name, rows):
+    """Create a synthetic CCRS datafile, as unzipped from an export."""
+    folder = os.path.join(data_dir, name, name)
+    os.makedirs(folder, exist_ok=True)
+    datafile = os.path.join(folder, f'{name}.csv')
+    pd.DataFrame(rows).to_csv(datafile, sep='\t', encoding='utf-16', index=False)
+    return datafile
+
+
+def count_areas(datafile, suffix=''):
+    """Count the areas of a datafile, failing for a bad datafile."""
+    if 'Areas_2' in datafile:
+        raise ValueError('Bad datafile.')
+    data = read_datafile(datafile, usecols=['AreaId'])
+    return f'{len(data)}{suffix}'
+
+
+def allocate_memory(datafile):
+    """Allocate about 1 GB of memory for the last datafile."""
+    if 'Areas_3' in datafile:
+        return np.ones(1 << 27).sum()
+    return 0
+
+
+def exit_process(datafile):
+    """Exit the process for one datafile, as if killed when out of memory."""
+    if 'Areas_1' in datafile:
+        os._exit(1)
+    return os.path.basename(datafile)
+
+
+@pytest.fixture(name='data_dir')
+def fixture_data_dir(tmp_path):
+    """A directory of synthetic CCRS areas datafiles."""
+    for i in range(4):
+        create_datafile(tmp_path, f'Areas_{i}', [
+            {'AreaId': str(j), 'Name': f'Area {j}'} for j in range(10 * (i + 1))
+        ])
+    return str(tmp_path)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Map a function over datafiles in a pool of processes.
+#-----------------------------------------------------------------------
+
+def test_map_datafiles(data_dir):
+    """Test that results are in the order of the datafiles, with the
+    error of a failed datafile recorded by datafile."""
+    manager = CCRS(data_dir=data_dir, logs=False)
+    datafiles = manager.get_datafiles(data_dir, 'Areas_', desc=True)
+    for workers in [0, 2]:
+        results = map_datafiles(
+            datafiles,
+            count_areas,
+            kwargs={'suffix': ' areas'},
+            workers=workers,
+            verbose=False,
+        )
+        assert list(results.keys()) == [datafiles[0], datafiles[2], datafiles[3]]
+        assert list(results.values()) == ['40 areas', '20 areas', '10 areas']
+        assert results.failed == [datafiles[1]]
+        assert isinstance(results.errors[datafiles[1]], ValueError)
+        with pytest.raises(ValueError):
+            results.raise_for_errors()
+
+
+def test_map_dataset(data_dir):
+    """Test mapping the datafiles of a dataset."""
+    manager = CCRS(data_dir=data_dir, logs=False)
+    results = manager.map_datafiles('areas', count_areas, workers=2)
+    assert list(results.values()) == ['10', '20', '40']
+    assert not results.ok
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Memory limits require POSIX.')
+def test_map_datafiles_max_memory(data_dir):
+    """Test that a datafile that exceeds the memory limit of a worker
+    fails without failing the other datafiles."""
+    datafiles = CCRS(logs=False).get_datafiles(data_dir, 'Areas_', desc=False)
+    results = map_datafiles(
+        datafiles,
+        allocate_memory,
+        workers=2,
+        max_memory=1 << 30,
+        verbose=False,
+    )
+    assert results.succeeded == datafiles[:3]
+    assert isinstance(results.errors[datafiles[3]], MemoryError)
+
+
+def test_map_datafiles_killed_worker(data_dir):
+    """Test that a killed worker fails only the datafile it was mapping,
+    with the other datafiles retried."""
+    datafiles = CCRS(logs=False).get_datafiles(data_dir, 'Areas_', desc=False)
+    results = map_datafiles(datafiles, exit_process, workers=2, verbose=False)
+    assert results.failed == [datafiles[1]]
+    assert isinstance(results.errors[datafiles[1]], BrokenProcessPool)
+    assert list(results.values()) == ['Areas_0.csv', 'Areas_2.csv', 'Areas_3.csv']
@@ -0,0 +1,152 @@
+"""
+CoADoc Benchmarks
+Copyright (c) 2023-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description: Benchmarks of CoADoc performance.
+"""
+# Standard imports:
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: Cold-start construction of a parser.
+#-----------------------------------------------------------------------
+
+COLD_START = """
+from time import perf_counter
+start = perf_counter()
+from cannlytics.data.coas.coas import CoADoc
+imported = perf_counter()
+parser = CoADoc(init_all={init_all})
+constructed = perf_counter()
+parser = CoADoc(init_all={init_all})
+print(imported - start, constructed - imported, perf_counter() - constructed)
+"""
+
+
+def benchmark_cold_start(init_all: bool = False, runs: int = 5):
+    """Time importing `CoADoc`, constructing a parser in a fresh
+    interpreter, then constructing a second parser, with all of the
+    parsing routines initialized eagerly (`init_all=True`, the prior
+    default) or lazily (`init_all=False`)."""
+    imports, cold, warm = [], [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START.format(init_all=init_all)],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        times = output.stdout.strip().split('\n')[-1].split(' ')
+        imports.append(float(times[0]))
+        cold.append(float(times[1]))
+        warm.append(float(times[2]))
+    print('init_all=%s: import %.3fs, first parser %.3fs, next parser %.6fs (median of %i)' % (
+        init_all, median(imports), median(cold), median(warm), runs,
+    ))
+    return median(cold), median(warm)
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: OCR of a scanned CoA, on disk versus in memory.
+#-----------------------------------------------------------------------
+
+def benchmark_ocr(filename: str, resolution: int = 150, workers: int = None):
+    """Time applying OCR to a PDF page by page with temporary files
+    and in memory with a pool of processes."""
+    from time import perf_counter
+    from cannlytics.data.coas.coas import CoADoc
+    parser = CoADoc(cache=False)
+    temp_path = tempfile.mkdtemp()
+    outfile = os.path.join(temp_path, 'ocr-coa.pdf')
+    start = perf_counter()
+    parser.pdf_ocr(filename, outfile, temp_path=temp_path, resolution=resolution)
+    on_disk = perf_counter() - start
+    start = perf_counter()
+    parser.pdf_ocr(filename, None, resolution=resolution, in_memory=True, workers=workers)
+    in_memory = perf_counter() - start
+    print('OCR at %i DPI: on disk %.2fs, in memory %.2fs' % (
+        resolution, on_disk, in_memory,
+    ))
+    return on_disk, in_memory
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: QR code decodes per document.
+#-----------------------------------------------------------------------
+
+def benchmark_qr_codes(
+        coa_dir: str = '../../../tests/assets/coas',
+        qr_code_dir: str = '../../../tests/assets/qr-codes',
+    ):
+    """Count the QR code decodes per document needed to find the QR
+    code on each CoA PDF, trying images in `sandwich_list` order versus
+    ranked by likelihood, and the decodes per QR code image scanned."""
+    import pdfplumber
+    from cannlytics.data.coas.coas import CoADoc
+    from cannlytics.utils import sandwich_list
+    parser = CoADoc(cache=False)
+
+    # Count decodes trying images in order, then ranked by likelihood.
+    baseline, ranked, docs = 0, 0, 0
+    for path, _, files in os.walk(coa_dir):
+        for name in files:
+            if not name.endswith('.pdf'):
+                continue
+            try:
+                pdf = pdfplumber.open(os.path.join(path, name))
+                page = pdf.pages[0]
+            except:
+                continue
+            for img in sandwich_list(page.images):
+                baseline += 1
+                try:
+                    if parser.decode_pdf_qr_code(page, img)[0].data:
+                        break
+                except:
+                    continue
+            parser.qr_code_decodes = 0
+            lims = parser.identify_lims(page)
+            parser.find_pdf_qr_code_url(page, lims=lims)
+            ranked += parser.qr_code_decodes
+            docs += 1
+    print('CoA PDFs: %.2f decodes per document in order, %.2f ranked (%i PDFs)' % (
+        baseline / max(docs, 1), ranked / max(docs, 1), docs,
+    ))
+
+    # Count decodes per QR code image.
+    parser.qr_code_decodes = 0
+    images = os.listdir(qr_code_dir)
+    for name in images:
+        parser.scan(os.path.join(qr_code_dir, name), temp_path=tempfile.mkdtemp())
+    print('QR code images: %.2f decodes per image (%i images)' % (
+        parser.qr_code_decodes / max(len(images), 1), len(images),
+    ))
+    return baseline / max(docs, 1), ranked / max(docs, 1)
+
+
+# === Benchmarks ===
+if __name__ == '__main__':
+
+    # BENCHMARK: Cold-start construction, eager versus lazy.
+    eager, _ = benchmark_cold_start(init_all=True)
+    lazy, _ = benchmark_cold_start(init_all=False)
+    print('First parser speed-up with lazy loading: %.0fx' % (eager / lazy))
+
+    # BENCHMARK: QR code decodes per document.
+    benchmark_qr_codes()
+
+    # BENCHMARK: OCR of a scanned CoA at the low and high resolutions.
+    scanned_coa = '../../../tests/assets/coas/210000068-Cloud-Cake-1g.pdf'
+    if os.path.exists(scanned_coa):
+        for dpi in [150, 300]:
+            benchmark_ocr(scanned_coa, resolution=dpi)
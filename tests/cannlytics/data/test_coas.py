@@ -10,14 +10,19 @@ License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
 Description:  A rigorous test of CoADoc parsing.
 """
 # Standard imports:
+from io import BytesIO
+import json
 import os
+import shutil
 import tempfile
 
 # External imports:
 import pandas as pd
+import pytest
 
 # Internal imports:
 from cannlytics.data.coas import CoADoc
+from cannlytics.data.coas.coas import OCR_RESOLUTIONS
 from cannlytics.data.data import create_hash
 
 
@@ -73,6 +78,47 @@ def parse_coa_directory(data_dir: str, temp_path = None):
     print('Saved CoA data:', outfile)
 
 
+#-----------------------------------------------------------------------
+# [✓] TEST: Parse a directory of COA PDFs in parallel.
+#-----------------------------------------------------------------------
+
+def parse_coa_directory_in_parallel(data_dir: str, workers: int = 4):
+
+    # Initialize a parser.
+    parser = CoADoc()
+
+    # Parse all of the PDFs with a pool of workers.
+    coa_data, errors = parser.parse_many(data_dir, workers=workers)
+    for error in errors:
+        print('Error:', error['doc'], error['error'])
+    print('Parsed %i COAs.' % len(coa_data))
+
+    # Ensure that every document is accounted for, in order.
+    docs = [x for x in os.listdir(data_dir) if x.endswith('.pdf')]
+    assert len(coa_data) + len(errors) == len(docs)
+    return coa_data
+
+
+def test_parse_many():
+    """Test that COAs parsed with a pool of processes or threads are
+    returned in order, with the error of a missing file recorded
+    without aborting the batch."""
+    data_dir = '../../../tests/assets/coas/sc-labs'
+    if not os.path.exists(data_dir):
+        data_dir = 'tests/assets/coas/sc-labs'
+    pdfs = sorted(os.path.join(data_dir, x) for x in os.listdir(data_dir))
+    missing = os.path.join(tempfile.mkdtemp(), 'missing.pdf')
+    docs = [pdfs[0], missing] + pdfs[1:]
+    parser = CoADoc(cache=False)
+    expected = [parser.parse_pdf(x)['product_name'] for x in pdfs]
+    for mode in ['process', 'thread']:
+        coa_data, errors = parser.parse_many(docs, workers=2, mode=mode)
+        assert [x['product_name'] for x in coa_data] == expected
+        assert len(errors) == 1
+        assert errors[0]['doc'] == missing
+        assert errors[0]['error'].startswith('FileNotFoundError')
+
+
 #-----------------------------------------------------------------------
 # [✓] TEST: Parse a directory of COA QR codes.
 #-----------------------------------------------------------------------
@@ -119,6 +165,353 @@ def parse_coa_images(data_dir: str, temp_path = None):
     return all_data
 
 
+#-----------------------------------------------------------------------
+# [✓] TEST: Identify LIMS with the LIMS index.
+#-----------------------------------------------------------------------
+
+def test_lims_index():
+    """Test that the LIMS index identifies the same LIMS as searching
+    for each LIMS URL and name in turn."""
+    from cannlytics.data.coas.coas import LIMS, LIMSIndex
+    index = LIMSIndex(LIMS)
+    texts = [
+        'Certificate of Analysis https://client.sclabs.com/verify',
+        'Kaycha Labs\nhttps://lims.tagleaf.com/coas/abc',
+        'Results by Con\x00dent Cannabis, and Steep Hill',
+        'An unknown lab.',
+        '',
+    ]
+    for text in texts:
+        expected = None
+        for key, values in LIMS.items():
+            if any(values.get(x) and values[x] in text for x in ['url', 'lims']):
+                expected = key
+                break
+        assert index.identify(text) == expected
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Cache parsed COA data.
+#-----------------------------------------------------------------------
+
+def test_coa_cache(tmp_path, monkeypatch):
+    """Test that parsing the same PDF bytes uses the cached data and
+    that data cached by another algorithm version is ignored."""
+    assert CoADoc(cache=False).cache is None
+    parser = CoADoc(cache_dir=str(tmp_path))
+    pdf = tmp_path / 'coa.pdf'
+    pdf.write_bytes(b'%PDF-1.4 Not a real COA.')
+    key = parser.cache.get_key(str(pdf))
+    assert key == parser.cache.get_key(pdf.read_bytes())
+    lims = list(parser.lims.keys())[0]
+    data = {'product_name': 'Old-Time Moonshine'}
+    parser.cache.set(key, data, lims, parser.get_algorithm_version(lims))
+    assert parser.parse_pdf(str(pdf)) == data
+    assert parser.cache.hits == 1
+    monkeypatch.setattr(parser, 'get_algorithm_version', lambda x: 'updated')
+    assert parser.get_cached_data(key) is None
+    assert parser.cache.get(key) is None
+
+
+def test_coa_cache_default(tmp_path, monkeypatch):
+    """Test that parsed data and QR code indexes are cached by default
+    in the user's cache directory."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    parser = CoADoc()
+    cache_dir = os.path.join(str(tmp_path), 'cannlytics', 'coas')
+    assert parser.cache.cache_dir == cache_dir
+    assert os.path.isdir(cache_dir)
+    assert parser.qr_code_index.path.startswith(cache_dir)
+
+
+def test_coa_cache_eviction(tmp_path):
+    """Test that the least recently used entries are evicted when the
+    cache is larger than its maximum size."""
+    from cannlytics.data.coas.cache import CoACache
+    cache = CoACache(str(tmp_path), max_size=1000)
+    keys = [f'key-{i}' for i in range(6)]
+    for i, key in enumerate(keys[:4]):
+        cache.set(key, {'text': 'x' * 150}, 'lims', '1')
+        os.utime(cache.get_path(key), (i, i))
+    assert cache.get(keys[0]) is not None
+    for key in keys[4:]:
+        cache.set(key, {'text': 'x' * 150}, 'lims', '1')
+    cached = [x for x in keys if os.path.exists(cache.get_path(x))]
+    assert keys[0] in cached and keys[1] not in cached
+    assert keys[-1] in cached
+    sizes = [os.path.getsize(cache.get_path(x)) for x in cached]
+    assert sum(sizes) <= 1000
+    assert cache.size == sum(sizes)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Share page text and crops with a parsed document.
+#-----------------------------------------------------------------------
+
+def test_parsed_document():
+    """Test that a parsed document extracts the same text as pdfplumber,
+    extracting the text of each page and crop only once."""
+    import pdfplumber
+    from cannlytics.data.coas.document import ParsedDocument
+    doc = '../../../tests/assets/coas/sc-labs/Cherry Punch.pdf'
+    if not os.path.exists(doc):
+        doc = 'tests/assets/coas/sc-labs/Cherry Punch.pdf'
+    original = pdfplumber.open(doc)
+    parsed = ParsedDocument(pdfplumber.open(doc))
+    assert isinstance(parsed, pdfplumber.pdf.PDF)
+    page, expected = parsed.pages[0], original.pages[0]
+    bbox = (0, 0, page.width / 2, page.height / 2)
+    for _ in range(3):
+        assert page.extract_text() == expected.extract_text()
+        crop = page.within_bbox(bbox)
+        assert crop.extract_text() == expected.within_bbox(bbox).extract_text()
+    assert len(page.images) == len(expected.images)
+    assert parsed.misses['extract_text'] == 2
+    assert parsed.hits['extract_text'] == 4
+    assert parsed.hits['within_bbox'] == 2
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Rank images by how likely they are to be QR codes.
+#-----------------------------------------------------------------------
+
+def test_rank_qr_code_images():
+    """Test that square, QR code sized images are tried first, after any
+    image indexes learned from past CoAs, and that learned indexes are
+    persisted."""
+    from cannlytics.data.coas.qr_codes import QRCodeIndex, rank_qr_code_images
+    images = [
+        {'width': 600, 'height': 80, 'srcsize': (1800, 240)},
+        {'width': 200, 'height': 60, 'srcsize': (600, 180)},
+        {'width': 72, 'height': 72, 'srcsize': (290, 290), 'bits': 1},
+        {'width': 500, 'height': 500, 'srcsize': (1000, 1000)},
+    ]
+    assert rank_qr_code_images(images) == [2, 3, 1, 0]
+    assert rank_qr_code_images(images, [1, 7]) == [1, 2, 3, 0]
+    path = os.path.join(tempfile.mkdtemp(), 'indexes', 'qr_code_index.json')
+    index = QRCodeIndex(path)
+    index.record('SC Labs', 4)
+    index.record('SC Labs', 0)
+    index.record('SC Labs', 0)
+    assert QRCodeIndex(path).get('SC Labs') == [0, 4]
+    assert QRCodeIndex(path).get('Kaycha Labs') == []
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Apply OCR to PDFs in memory.
+#-----------------------------------------------------------------------
+
+def test_pdf_ocr_in_memory():
+    """Test that OCR applied in memory, in parallel, recognizes the
+    same text as OCR applied with temporary files."""
+    import pdfplumber
+    if shutil.which('tesseract') is None:
+        pytest.skip('Tesseract is not installed.')
+    pytest.importorskip('wand.image')
+    doc = '../../../tests/assets/coas/sc-labs/Cherry Punch.pdf'
+    if not os.path.exists(doc):
+        doc = 'tests/assets/coas/sc-labs/Cherry Punch.pdf'
+    parser = CoADoc(cache=False)
+    temp_path = tempfile.mkdtemp()
+    outfile = os.path.join(temp_path, 'ocr.pdf')
+    parser.pdf_ocr(doc, outfile, temp_path=temp_path, resolution=150)
+    ocr_pdf = parser.pdf_ocr(doc, None, resolution=150, in_memory=True, workers=2)
+    with pdfplumber.open(outfile) as expected, pdfplumber.open(ocr_pdf) as actual:
+        assert len(actual.pages) == len(expected.pages)
+        for page, expected_page in zip(actual.pages, expected.pages):
+            assert page.extract_text() == expected_page.extract_text()
+    assert sorted(os.listdir(temp_path)) == ['ocr.pdf']
+
+
+def test_ocr_resolutions(monkeypatch):
+    """Test that OCR is applied at a low resolution first, and only at
+    higher resolutions while the LIMS of the PDF is still unknown."""
+    from pypdf import PdfWriter
+    data_dir = '../../../tests/assets/coas/sc-labs'
+    if not os.path.exists(data_dir):
+        data_dir = 'tests/assets/coas/sc-labs'
+    with open(os.path.join(data_dir, 'Cherry Punch.pdf'), 'rb') as f:
+        coa = f.read()
+
+    # Create a PDF without any text, such as a scanned COA.
+    scan = os.path.join(tempfile.mkdtemp(), 'scan.pdf')
+    writer = PdfWriter()
+    writer.add_blank_page(612, 792)
+    with open(scan, 'wb') as f:
+        writer.write(f)
+    with open(scan, 'rb') as f:
+        blank = f.read()
+
+    # Recognize the COA only at the given resolutions.
+    resolutions = []
+    parser = CoADoc(cache=False)
+
+    def pdf_ocr(filename, outfile, resolution=300, **kwargs):
+        resolutions.append(resolution)
+        return BytesIO(coa if resolution >= recognized else blank)
+
+    monkeypatch.setattr(parser, 'pdf_ocr', pdf_ocr)
+    expected = parser.parse_pdf(os.path.join(data_dir, 'Cherry Punch.pdf'))
+    for recognized, ladder in [(150, [150]), (300, [150, 300])]:
+        resolutions.clear()
+        data = parser.parse_pdf(scan)
+        assert resolutions == ladder
+        assert data['product_name'] == expected['product_name']
+    recognized = 600
+    resolutions.clear()
+    with pytest.raises(ValueError):
+        parser.parse_pdf(scan)
+    assert resolutions == OCR_RESOLUTIONS
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Stream parsed COAs to a sink and resume from a checkpoint.
+#-----------------------------------------------------------------------
+
+def test_iter_parse_resume():
+    """Test that an interrupted `iter_parse` resumes where it left off,
+    writing each COA to the sink exactly once."""
+    from cannlytics.data.coas.sinks import read_sink
+    data_dir = '../../../tests/assets/coas/sc-labs'
+    if not os.path.exists(data_dir):
+        data_dir = 'tests/assets/coas/sc-labs'
+    parser = CoADoc(cache=False)
+    for extension in ['.jsonl', '.parquet']:
+        sink = os.path.join(tempfile.mkdtemp(), f'coas{extension}')
+        coas = parser.iter_parse(data_dir, sink=sink, batch_size=1)
+        first = next(coas)
+        coas.close()
+        rest = list(parser.iter_parse(data_dir, sink=sink, batch_size=1))
+        assert len(rest) == 1
+        assert rest[0]['product_name'] != first['product_name']
+        data = read_sink(sink)
+        assert len(data) == 2
+        assert data['product_name'].tolist() == [
+            first['product_name'],
+            rest[0]['product_name'],
+        ]
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Standardize lists of COA data as columns.
+#-----------------------------------------------------------------------
+
+def get_random_value(rng):
+    """Get a random value of a result, as encountered on COAs."""
+    from cannlytics.utils.constants import CODINGS
+    return rng.choice([
+        None,
+        float('nan'),
+        True,
+        rng.randint(-5, 1000),
+        rng.random() * 100,
+        rng.choice(list(CODINGS)),
+        f'{rng.random() * 100:.{rng.randint(0, 20)}f}',
+        str(rng.randint(0, 10 ** rng.randint(1, 25))),
+        ''.join(rng.choice('0123456789.') for _ in range(rng.randint(1, 20))),
+        rng.choice(['<0.1', '1.2 %', '12 mg/g', '', 'abc', '1.2.3', '.', 'inf']),
+    ])
+
+
+def get_random_coa(rng):
+    """Get random COA data with random results."""
+    from cannlytics.utils.constants import ANALYSES
+    analyses = list(ANALYSES) + ['other', None]
+    results = []
+    for _ in range(rng.randint(0, 8)):
+        columns = ['value', 'mg_g', 'lod', 'loq', 'limit', 'name', 'units']
+        columns = rng.sample(columns, rng.randint(0, len(columns)))
+        result = {c: get_random_value(rng) for c in columns}
+        if rng.random() < 0.8:
+            result['analysis'] = rng.choice(analyses)
+        results.append(result)
+    return {
+        'product_name': get_random_value(rng),
+        'analyses': [rng.choice(analyses[:-1]) for _ in range(rng.randint(0, 4))],
+        'date_tested': rng.choice(['2022-01-05', '01/05/2022', None, 'x', 20220105]),
+        'results': results,
+    }
+
+
+def is_same(a, b):
+    """Determine if two standardized values are the same, where `NaN`
+    values are the same and numbers of any type are compared by value."""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and \
+            all(is_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and \
+            all(is_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and a != a:
+        return isinstance(b, float) and b != b
+    return type(a) == type(b) and a == b or \
+        isinstance(a, float) and isinstance(b, float) and a == b
+
+
+def test_standardize_columnar():
+    """Test that standardizing a list of random COA data, or of long-form
+    results, as columns is the same as standardizing each one at a time."""
+    import copy
+    import random
+    parser = CoADoc(cache=False)
+    for seed in range(200):
+        rng = random.Random(seed)
+        coas = [get_random_coa(rng) for _ in range(rng.randint(0, 6))]
+        results = [x for coa in coas for x in coa['results']]
+        for how, data in [('details', coas), ('long', results)]:
+            expected = [parser.standardize(copy.deepcopy(x), how=how) for x in data]
+            actual = parser.standardize(copy.deepcopy(data), how=how)
+            assert is_same(expected, actual), f'Seed {seed} ({how}) differs.'
+
+
+def test_parse_sample_results():
+    """Test that results saved as a Python literal, as JSON, or as
+    JSON in a string are parsed."""
+    from cannlytics.data.coas.standardize import parse_sample_results
+    results = [{'key': 'thc', 'value': 0.5, 'detected': True}]
+    for text in [str(results), json.dumps(results), repr(json.dumps(results))]:
+        assert parse_sample_results(text) == results
+    assert parse_sample_results(results) is results
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Save COA datasets to Excel, Parquet, and Arrow IPC files.
+#-----------------------------------------------------------------------
+
+def test_save_datasets():
+    """Test that datasets are saved to the format of the file extension."""
+    import openpyxl
+    from cannlytics.data.coas.sinks import save_datasets
+    results = pd.DataFrame([
+        {'key': 'thc', 'value': 0.5, 'units': 'percent', 'coa_urls': [{'url': 'a'}]},
+        {'key': 'cbd', 'value': None, 'units': None, 'coa_urls': None},
+    ])
+    codings = pd.DataFrame({'Coding': [0.0], 'Actual': ['ND']})
+    datasets = {'Results': results, 'Codings': codings}
+    temp_dir = tempfile.mkdtemp()
+    wb = save_datasets(datasets, os.path.join(temp_dir, 'coas.xlsx'))
+    wb = openpyxl.load_workbook(os.path.join(temp_dir, 'coas.xlsx'))
+    assert wb.sheetnames == ['Results', 'Codings']
+    rows = list(wb['Results'].values)
+    assert rows[0] == ('key', 'value', 'units', 'coa_urls')
+    assert rows[1] == ('thc', 0.5, 'percent', "[{'url': 'a'}]")
+    for extension in ['.parquet', '.arrow']:
+        outfile = os.path.join(temp_dir, f'coas{extension}')
+        files = save_datasets(datasets, outfile)
+        assert sorted(os.listdir(outfile)) == sorted([
+            f'codings{extension}',
+            f'results{extension}',
+        ])
+        if extension == '.parquet':
+            data = pd.read_parquet(files['Results'])
+        else:
+            data = pd.read_feather(files['Results'])
+        assert data['key'].tolist() == ['thc', 'cbd']
+        assert data['value'].tolist()[0] == 0.5
+        assert json.loads(data['coa_urls'][0]) == [{'url': 'a'}]
+
+
 #-----------------------------------------------------------------------
 # [ ] TEST: Parse a folder of COAs with AI.
 #-----------------------------------------------------------------------
@@ -156,6 +549,9 @@ if __name__ == '__main__':
     # [✓] TEST: Parse a directory of COA PDFs.
     parse_coa_directory(DATA_DIR, TEMP_PATH)
 
+    # [✓] TEST: Parse a directory of COA PDFs in parallel.
+    parse_coa_directory_in_parallel(DATA_DIR)
+
     # [✓] TEST: Parse a directory of QR code images.
     IMAGE_DIR = '../../../.datasets\coas\qr-codes'
     parse_coa_images(IMAGE_DIR)
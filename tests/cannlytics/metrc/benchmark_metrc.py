@@ -0,0 +1,212 @@
+"""
+Metrc Client Benchmarks
+Copyright (c) 2021-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: <https://github.com/cannlytics/cannlytics/blob/main/LICENSE>
+
+Description: Benchmarks of the throughput and latency of the `Metrc`
+client against a local fake Metrc API server, for listing, bulk
+creating, and syncing observations, with injected latency and faults.
+"""
+# Standard imports:
+import asyncio
+import os
+import sys
+from statistics import quantiles
+from time import perf_counter
+
+# Internal imports:
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_metrc import FakeMetrc, create_fixtures
+from cannlytics.metrc import AsyncMetrc
+
+
+def get_percentiles(times):
+    """Get the median and 99th percentile of a list of times."""
+    if len(times) < 2:
+        return (times or [0])[0], (times or [0])[0]
+    cuts = quantiles(times, n=100, method='inclusive')
+    return cuts[49], cuts[98]
+
+
+def report(name, server, seconds, items, times=None):
+    """Print the throughput and latency of a benchmark, with the request
+    latencies measured by the server unless given."""
+    requests = len(server.requests)
+    if times is None:
+        times = [x['seconds'] for x in server.requests]
+    p50, p99 = get_percentiles(times)
+    print('%s: %.2fs, %.0f requests/s, %.0f items/s, p50 %.1fms, p99 %.1fms (%i requests)' % (
+        name,
+        seconds,
+        requests / seconds,
+        items / seconds,
+        p50 * 1000,
+        p99 * 1000,
+        requests,
+    ))
+    return {
+        'seconds': seconds,
+        'requests': requests,
+        'items': items,
+        'p50': p50,
+        'p99': p99,
+    }
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: List packages for many licenses.
+#-----------------------------------------------------------------------
+
+def benchmark_list(
+        licenses: int = 20,
+        packages: int = 5000,
+        latency: float = 0.05,
+        output: str = 'models',
+    ):
+    """Time getting the packages of many licenses one at a time and
+    concurrently with `AsyncMetrc`, recording the latency of each call."""
+    fixtures = create_fixtures(packages=packages)
+    license_numbers = [f'LIC-{i:04d}' for i in range(licenses)]
+    results = {}
+    with FakeMetrc(fixtures, latency=latency) as server:
+
+        # Get packages one license at a time.
+        track = server.client(output=output)
+        times, items = [], 0
+        start = perf_counter()
+        for license_number in license_numbers:
+            call_start = perf_counter()
+            items += len(track.get_packages(license_number=license_number))
+            times.append(perf_counter() - call_start)
+        seconds = perf_counter() - start
+        results['sequential'] = report(
+            f'List ({output}, sequential)', server, seconds, items, times,
+        )
+
+        # Get packages for all licenses concurrently.
+        server.reset()
+        track = server.client(output=output)
+
+        async def get_packages(client, license_number):
+            call_start = perf_counter()
+            data = await client.get_packages(license_number=license_number)
+            return len(data), perf_counter() - call_start
+
+        async def get_all_packages():
+            async with AsyncMetrc.from_client(track) as client:
+                return await asyncio.gather(*[
+                    get_packages(client, x) for x in license_numbers
+                ])
+
+        start = perf_counter()
+        counts = asyncio.run(get_all_packages())
+        seconds = perf_counter() - start
+        results['concurrent'] = report(
+            f'List ({output}, concurrent)',
+            server,
+            seconds,
+            sum(x[0] for x in counts),
+            [x[1] for x in counts],
+        )
+    return results
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: Bulk create locations.
+#-----------------------------------------------------------------------
+
+def benchmark_bulk_create(
+        items: int = 10_000,
+        batch_size: int = 100,
+        workers: list = [1, 4],
+        latency: float = 0.05,
+    ):
+    """Time creating a long list of locations in chunks, sending chunks
+    one at a time and concurrently."""
+    names = [f'Room {i}' for i in range(items)]
+    results = {}
+    with FakeMetrc(latency=latency) as server:
+        for bulk_workers in workers:
+            server.reset()
+            track = server.client(batch_size=batch_size, bulk_workers=bulk_workers)
+            start = perf_counter()
+            track.create_locations(names, license_number='LIC-0001')
+            seconds = perf_counter() - start
+            results[bulk_workers] = report(
+                f'Bulk create ({bulk_workers} workers)',
+                server,
+                seconds,
+                sum(x['items'] for x in server.requests),
+            )
+    return results
+
+
+#-----------------------------------------------------------------------
+# BENCHMARK: Sync plants over a range of last modified times.
+#-----------------------------------------------------------------------
+
+def benchmark_sync(
+        plants: int = 20_000,
+        days: int = 30,
+        workers: list = [1, 4],
+        latency: float = 0.05,
+        throttle_rate: float = 0,
+        error_rate: float = 0,
+    ):
+    """Time getting the vegetative and flowering plants modified over
+    a month in daily windows, as the Metrc sync does, one window at a
+    time and concurrently, with any injected faults."""
+    fixtures = create_fixtures(plants=plants, days=days)
+    end = '2026-01-%02iT00:00:00+00:00' % (days + 1) if days < 31 else \
+        '2026-02-%02iT00:00:00+00:00' % (days - 30)
+    results = {}
+    with FakeMetrc(
+            fixtures,
+            latency=latency,
+            throttle_rate=throttle_rate,
+            error_rate=error_rate,
+        ) as server:
+        for window_workers in workers:
+            server.reset()
+            track = server.client(retries=10, backoff=0.01, max_backoff=0.1)
+            start = perf_counter()
+            items = 0
+            for action in ['vegetative', 'flowering']:
+                items += sum(1 for _ in track.iter_range(
+                    'get_plants',
+                    '2026-01-01T00:00:00+00:00',
+                    end,
+                    workers=window_workers,
+                    action=action,
+                    license_number='LIC-0001',
+                ))
+            seconds = perf_counter() - start
+            faults = ''
+            if throttle_rate or error_rate:
+                faults = ', %i retries' % track.stats['retries']
+            results[window_workers] = report(
+                f'Sync ({window_workers} workers{faults})',
+                server,
+                seconds,
+                items,
+            )
+    return results
+
+
+# === Benchmarks ===
+if __name__ == '__main__':
+
+    # BENCHMARK: List packages as models and as records.
+    benchmark_list(output='models')
+    benchmark_list(output='records')
+
+    # BENCHMARK: Bulk create locations.
+    benchmark_bulk_create()
+
+    # BENCHMARK: Sync plants, with and without faults.
+    benchmark_sync()
+    benchmark_sync(throttle_rate=0.05, error_rate=0.05)
@@ -0,0 +1,424 @@
+"""
+Fake Metrc API Server | Cannlytics
+Copyright (c) 2021-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License
+
+Description:
+
+    A local stand-in for the Metrc API, so that the `Metrc` client can
+    be tested and benchmarked offline. The server responds to GET
+    requests with fixtures, filtered by `lastModifiedStart` and
+    `lastModifiedEnd` when the fixtures have a `LastModified` time and
+    paginated when `pageNumber` is given, and accepts any POST, PUT, or
+    DELETE request. Latency, throttled (429) responses, server errors
+    (5xx), and dropped connections can be injected at random.
+
+Example:
+
+    ```py
+    with FakeMetrc(create_fixtures(packages=10_000), latency=0.01) as server:
+        track = server.client()
+        packages = track.get_packages(license_number='LIC-0001')
+    ```
+
+"""
+# Standard imports:
+import bisect
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Internal imports:
+from cannlytics.metrc import Metrc
+from cannlytics.metrc.urls import (
+    METRC_EMPLOYEES_URL,
+    METRC_FACILITIES_URL,
+    METRC_ITEMS_URL,
+    METRC_LOCATIONS_URL,
+    METRC_PACKAGES_URL,
+    METRC_PLANTS_URL,
+    METRC_STRAINS_URL,
+)
+
+
+# The status recorded for requests whose connection is dropped.
+DISCONNECT = 0
+
+# The default start of the last modified times of generated fixtures.
+FIXTURE_START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_time(value):
+    """Parse an ISO formatted time, assuming UTC if no time zone is given."""
+    value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def create_fixtures(
+        packages=1000,
+        plants=1000,
+        locations=50,
+        days=30,
+        start=FIXTURE_START,
+    ):
+    """Create fixtures of common Metrc endpoints, with the last modified
+    times of packages and plants spread evenly over a number of days.
+    Args:
+        packages (int): The number of packages.
+        plants (int): The number of vegetative and of flowering plants.
+        locations (int): The number of locations.
+        days (int): The number of days of last modified times.
+        start (datetime): The earliest last modified time.
+    Returns:
+        (dict): Returns a list of observations for each endpoint.
+    """
+    seconds = days * 24 * 60 * 60
+
+    def modified_at(i, n):
+        return (start + timedelta(seconds=seconds * i / max(n, 1))).isoformat()
+
+    def package(i):
+        return {
+            'Id': i,
+            'Label': f'1A4FF0100000022{i:09d}',
+            'PackageType': 'Product',
+            'SourceHarvestNames': 'Harvest 1',
+            'LocationId': i % max(locations, 1),
+            'LocationName': f'Vault {i % max(locations, 1)}',
+            'Quantity': 10.0,
+            'UnitOfMeasureName': 'Grams',
+            'UnitOfMeasureAbbreviation': 'g',
+            'Item': {
+                'Id': i % 100,
+                'Name': f'Item {i % 100}',
+                'ProductCategoryName': 'Buds',
+                'StrainName': 'Old-Time Moonshine',
+            },
+            'PackagedDate': modified_at(i, packages)[:10],
+            'LabTestingState': 'TestPassed',
+            'IsOnHold': False,
+            'LastModified': modified_at(i, packages),
+        }
+
+    def plant(i, phase):
+        return {
+            'Id': i,
+            'Label': f'1A4FF0100000011{i:09d}',
+            'State': 'Tracked',
+            'GrowthPhase': phase,
+            'PlantBatchName': f'Batch {i % 20}',
+            'StrainName': 'Old-Time Moonshine',
+            'LocationName': f'Room {i % max(locations, 1)}',
+            'PlantedDate': modified_at(i, plants)[:10],
+            'LastModified': modified_at(i, plants),
+        }
+
+    return {
+        METRC_FACILITIES_URL: [
+            {
+                'Name': f'Facility {i}',
+                'License': {'Number': f'LIC-{i:04d}', 'LicenseType': 'Grower'},
+            }
+            for i in range(1, 4)
+        ],
+        METRC_EMPLOYEES_URL: [
+            {'FullName': f'Employee {i}', 'License': {'Number': f'EMP-{i:04d}'}}
+            for i in range(10)
+        ],
+        METRC_ITEMS_URL % 'categories': [
+            {'Name': 'Buds', 'ProductCategoryType': 'Buds'},
+            {'Name': 'Shake/Trim', 'ProductCategoryType': 'ShakeTrim'},
+        ],
+        METRC_LOCATIONS_URL % 'active': [
+            {'Id': i, 'Name': f'Room {i}', 'LocationTypeName': 'Default'}
+            for i in range(locations)
+        ],
+        METRC_PACKAGES_URL % 'active': [package(i) for i in range(packages)],
+        METRC_PLANTS_URL % 'vegetative': [
+            plant(i, 'Vegetative') for i in range(plants)
+        ],
+        METRC_PLANTS_URL % 'flowering': [
+            plant(plants + i, 'Flowering') for i in range(plants)
+        ],
+        METRC_STRAINS_URL % 'active': [
+            {'Id': 1, 'Name': 'Old-Time Moonshine', 'TestingStatus': 'None'},
+        ],
+    }
+
+
+class FakeMetrcHandler(BaseHTTPRequestHandler):
+    """Handle requests to the fake Metrc API server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, method):
+        """Respond to a request, injecting any latency or faults."""
+        start = time.perf_counter()
+        server = self.server.fake
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server.enter(params)
+        try:
+            status, headers, content, items = server.get_response(
+                method,
+                url.path,
+                params,
+                body,
+            )
+        finally:
+            server.exit(params)
+        # Record the request before responding, so that the request is
+        # recorded by the time the client has its response.
+        server.record(method, url.path, params, status, items, time.perf_counter() - start)
+        if status == DISCONNECT:
+            self.close_connection = True
+            return
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self.respond('GET')
+
+    def do_POST(self):
+        self.respond('POST')
+
+    def do_PUT(self):
+        self.respond('PUT')
+
+    def do_DELETE(self):
+        self.respond('DELETE')
+
+
+class FakeMetrc(object):
+    """A local, fixture-driven stand-in for the Metrc API."""
+
+    def __init__(
+            self,
+            fixtures=None,
+            latency=0,
+            jitter=0,
+            throttle_rate=0,
+            error_rate=0,
+            retry_after=0,
+            disconnect_rate=0,
+            seed=420,
+        ):
+        """Initialize a fake Metrc API server.
+        Args:
+            fixtures (dict): A list of observations, or a function of the
+                request parameters that returns the response, for each
+                endpoint. Unknown GET endpoints respond with an empty list
+                and functions that raise respond with a server error.
+            latency (float): The seconds to wait before each response.
+            jitter (float): The most seconds of random extra latency.
+            throttle_rate (float): The fraction of requests that
+                respond with 429 Too Many Requests.
+            error_rate (float): The fraction of requests that respond
+                with a 500 or 503 server error.
+            retry_after (float): The `Retry-After` seconds of throttled
+                responses, if any.
+            disconnect_rate (float): The fraction of requests whose
+                connection is closed, after the request is handled,
+                without a response.
+            seed (int): The seed of the random latency and faults.
+        """
+        self.fixtures = {}
+        self.indexes = {}
+        for endpoint, data in (fixtures or {}).items():
+            self.add_fixture(endpoint, data)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.disconnect_rate = disconnect_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.active = Counter()
+        self.peaks = Counter()
+        self.server = None
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        """The base URL of the server."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def add_fixture(self, endpoint, data):
+        """Add the fixture of an endpoint, indexing observations by
+        last modified time if every observation has one."""
+        self.fixtures[endpoint] = data
+        self.indexes.pop(endpoint, None)
+        if isinstance(data, list) and data and \
+                all(isinstance(x, dict) and x.get('LastModified') for x in data):
+            rows = sorted(data, key=lambda x: parse_time(x['LastModified']))
+            times = [parse_time(x['LastModified']) for x in rows]
+            self.indexes[endpoint] = (times, rows)
+
+    def start(self):
+        """Start the server in a background thread."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeMetrcHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def client(self, **kwargs):
+        """Create a `Metrc` client of the server, without logs or a rate
+        limit unless given.
+        Args:
+            **kwargs: Any arguments of the `Metrc` client.
+        Returns:
+            (Metrc): Returns a Metrc client.
+        """
+        kwargs = {'logs': False, 'state': 'ca', 'rate_limit': None, **kwargs}
+        track = Metrc(
+            kwargs.pop('vendor_api_key', 'vendor'),
+            kwargs.pop('user_api_key', 'user'),
+            **kwargs,
+        )
+        track.base = self.url
+        return track
+
+    def record(self, method, path, params, status, items, seconds):
+        """Record a request."""
+        with self.lock:
+            self.requests.append({
+                'method': method,
+                'path': path,
+                'params': params,
+                'status': status,
+                'items': items,
+                'seconds': seconds,
+            })
+
+    def enter(self, params):
+        """Count a request in progress, in total, under `all`, and for
+        its license, recording the peak number of concurrent requests."""
+        with self.lock:
+            for key in ['all', params.get('licenseNumber')]:
+                self.active[key] += 1
+                self.peaks[key] = max(self.peaks[key], self.active[key])
+
+    def exit(self, params):
+        """Count a request as no longer in progress."""
+        with self.lock:
+            for key in ['all', params.get('licenseNumber')]:
+                self.active[key] -= 1
+
+    def reset(self):
+        """Clear the recorded requests and peak concurrency."""
+        with self.lock:
+            self.requests = []
+            self.peaks = Counter()
+
+    def get_fault(self):
+        """Get the latency and status code of any injected fault."""
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            draw = self.random.random()
+            if draw < self.throttle_rate:
+                return delay, 429
+            if draw < self.throttle_rate + self.error_rate:
+                return delay, self.random.choice([500, 503])
+            if draw < self.throttle_rate + self.error_rate + self.disconnect_rate:
+                return delay, DISCONNECT
+        return delay, None
+
+    def get_data(self, endpoint, params):
+        """Get the observations of an endpoint for the given parameters."""
+        fixture = self.fixtures.get(endpoint, [])
+        if callable(fixture):
+            return fixture(params)
+        index = self.indexes.get(endpoint)
+        start = params.get('lastModifiedStart')
+        end = params.get('lastModifiedEnd')
+        if index is None or not (start or end):
+            return fixture
+        times, rows = index
+        lower = bisect.bisect_left(times, parse_time(start)) if start else 0
+        upper = bisect.bisect_right(times, parse_time(end)) if end else len(rows)
+        return rows[lower:upper]
+
+    def get_response(self, method, endpoint, params, body):
+        """Get the status, headers, content, and number of items of the
+        response to a request.
+        Args:
+            method (str): The request method.
+            endpoint (str): The request path.
+            params (dict): The query parameters.
+            body (bytes): The request body.
+        Returns:
+            (tuple): Returns the status code, headers, content, and
+                number of items of the response.
+        """
+        delay, fault = self.get_fault()
+        if delay:
+            time.sleep(delay)
+        if fault == 429:
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after else {}
+            return 429, headers, b'{"Message":"Too many requests."}', 0
+        if fault:
+            return fault, {}, b'{"Message":"An error has occurred."}', 0
+        status = DISCONNECT if fault == DISCONNECT else 200
+        if method != 'GET':
+            data = json.loads(body) if body else None
+            items = len(data) if isinstance(data, list) else int(data is not None)
+            return status, {}, b'', items
+        try:
+            data = self.get_data(endpoint, params)
+        except Exception:
+            return 500, {}, b'{"Message":"An error has occurred."}', 0
+        items = len(data) if isinstance(data, list) else 1
+        if 'pageNumber' in params and isinstance(data, list):
+            page_size = int(params.get('pageSize') or 20)
+            page_number = int(params['pageNumber'])
+            page = data[(page_number - 1) * page_size:page_number * page_size]
+            items = len(page)
+            data = {
+                'Data': page,
+                'Total': len(data),
+                'TotalRecords': len(data),
+                'PageNumber': page_number,
+                'PageSize': page_size,
+                'RecordsOnPage': len(page),
+                'TotalPages': -(-len(data) // page_size),
+            }
+        return status, {}, json.dumps(data).encode(), items
@@ -0,0 +1,327 @@
+"""
+Metrc Client Tests | Cannlytics
+Copyright (c) 2021-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License
+
+Description:
+
+    Test the `Metrc` client offline against a fake Metrc API server,
+    including windowed range queries, compact records and DataFrames
+    that match the models, bounded concurrent requests of the
+    asynchronous client, cached reference data, retries of
+    throttled requests, server errors, and connection errors, and
+    chunked bulk requests.
+
+"""
+# Standard imports:
+import asyncio
+import os
+import sys
+import time
+
+# External imports:
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+# Internal imports:
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_metrc import FakeMetrc, create_fixtures
+from cannlytics.metrc import AsyncMetrc, MetrcAPIError, MetrcBulkError
+from cannlytics.metrc.cache import CACHE_TTLS, SQLiteCache, TTLCache
+from cannlytics.metrc.urls import (
+    METRC_FACILITIES_URL,
+    METRC_ITEMS_URL,
+    METRC_LOCATIONS_URL,
+)
+
+
+@pytest.fixture(name='fixtures', scope='module')
+def fixture_fixtures():
+    """Fixtures of common Metrc endpoints."""
+    return create_fixtures(packages=2000, plants=500, days=10)
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Get lists of observations.
+#-----------------------------------------------------------------------
+
+def test_get_packages(fixtures):
+    """Test getting packages, in full and for a last modified range."""
+    with FakeMetrc(fixtures) as server:
+        track = server.client()
+        packages = track.get_packages(license_number='LIC-0001')
+        assert len(packages) == 2000
+        assert packages[0].label == fixtures['/packages/v1/active'][0]['Label']
+        packages = track.get_packages(
+            license_number='LIC-0001',
+            start='2026-01-01T00:00:00+00:00',
+            end='2026-01-02T00:00:00+00:00',
+        )
+        assert 0 < len(packages) < 2000
+        assert server.requests[-1]['params']['licenseNumber'] == 'LIC-0001'
+
+
+def test_iter_range(fixtures):
+    """Test iterating over unique packages in daily windows."""
+    with FakeMetrc(fixtures) as server:
+        track = server.client()
+        packages = list(track.iter_range(
+            'get_packages',
+            '2026-01-01T00:00:00+00:00',
+            '2026-01-11T00:00:00+00:00',
+            license_number='LIC-0001',
+        ))
+        assert len(server.requests) == 10
+        assert len(packages) == 2000
+        assert len({x.id for x in packages}) == 2000
+
+
+def test_for_licenses(fixtures):
+    """Test getting packages for many licenses concurrently, with
+    the failure of one license reported by license."""
+    packages = fixtures['/packages/v1/active'][:10]
+
+    def get_packages(params):
+        if params['licenseNumber'] == 'LIC-0003':
+            raise ValueError('Unknown license.')
+        return packages
+
+    licenses = [f'LIC-{i:04d}' for i in range(8)]
+    with FakeMetrc({'/packages/v1/active': get_packages}) as server:
+        track = server.client(retries=0)
+        results = track.for_licenses(licenses + ['LIC-0001']).get_packages()
+        assert results.succeeded == [x for x in licenses if x != 'LIC-0003']
+        assert results.failed == ['LIC-0003']
+        assert isinstance(results.errors['LIC-0003'], MetrcAPIError)
+        assert all(len(results[x]) == 10 for x in results.succeeded)
+        assert len(server.requests) == 8
+        with pytest.raises(MetrcAPIError):
+            results.raise_for_errors()
+
+
+def test_records_and_dataframes(fixtures):
+    """Test that compact records and DataFrames have the same
+    properties, including cleaned nested properties, as models of the
+    same packages and plants."""
+    requests = [
+        ('get_packages', {'license_number': 'LIC-0001'}),
+        ('get_plants', {'action': 'flowering', 'license_number': 'LIC-0001'}),
+    ]
+    with FakeMetrc(fixtures) as server:
+        track = server.client()
+        compact = server.client(output='records')
+        for method, kwargs in requests:
+            models = getattr(track, method)(**kwargs)
+            expected = [x.to_dict() for x in models]
+            records = getattr(compact, method)(**kwargs)
+            assert len(records) == len(expected) > 0
+            assert not hasattr(records[0], '__dict__')
+            assert [x.to_dict() for x in records] == expected
+            assert [x.uid for x in records] == [x.uid for x in models]
+            df = track.get_dataframe(method, **kwargs)
+            assert list(df.columns) == list(expected[0].keys())
+            assert df.to_dict('records') == expected
+            assert track.output == 'models'
+
+        # Nested properties are cleaned in every output.
+        package = fixtures['/packages/v1/active'][0]
+        records = compact.get_packages(license_number='LIC-0001')
+        assert records[0].item['product_category_name'] == \
+            package['Item']['ProductCategoryName']
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Make requests concurrently with bounded concurrency.
+#-----------------------------------------------------------------------
+
+def test_async_concurrency(fixtures):
+    """Test that concurrent requests of an asynchronous client are
+    bounded for the host and for each license, and that the failure of
+    one license is returned by `gather` without failing the others."""
+    locations = fixtures['/locations/v1/active']
+
+    def get_locations(params):
+        if params['licenseNumber'] == 'LIC-0003':
+            raise ValueError('Unknown license.')
+        return locations
+
+    licenses = [f'LIC-{i:04d}' for i in range(6)]
+
+    async def get_all_locations(track):
+        return await asyncio.gather(*[
+            track.get_locations(license_number=x)
+            for x in licenses
+            for _ in range(4)
+        ], return_exceptions=True)
+
+    fixture = {'/locations/v1/active': get_locations}
+    with FakeMetrc(fixture, latency=0.05) as server:
+        client = server.client(retries=0)
+        track = AsyncMetrc.from_client(client, host_limit=4, license_limit=2)
+        results = asyncio.run(get_all_locations(track))
+        track.close()
+        assert len(results) == 24
+        for i, result in enumerate(results):
+            if licenses[i // 4] == 'LIC-0003':
+                assert isinstance(result, MetrcAPIError)
+            else:
+                assert len(result) == len(locations)
+        assert 2 <= server.peaks['all'] <= 4
+        assert max(server.peaks[x] for x in licenses) == 2
+        assert len(server.requests) == 24
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Cache responses of reference-data endpoints.
+#-----------------------------------------------------------------------
+
+def count_requests(server, endpoint):
+    """Count the GET requests of an endpoint made to the fake server."""
+    return sum(
+        x['method'] == 'GET' and x['path'] == endpoint
+        for x in server.requests
+    )
+
+
+def test_cache(fixtures):
+    """Test that responses of reference-data endpoints are cached for
+    their time to live, by API keys, and that other responses are not."""
+    categories = METRC_ITEMS_URL % 'categories'
+    with FakeMetrc(fixtures) as server:
+        cache = TTLCache(ttl=0.2)
+        track = server.client(cache=cache)
+        for _ in range(3):
+            assert len(track.get_item_categories(license_number='LIC-0001')) == 2
+        assert count_requests(server, categories) == 1
+        assert track.stats['cache_hits'] == 2
+        other = server.client(cache=cache, user_api_key='other')
+        other.get_item_categories(license_number='LIC-0001')
+        assert count_requests(server, categories) == 2
+        time.sleep(0.25)
+        track.get_item_categories(license_number='LIC-0001')
+        assert count_requests(server, categories) == 3
+        assert cache.stats['expirations'] == 1
+        for _ in range(2):
+            track.get_packages(license_number='LIC-0001')
+        assert count_requests(server, '/packages/v1/active') == 2
+
+
+def test_cache_facilities(fixtures, monkeypatch):
+    """Test that facilities expire before other cached responses and
+    are removed from the cache when the licenses of API keys change."""
+    monkeypatch.setitem(CACHE_TTLS, METRC_FACILITIES_URL, 0.1)
+    categories = METRC_ITEMS_URL % 'categories'
+    with FakeMetrc(fixtures) as server:
+        cache = TTLCache()
+        track = server.client(cache=cache)
+        track.get_facilities()
+        track.get_item_categories(license_number='LIC-0001')
+        time.sleep(0.15)
+        track.get_facilities()
+        track.get_item_categories(license_number='LIC-0001')
+        assert count_requests(server, METRC_FACILITIES_URL) == 2
+        assert count_requests(server, categories) == 1
+        monkeypatch.setitem(CACHE_TTLS, METRC_FACILITIES_URL, 3600)
+        track.invalidate_cache(endpoint=METRC_FACILITIES_URL)
+        track.get_facilities()
+        assert count_requests(server, METRC_FACILITIES_URL) == 3
+        cache.invalidate(state=track.state, endpoint=METRC_FACILITIES_URL)
+        track.get_facilities()
+        track.get_item_categories(license_number='LIC-0001')
+        assert count_requests(server, METRC_FACILITIES_URL) == 4
+        assert count_requests(server, categories) == 1
+
+
+def test_cache_invalidated_by_writes(fixtures, tmp_path):
+    """Test that writes to a resource remove the cached responses of
+    the resource, in memory and in a SQLite cache shared by clients."""
+    types = METRC_LOCATIONS_URL % 'types'
+    categories = METRC_ITEMS_URL % 'categories'
+    with FakeMetrc(fixtures) as server:
+        for cache in [TTLCache(), SQLiteCache(str(tmp_path / 'metrc.db'))]:
+            server.reset()
+            track, other = server.client(cache=cache), server.client(cache=cache)
+            for client in [track, other]:
+                client.get_location_types(license_number='LIC-0001')
+                client.get_item_categories(license_number='LIC-0001')
+            assert count_requests(server, types) == 1
+            track.create_locations(['Vault'], license_number='LIC-0001')
+            other.get_location_types(license_number='LIC-0001')
+            other.get_item_categories(license_number='LIC-0001')
+            assert count_requests(server, types) == 2
+            assert count_requests(server, categories) == 1
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Retry throttled requests and server errors.
+#-----------------------------------------------------------------------
+
+def test_retries(fixtures):
+    """Test that throttled requests and server errors are retried."""
+    with FakeMetrc(fixtures, throttle_rate=0.2, error_rate=0.2) as server:
+        track = server.client(retries=10, backoff=0.001, max_backoff=0.01)
+        for _ in range(10):
+            assert len(track.get_locations(license_number='LIC-0001')) == 50
+        assert track.stats['retries'] > 0
+        assert track.stats['requests'] == len(server.requests)
+        assert any(x['status'] == 429 for x in server.requests)
+
+
+def test_retries_exhausted(fixtures):
+    """Test that an error is raised when retries are exhausted."""
+    with FakeMetrc(fixtures, error_rate=1) as server:
+        track = server.client(retries=2, backoff=0.001)
+        with pytest.raises(MetrcAPIError):
+            track.get_locations(license_number='LIC-0001')
+        assert len(server.requests) == 3
+
+
+def test_connection_errors(fixtures):
+    """Test that dropped connections are retried only for idempotent
+    requests, so that creates are not duplicated, and that failures to
+    connect are retried for any request."""
+    with FakeMetrc(fixtures, disconnect_rate=1) as server:
+        track = server.client(retries=2, backoff=0.001)
+        with pytest.raises(RequestsConnectionError):
+            track.create_locations(['Vault'], license_number='LIC-0001')
+        assert len(server.requests) == 1
+        with pytest.raises(RequestsConnectionError):
+            track.get_locations(license_number='LIC-0001')
+        assert len(server.requests) == 4
+        server.stop()
+        track.stats.clear()
+        with pytest.raises(RequestsConnectionError):
+            track.create_locations(['Vault'], license_number='LIC-0001')
+        assert track.stats['connection_errors'] == 3
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Send long lists in chunks.
+#-----------------------------------------------------------------------
+
+def test_bulk_create():
+    """Test that long lists are sent in chunks."""
+    names = [f'Room {i}' for i in range(250)]
+    with FakeMetrc() as server:
+        track = server.client(batch_size=100, bulk_workers=2)
+        track.create_locations(names, license_number='LIC-0001')
+        sizes = sorted(x['items'] for x in server.requests)
+        assert sizes == [50, 100, 100]
+
+
+def test_bulk_create_failures():
+    """Test that failed chunks are reported and can be retried."""
+    names = [f'Room {i}' for i in range(1000)]
+    with FakeMetrc(error_rate=0.5) as server:
+        track = server.client(batch_size=100, retries=0)
+        with pytest.raises(MetrcBulkError) as error:
+            track.create_locations(names, license_number='LIC-0001')
+        result = error.value.result
+        assert 0 < len(result.failed) < 10
+        server.error_rate = 0
+        assert result.retry().ok
+        assert sum(x['items'] for x in server.requests if x['status'] == 200) == 1000
@@ -0,0 +1,207 @@
+"""
+Metrc Sync Tests | Cannlytics
+Copyright (c) 2021-2026 Cannlytics
+
+Authors: Keegan Skeate <https://github.com/keeganskeate>
+Created: 10/17/2026
+Updated: 10/17/2026
+License: MIT License
+
+Description:
+
+    Test the incremental sync of Metrc data to Firestore, in the
+    `metrc_sync` cloud function, against a fake Metrc API server and an
+    in-memory stand-in for Firestore, including the sync window of
+    the watermark, writing only changed documents, and advancing the
+    watermark only after the documents are written.
+
+"""
+# Standard imports:
+from datetime import datetime, timedelta, timezone
+import importlib.util
+import os
+import sys
+
+# External imports:
+import firebase_admin
+from firebase_admin import firestore
+import google.auth
+import pytest
+
+# Internal imports:
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_metrc import create_fixtures, FakeMetrc
+from cannlytics.metrc.urls import METRC_PLANTS_URL
+
+
+# The cloud function that syncs Metrc data to Firestore.
+MAIN = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', '..', 'functions', 'metrc_sync', 'main.py',
+)
+
+
+class FakeSnapshot(object):
+    """A snapshot of a document in the fake Firestore."""
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.path.split('/')[-1]
+        self.exists = data is not None
+        self.data = data
+
+    def to_dict(self):
+        return None if self.data is None else dict(self.data)
+
+
+class FakeReference(object):
+    """A reference to a collection or document in the fake Firestore."""
+
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+
+    def collection(self, name):
+        return FakeReference(self.db, f'{self.path}/{name}')
+
+    document = collection
+
+    def get(self):
+        return FakeSnapshot(self, self.db.docs.get(self.path))
+
+    def set(self, values, merge=False):
+        self.db.write(self.path, values, merge)
+
+
+class FakeBatch(object):
+    """A batch of writes to the fake Firestore."""
+
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, reference, values, merge=False):
+        self.writes.append((reference.path, values, merge))
+
+    def commit(self):
+        for path, values, merge in self.writes:
+            self.db.write(path, values, merge)
+
+
+class FakeFirestore(object):
+    """An in-memory stand-in for a Firestore client, counting writes."""
+
+    def __init__(self):
+        self.docs = {}
+        self.writes = []
+
+    def collection(self, name):
+        return FakeReference(self, name)
+
+    def document(self, path):
+        return FakeReference(self, path)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        for reference in references:
+            yield reference.get()
+
+    def write(self, path, values, merge=False):
+        data = {**self.docs.get(path, {}), **values} if merge else dict(values)
+        self.docs[path] = data
+        self.writes.append(path)
+
+
+@pytest.fixture(name='sync')
+def fixture_sync(monkeypatch):
+    """The `metrc_sync` cloud function, with a fake Firestore."""
+    db = FakeFirestore()
+    monkeypatch.setattr(firebase_admin, 'initialize_app', lambda *args: None)
+    monkeypatch.setattr(firestore, 'client', lambda *args: db)
+    monkeypatch.setattr(google.auth, 'default', lambda *args: (None, 'test'))
+    spec = importlib.util.spec_from_file_location('metrc_sync_main', MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+#-----------------------------------------------------------------------
+# [✓] TEST: Sync Metrc data incrementally.
+#-----------------------------------------------------------------------
+
+def test_get_sync_window(sync):
+    """Test that any parsable watermark, however old, is the start of
+    the sync window, less an overlap, and that a full resync is only
+    performed without a valid watermark or when requested."""
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    watermark = {'last_modified': old.isoformat()}
+    with FakeMetrc() as server:
+        track = server.client()
+        start, end, full = sync.get_sync_window(track, watermark)
+        assert not full
+        assert datetime.fromisoformat(start) == old - sync.SYNC_OVERLAP
+        assert datetime.fromisoformat(end) > old
+        for invalid in [{}, {'last_modified': 'Not a time'}]:
+            start, _, full = sync.get_sync_window(track, invalid)
+            assert full and start.startswith(sync.DEFAULT_SYNC_START)
+        _, _, full = sync.get_sync_window(track, watermark, full=True)
+        assert full
+
+
+def test_sync_plants(sync, monkeypatch):
+    """Test that only new or changed plants are written, that plants
+    are requested only since the watermark, and that the watermark is
+    only advanced after the plants are written."""
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(days=5)
+    monkeypatch.setattr(sync, 'DEFAULT_SYNC_START', start.isoformat()[:10])
+
+    # Vegetative then flowering plants modified in the last 4 days.
+    fixtures = create_fixtures(
+        packages=0,
+        plants=100,
+        days=2,
+        start=now - timedelta(days=4),
+    )
+    org_id, license_number = 'test-org', 'LIC-0001'
+    col = f'organizations/{org_id}/metrc/{license_number}/plants'
+    ref = f'organizations/{org_id}/metrc/{license_number}/sync/plants'
+    with FakeMetrc(fixtures) as server:
+        track = server.client()
+
+        # Sync all plants the first time.
+        stats = sync.sync_metrc_plants(track, org_id, [license_number])
+        assert stats == {'total': 200, 'written': 200, 'full': 1}
+        watermark = sync.db.docs[ref]
+        assert watermark['written'] == 200
+
+        # Sync only changed plants with a full resync.
+        sync.db.writes.clear()
+        stats = sync.sync_metrc_plants(track, org_id, [license_number], full=True)
+        assert stats == {'total': 200, 'written': 0, 'full': 1}
+        assert sync.db.writes == [ref]
+
+        # Sync only plants modified since the watermark.
+        vegetative = METRC_PLANTS_URL % 'vegetative'
+        plant = dict(fixtures[vegetative][0])
+        plant['GrowthPhase'] = 'Flowering'
+        plant['LastModified'] = datetime.now(timezone.utc).isoformat()
+        server.add_fixture(vegetative, fixtures[vegetative][1:] + [plant])
+        server.reset()
+        stats = sync.sync_metrc_plants(track, org_id, [license_number])
+        assert stats == {'total': 1, 'written': 1, 'full': 0}
+        assert sync.db.docs[f'{col}/{plant["Id"]}']['growth_phase'] == 'Flowering'
+        assert len(server.requests) == 2
+
+        # Do not advance the watermark if the plants are not written.
+        watermark = dict(sync.db.docs[ref])
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('Firestore is unavailable.')
+
+        monkeypatch.setattr(sync, 'update_documents', fail)
+        with pytest.raises(RuntimeError):
+            sync.sync_metrc_plants(track, org_id, [license_number])
+        assert sync.db.docs[ref] == watermark